@@ -0,0 +1,32 @@
+"""Runs the endpoint suites without asv and prints wall time, loss function calls and peak
+Python memory (tracemalloc) for every combination of parameters.
+
+    python -m benchmarks
+"""
+import itertools
+import time
+import tracemalloc
+
+from .bench_endpoint import IntervalSuite, EndpointScalingSuite
+from .models import CountingLoss
+
+
+def run_suite(suite_class):
+    suite = suite_class()
+    print(suite_class.__name__)
+    for params in itertools.product(*suite_class.params):
+        suite.setup(*params)
+        loss_func = CountingLoss(suite.loss_func)
+        tracemalloc.start()
+        start = time.perf_counter()
+        suite.run(params[0], loss_func)
+        wall_time = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print("  {:40s} {:10.4f} s {:8d} calls {:10.1f} KiB".format(
+            ", ".join(str(p) for p in params), wall_time, loss_func.counter, peak / 1024))
+
+
+if __name__ == "__main__":
+    run_suite(IntervalSuite)
+    run_suite(EndpointScalingSuite)
@@ -0,0 +1,72 @@
+"""Bound constraints in CICO_ONE_PASS: 2 n_theta scalar inequality constraints, each a Python
+callback on every evaluation of the AUGLAG subproblem (the previous implementation), versus native
+bounds of the optimizer with the loss constraint only, i.e. one callback per evaluation.
+"""
+import numpy as np
+
+from likelihoodprofiler.optimizers import NloptBackend
+
+from .models import chain_model
+
+
+class Callbacks:
+    """Counter of Python callbacks from the optimizer."""
+    def __init__(self):
+        self.n = 0
+
+    def wrap(self, func):
+        def wrapped(x, grad):
+            self.n += 1
+            return func(x, grad)
+        return wrapped
+
+
+def cico_problem(n_theta, bounds_mode, callbacks):
+    """Arguments of :code:`maximize_constrained` for the right endpoint of the first component of :code:`chain_model`
+    with bounds :code:`(-100, 100)` for every component."""
+    theta_init, loss_func, loss_crit = chain_model(n_theta)
+    lb, ub = np.full(n_theta, -100.), np.full(n_theta, 100.)
+
+    def objective(x, grad):
+        return x[0]
+
+    constraints = [(callbacks.wrap(lambda x, grad: loss_func(x) - loss_crit), 1e-3)]
+    kwargs = {}
+    if bounds_mode == "constraints":
+        for i in range(n_theta):
+            constraints.append((callbacks.wrap(lambda x, grad, i=i: x[i] - ub[i]), 0))
+            constraints.append((callbacks.wrap(lambda x, grad, i=i: lb[i] - x[i]), 0))
+    else:
+        kwargs = dict(lb=lb, ub=ub)
+    return objective, constraints, np.array(theta_init), kwargs
+
+
+class CicoBoundsSuite:
+    params = ([2, 5, 10, 20, 50], ["constraints", "bounds"])
+    param_names = ["n_theta", "bounds_mode"]
+    timeout = 300
+
+    def run(self, n_theta, bounds_mode):
+        callbacks = Callbacks()
+        objective, constraints, x0, kwargs = cico_problem(n_theta, bounds_mode, callbacks)
+        x, f, ret = NloptBackend().maximize_constrained(objective, constraints, x0, **kwargs)
+        return callbacks.n, f
+
+    def time_maximize_constrained(self, n_theta, bounds_mode):
+        self.run(n_theta, bounds_mode)
+
+    def track_callbacks(self, n_theta, bounds_mode):
+        return self.run(n_theta, bounds_mode)[0]
+    track_callbacks.unit = "calls"
+
+
+if __name__ == "__main__":
+    import time
+
+    suite = CicoBoundsSuite()
+    for n_theta in CicoBoundsSuite.params[0]:
+        for bounds_mode in CicoBoundsSuite.params[1]:
+            start = time.perf_counter()
+            n_callbacks, f = suite.run(n_theta, bounds_mode)
+            print("n_theta={:3d} {:12s} {:9.3f} s {:9d} callbacks  endpoint {:.4f}".format(
+                n_theta, bounds_mode, time.perf_counter() - start, n_callbacks, f))
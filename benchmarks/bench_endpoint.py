@@ -0,0 +1,59 @@
+"""Wall time, loss function calls and peak memory of endpoint methods.
+
+asv-style suites: ``time_*`` for wall time, ``peakmem_*`` for peak memory and ``track_*`` for
+the number of loss_func calls. Run with ``asv run`` or ``python -m benchmarks`` without asv.
+"""
+from likelihoodprofiler import get_interval, get_endpoint
+
+from .models import CASES, chain_model, CountingLoss
+
+METHODS = ["CICO_ONE_PASS", "LIN_EXTRAPOL", "QUADR_EXTRAPOL"]
+
+
+class IntervalSuite:
+    """get_interval for the first parameter of the test models."""
+    params = (METHODS, list(CASES))
+    param_names = ["method", "model"]
+
+    def setup(self, method, model):
+        self.theta_init, self.loss_func, self.loss_crit = CASES[model]
+
+    def run(self, method, loss_func):
+        return get_interval(self.theta_init, 0, loss_func, method, loss_crit=self.loss_crit)
+
+    def time_get_interval(self, method, model):
+        self.run(method, self.loss_func)
+
+    def peakmem_get_interval(self, method, model):
+        self.run(method, self.loss_func)
+
+    def track_loss_calls(self, method, model):
+        loss_func = CountingLoss(self.loss_func)
+        self.run(method, loss_func)
+        return loss_func.counter
+    track_loss_calls.unit = "calls"
+
+
+class EndpointScalingSuite:
+    """get_endpoint for synthetic models with growing number of parameters."""
+    params = (METHODS, [2, 5, 10, 20])
+    param_names = ["method", "n_theta"]
+    timeout = 300
+
+    def setup(self, method, n_theta):
+        self.theta_init, self.loss_func, self.loss_crit = chain_model(n_theta)
+
+    def run(self, method, loss_func):
+        return get_endpoint(self.theta_init, 0, loss_func, method, loss_crit=self.loss_crit)
+
+    def time_get_endpoint(self, method, n_theta):
+        self.run(method, self.loss_func)
+
+    def peakmem_get_endpoint(self, method, n_theta):
+        self.run(method, self.loss_func)
+
+    def track_loss_calls(self, method, n_theta):
+        loss_func = CountingLoss(self.loss_func)
+        self.run(method, loss_func)
+        return loss_func.counter
+    track_loss_calls.unit = "calls"
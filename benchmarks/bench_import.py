@@ -0,0 +1,46 @@
+"""Import time of the package in a fresh interpreter, i.e. the startup cost paid by every
+short-lived worker process. Plotting and method modules must not be imported by the package.
+"""
+import subprocess
+import sys
+
+# the heavy modules which are loaded on first use only
+LAZY_MODULES = [
+    "matplotlib.pyplot",
+    "asyncio",
+    "likelihoodprofiler.cico_one_pass",
+    "likelihoodprofiler.method_quadr_extrapol",
+    "likelihoodprofiler.method_bracket_brent",
+    "likelihoodprofiler.method_surrogate",
+    "likelihoodprofiler.prediction_band",
+]
+
+
+class ImportSuite:
+    """import likelihoodprofiler in a new process."""
+    # numpy and nlopt are imported in setup to measure the package itself
+    def timeraw_import_package(self):
+        return "import likelihoodprofiler", "import numpy, nlopt"
+
+    def timeraw_import_with_numpy(self):
+        return "import likelihoodprofiler"
+
+    def track_lazy_modules_loaded(self):
+        code = "import sys, likelihoodprofiler; print(sum(m in sys.modules for m in {!r}))".format(LAZY_MODULES)
+        return int(subprocess.check_output([sys.executable, "-c", code]))
+    track_lazy_modules_loaded.unit = "modules"
+
+
+def import_time(statement, setup="pass", repeat=5):
+    """Minimal wall time of :code:`statement` after :code:`setup` in a fresh interpreter, seconds."""
+    code = "import time; {}; start = time.perf_counter(); {}; print(time.perf_counter() - start)".format(setup, statement)
+    return min(float(subprocess.check_output([sys.executable, "-c", code])) for i in range(repeat))
+
+
+if __name__ == "__main__":
+    print("import likelihoodprofiler                   {:8.1f} ms".format(import_time("import likelihoodprofiler") * 1e3))
+    print("import likelihoodprofiler (numpy, nlopt loaded) {:4.1f} ms".format(
+        import_time("import likelihoodprofiler", "import numpy, nlopt") * 1e3))
+    print("import likelihoodprofiler, matplotlib.pyplot {:8.1f} ms".format(
+        import_time("import likelihoodprofiler, matplotlib.pyplot") * 1e3))
+    print("lazy modules loaded: {}".format(ImportSuite().track_lazy_modules_loaded()))
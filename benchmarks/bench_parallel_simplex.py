@@ -0,0 +1,67 @@
+"""Sequential steps of local optimization: loss_func calls of NLOPT Nelder-Mead versus batches of
+ParallelSimplexBackend, i.e. the wall time for batch loss function or the pool with enough workers.
+"""
+import numpy as np
+
+from likelihoodprofiler.optimizers import NloptBackend
+from likelihoodprofiler.parallel_simplex import ParallelSimplexBackend
+
+from .models import chain_model
+
+BACKENDS = {
+    "nlopt": NloptBackend,
+    "parallel_simplex": ParallelSimplexBackend,
+    "parallel_simplex_speculative": lambda: ParallelSimplexBackend(speculative=True),
+}
+
+
+class Steps:
+    """Objective with batch attribute counting points and batches."""
+    def __init__(self, loss_func):
+        self.loss_func = loss_func
+        self.n_points = 0
+        self.n_batches = 0
+
+    def __call__(self, x, grad):
+        self.n_points += 1
+        self.n_batches += 1
+        return self.loss_func(x)
+
+    def batch(self, xs):
+        self.n_points += len(xs)
+        self.n_batches += 1
+        return [self.loss_func(x) for x in xs]
+
+
+class ParallelSimplexSuite:
+    params = (list(BACKENDS), [2, 5, 10, 20])
+    param_names = ["backend", "n_theta"]
+    timeout = 300
+
+    def run(self, backend, n_theta):
+        theta_init, loss_func, loss_crit = chain_model(n_theta)
+        steps = Steps(loss_func)
+        x, f, ret = BACKENDS[backend]().minimize(
+            steps, np.array(theta_init) + 0.5, np.full(n_theta, -np.inf), np.full(n_theta, np.inf), ftol_abs=1e-6
+            )
+        return steps, f
+
+    def time_minimize(self, backend, n_theta):
+        self.run(backend, n_theta)
+
+    def track_sequential_steps(self, backend, n_theta):
+        return self.run(backend, n_theta)[0].n_batches
+    track_sequential_steps.unit = "steps"
+
+    def track_loss_calls(self, backend, n_theta):
+        return self.run(backend, n_theta)[0].n_points
+    track_loss_calls.unit = "calls"
+
+
+if __name__ == "__main__":
+    suite = ParallelSimplexSuite()
+    for n_theta in ParallelSimplexSuite.params[1]:
+        for backend in ParallelSimplexSuite.params[0]:
+            steps, f = suite.run(backend, n_theta)
+            print("n_theta={:3d} {:30s} {:7d} steps {:7d} calls  minimum {:.6f}".format(
+                n_theta, backend, steps.n_batches, steps.n_points, f))
@@ -0,0 +1,53 @@
+"""Per-call overhead of the scale transformation wrapper around loss_func in get_endpoint.
+
+The legacy wrapper is the previous implementation of loss_func_gd: np.copy, Python loop
+over components with scalar unscaling() and a new list on every call.
+"""
+import numpy as np
+
+from likelihoodprofiler.support_math_func import ScaleTransform, unscaling
+
+
+def loss_func(theta):
+    return theta[0]
+
+
+def legacy_loss_func_gd(theta_gd, scale, theta_num):
+    theta_g = np.copy(theta_gd)
+    theta_g[theta_num] *= -1
+    theta = map(lambda i: unscaling(theta_g[i], scale[i]), range(len(scale)))
+    theta = list(theta)
+    return loss_func(theta)
+
+
+def transform_loss_func_gd(theta_gd, transform):
+    return loss_func(transform.unscale(theta_gd))
+
+
+class TimeScaleTransform:
+    params = ([5, 50, 500], ["direct", "log"])
+    param_names = ["n_theta", "scale"]
+
+    def setup(self, n_theta, scale):
+        self.scale = np.tile(scale, n_theta)
+        self.theta_gd = np.linspace(-1., 1., n_theta)
+        self.transform = ScaleTransform(self.scale, flip=0)
+
+    def time_legacy_wrapper(self, n_theta, scale):
+        legacy_loss_func_gd(self.theta_gd, self.scale, 0)
+
+    def time_transform_wrapper(self, n_theta, scale):
+        transform_loss_func_gd(self.theta_gd, self.transform)
+
+
+if __name__ == "__main__":
+    import timeit
+
+    bench = TimeScaleTransform()
+    for n_theta in TimeScaleTransform.params[0]:
+        for scale in TimeScaleTransform.params[1]:
+            bench.setup(n_theta, scale)
+            legacy = min(timeit.repeat(lambda: bench.time_legacy_wrapper(n_theta, scale), number=2000, repeat=5))
+            new = min(timeit.repeat(lambda: bench.time_transform_wrapper(n_theta, scale), number=2000, repeat=5))
+            print("n_theta={:4d} scale={:7s} legacy {:8.2f} us  transform {:6.2f} us  speedup {:5.1f}x".format(
+                n_theta, scale, legacy / 2000 * 1e6, new / 2000 * 1e6, legacy / new))
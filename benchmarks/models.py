@@ -0,0 +1,35 @@
+"""Test models for benchmarks: quadratic models from the test suite and synthetic models
+with growing number of parameters."""
+from likelihoodprofiler.tests import cases_func
+
+
+# name: (theta_init, loss_func, loss_crit)
+CASES = {
+    "f_2p": ([3., 4.1], cases_func.f_2p, 9.),
+    "f_3p_1im_dep": ([3., 2., 2.1], cases_func.f_3p_1im_dep, 9.),
+    "f_4p_2im": ([3., 4., 1.1, 10.], cases_func.f_4p_2im, 9.),
+    "f_5p_3im": ([3., 0.1, 4., 1.1, 8.], cases_func.f_5p_3im, 9.),
+}
+
+
+def chain_model(n_theta):
+    """Synthetic model with :code:`n_theta` coupled parameters, the interval of the first one is (1, 5)
+    for :code:`loss_crit = 9`."""
+    def loss_func(theta):
+        loss = 5.0 + (theta[0] - 3.0)**2
+        for i in range(1, n_theta):
+            loss += (theta[i] - theta[i-1] - 1.0)**2
+        return loss
+    theta_init = [3. + i for i in range(n_theta)]
+    return theta_init, loss_func, 9.
+
+
+class CountingLoss:
+    """Wrapper counting loss function calls."""
+    def __init__(self, loss_func):
+        self.loss_func = loss_func
+        self.counter = 0
+
+    def __call__(self, theta):
+        self.counter += 1
+        return self.loss_func(theta)
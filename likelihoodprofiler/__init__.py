@@ -1,14 +1,45 @@
-import sys
-import os
+import importlib
 
-filename = os.path.join("../../")
-sys.path.append(filename)
-filename = os.path.join("../")
-sys.path.append(filename)
-
-from .get_endpoint import get_endpoint
+# the functions with the same name as their module are imported eagerly:
+# the import of the submodule sets the package attribute to the module object
+from .get_endpoint import get_endpoint, iter_endpoint
 from .get_interval import get_interval
-from .cico_one_pass import get_right_endpoint_cico
+from .get_intervals import get_intervals
 from .get_right_endpoint_by_lin_extrapol import get_right_endpoint_by_lin_extrapol
-from .method_quadr_extrapol import get_right_endpoint_by_quadr_extrapol
-from .profile import profile
\ No newline at end of file
+from .profile import profile, marginal_profile
+from .profile_grid import profile_grid
+from .cache import EvaluationCache
+from .batch import vectorized
+from .tracing import EvaluationTracer
+from .checkpoint import Checkpoint
+from .structures import ProfilePoint, ProfilePointBatch, EndPointStep
+from .optimizers import OptimizerBackend, NloptBackend, ScipyBackend
+from .wald import get_wald_intervals, WaldIntervals
+
+# the other names are imported on first use to keep the package import cheap,
+# e.g. for short-lived worker processes
+_LAZY = {
+    "get_right_endpoint_cico": ".cico_one_pass",
+    "get_right_endpoint_by_quadr_extrapol": ".method_quadr_extrapol",
+    "get_right_endpoint_by_bracket_brent": ".method_bracket_brent",
+    "get_right_endpoint_by_surrogate": ".method_surrogate",
+    "EvaluationLog": ".evaluation_log",
+    "get_interval_async": ".get_interval_async",
+    "get_endpoint_async": ".get_interval_async",
+    "get_prediction_band": ".prediction_band",
+    "PredictionBand": ".prediction_band",
+    "render_report": ".report",
+    "ParallelSimplexBackend": ".parallel_simplex",
+}
+
+
+def __getattr__(name):
+    if name not in _LAZY:
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+    value = getattr(importlib.import_module(_LAZY[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY))
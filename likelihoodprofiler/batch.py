@@ -0,0 +1,93 @@
+import numpy as np
+
+
+def vectorized(loss_func):
+    """Marks :code:`loss_func` as batch loss function. The batch loss function takes
+    2-D array of parameter vectors (one vector per row) and returns 1-D array of losses.
+    Can be used as decorator.
+
+    Parameters
+    ----------
+    loss_func : Function
+        batch loss function :math:`\\Lambda\\left(\\Theta_{k,:}\\right)_k`.
+
+    Returns
+    -------
+    Function
+        the same :code:`loss_func` with attribute :code:`vectorized = True`.
+
+    """
+    loss_func.vectorized = True
+    return loss_func
+
+
+def is_vectorized(loss_func):
+    """Checks if :code:`loss_func` follows batch protocol, see :code:`vectorized`."""
+    return getattr(loss_func, "vectorized", False)
+
+
+class ScalarLossFunc:
+    """Scalar wrapper of batch :code:`loss_func`: the call with parameter vector is one-row batch,
+    the batches are calculated by :code:`batch` method at once. The wrappers of the package, e.g. cache
+    and tracer, keep :code:`batch` method, so the batches reach :code:`loss_func` through them.
+
+    Parameters
+    ----------
+    loss_func : Function
+        batch loss function, see :code:`vectorized`.
+    """
+    def __init__(self, loss_func):
+        self.loss_func = loss_func
+
+    def __call__(self, theta):
+        return self.batch([theta])[0]
+
+    def batch(self, thetas):
+        return batch_loss(self.loss_func, thetas, True)
+
+
+def scalar_loss(loss_func):
+    """Scalar version of :code:`loss_func`: :code:`ScalarLossFunc` for the batch loss function,
+    the scalar function is returned without changes."""
+    if not is_vectorized(loss_func):
+        return loss_func
+    return ScalarLossFunc(loss_func)
+
+
+def batch_method(loss_func):
+    """Returns :code:`batch` method of the wrapper, e.g. :code:`ScalarLossFunc`, or :code:`None` if
+    :code:`loss_func` calculates one point per call."""
+    return getattr(loss_func, "batch", None)
+
+
+def batch_loss(loss_func, thetas, vectorized=None):
+    """Calculates :code:`loss_func` for several parameter vectors.
+
+    Parameters
+    ----------
+    loss_func : Function
+        loss function, scalar or batch.
+    thetas : Array[Array[Float64]]
+        2-D array of parameter vectors, one vector per row.
+    vectorized : Bool or None
+        :code:`True` if :code:`loss_func` takes 2-D array. The default :code:`None` uses :code:`batch` method of the
+        wrapper if it exists or checks :code:`is_vectorized(loss_func)`. Scalar loss function is called row by row.
+
+    Returns
+    -------
+    Array[Float64]
+        1-D array of losses.
+
+    """
+    thetas = np.atleast_2d(np.asarray(thetas, dtype=np.float64))
+    if vectorized is None:
+        batch = batch_method(loss_func)
+        if batch is not None:
+            return np.asarray(batch(thetas), dtype=np.float64).reshape(len(thetas))
+        vectorized = is_vectorized(loss_func)
+
+    if vectorized:
+        losses = np.asarray(loss_func(thetas), dtype=np.float64).reshape(len(thetas))
+    else:
+        losses = np.fromiter((loss_func(theta) for theta in thetas), dtype=np.float64, count=len(thetas))
+    return losses
@@ -0,0 +1,31 @@
+import math
+import time
+
+
+def resolve_deadline(time_budget=None, deadline=None):
+    """Applies :code:`time_budget` and :code:`deadline` options of the public functions.
+
+    Parameters
+    ----------
+    time_budget : Float64 or None
+        wall time for the search from now, seconds.
+    deadline : Float64 or None
+        moment to stop the search as :code:`time.monotonic()` value.
+
+    Returns
+    -------
+    Float64 or None
+        the earliest of both moments or :code:`None` if no limit is set.
+    """
+    if time_budget is not None:
+        budget_deadline = time.monotonic() + time_budget
+        deadline = budget_deadline if deadline is None else min(deadline, budget_deadline)
+    return deadline
+
+
+def time_left(deadline):
+    """Seconds before :code:`deadline`, :code:`inf` for :code:`None`."""
+    if deadline is None:
+        return math.inf
+    return deadline - time.monotonic()
+
@@ -0,0 +1,173 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from .batch import batch_method, scalar_loss
+
+
+class EvaluationCache:
+    """Bounded LRU storage of :code:`loss_func` values keyed on the parameter vector.
+
+    One cache must be used for one :code:`loss_func` only because the function itself is not
+    the part of the key.
+
+    Parameters
+    ----------
+    maxsize : Int or None
+        maximal number of stored points. The least recently used point is evicted when the size is exceeded.
+        :code:`None` means unbounded cache.
+    decimals : Int or None
+        number of decimals to round the parameter vector before lookup. :code:`None` means exact match.
+
+    Attributes
+    ----------
+    hits : Int
+        number of lookups served from the cache.
+    misses : Int
+        number of lookups which required :code:`loss_func` call.
+    """
+    def __init__(self, maxsize=1024, decimals=None):
+        self.maxsize = maxsize
+        self.decimals = decimals
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # locks cannot be pickled, required for process pools
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def key(self, theta):
+        theta = np.asarray(theta, dtype=np.float64)
+        if self.decimals is not None:
+            # adding zero turns -0.0 into 0.0
+            theta = np.round(theta, self.decimals) + 0.0
+        return theta.tobytes()
+
+    def lookup(self, theta, loss_func):
+        """Returns cached value for :code:`theta` or calls :code:`loss_func` and stores the result."""
+        key = self.key(theta)
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+
+        loss = loss_func(theta)
+
+        with self._lock:
+            self._data[key] = loss
+            self._data.move_to_end(key)
+            if self.maxsize is not None and len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return loss
+
+    def lookup_batch(self, thetas, batch):
+        """Returns cached values for rows of :code:`thetas`, the missing rows are calculated by :code:`batch` function as one batch."""
+        thetas = np.atleast_2d(np.asarray(thetas, dtype=np.float64))
+        keys = [self.key(theta) for theta in thetas]
+        losses = np.empty(len(thetas))
+        missing = []
+        with self._lock:
+            for i, key in enumerate(keys):
+                if key in self._data:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    losses[i] = self._data[key]
+                else:
+                    self.misses += 1
+                    missing.append(i)
+
+        if len(missing) == 0:
+            return losses
+        losses[missing] = np.asarray(batch(thetas[missing]), dtype=np.float64).reshape(len(missing))
+
+        with self._lock:
+            for i in missing:
+                self._data[keys[i]] = losses[i]
+                self._data.move_to_end(keys[i])
+            while self.maxsize is not None and len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return losses
+
+    def wrap(self, loss_func):
+        """Returns cached version of :code:`loss_func`."""
+        return CachedLossFunc(loss_func, self)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def cache_info(self):
+        """Returns statistics as dictionary with keys: :code:`hits, misses, maxsize, currsize`."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "maxsize": self.maxsize,
+            "currsize": len(self._data)
+        }
+
+
+class CachedLossFunc:
+    """Callable wrapper of :code:`loss_func` using :code:`EvaluationCache`. If :code:`loss_func` has :code:`batch`
+    method, see :code:`ScalarLossFunc`, the wrapper has it too and only missing rows are calculated.
+
+    Parameters
+    ----------
+    loss_func : Function
+        original loss function.
+    cache : EvaluationCache
+        storage of the values.
+    """
+    def __init__(self, loss_func, cache):
+        self.loss_func = loss_func
+        self.cache = cache
+        if batch_method(loss_func) is not None:
+            self.batch = self._batch
+
+    def __call__(self, theta):
+        return self.cache.lookup(theta, self.loss_func)
+
+    def _batch(self, thetas):
+        return self.cache.lookup_batch(thetas, self.loss_func.batch)
+
+
+def cached_loss_func(loss_func, cache):
+    """Applies :code:`cache` option of the public functions to :code:`loss_func`.
+
+    Parameters
+    ----------
+    loss_func : Function
+        loss function.
+    cache : Bool or EvaluationCache or None
+        :code:`True` creates a new :code:`EvaluationCache` with default options,
+        :code:`None` or :code:`False` returns :code:`loss_func` without changes. The batch loss function,
+        see :code:`vectorized`, is turned to :code:`ScalarLossFunc` first.
+
+    Returns
+    -------
+    Function
+        loss function to use.
+    """
+    loss_func = scalar_loss(loss_func)
+    if cache is None or cache is False:
+        return loss_func
+    if cache is True:
+        cache = EvaluationCache()
+    if not isinstance(cache, EvaluationCache):
+        raise ValueError("cache must be bool or EvaluationCache, got {}".format(type(cache)))
+    return cache.wrap(loss_func)
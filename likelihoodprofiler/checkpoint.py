@@ -0,0 +1,110 @@
+import os
+import pickle
+import time
+
+import numpy as np
+
+# statuses which are not final for resume
+RETRY_STATUSES = ["MAX_ITER_STOP", "LOSS_ERROR_STOP", "TIME_BUDGET_STOP"]
+
+
+class Checkpoint:
+    """Local file storing the state of endpoint search. The state is saved periodically
+    during the search and the final result is saved when the search ends, so the search
+    can be continued with :code:`resume=True` after the process dies.
+
+    Parameters
+    ----------
+    path : String
+        path to the checkpoint file.
+    interval : Float64
+        minimal time between saves, seconds. :code:`0` saves after every step.
+    fingerprint : Dict or None
+        inputs of the search saved with the state, see :code:`bind`. :code:`load` rejects the state saved
+        with another fingerprint.
+    """
+    def __init__(self, path, interval=60., fingerprint=None):
+        self.path = path
+        self.interval = interval
+        self.fingerprint = fingerprint
+        self._last_save = None
+
+    def derive(self, suffix):
+        """Returns checkpoint in the neighbour file, it is used to store left and right endpoints separately."""
+        return Checkpoint("{}.{}".format(self.path, suffix), self.interval, self.fingerprint)
+
+    def bind(self, **inputs):
+        """Returns checkpoint of the same file with the fingerprint of search :code:`inputs`, e.g. :code:`theta_init,
+        loss_crit, scan_bound` and tolerances. The checkpoint already bound by the caller is returned without changes,
+        i.e. the fingerprint of the public function in original scale is used instead of the method one."""
+        if self.fingerprint is not None:
+            return self
+        checkpoint = Checkpoint(self.path, self.interval, {key: _plain(value) for key, value in inputs.items()})
+        checkpoint._last_save = self._last_save
+        return checkpoint
+
+    def save(self, state):
+        """Writes :code:`state` dictionary. The file is replaced atomically, so the previous state
+        is kept if the process dies during writing."""
+        if self.fingerprint is not None:
+            state = dict(state, fingerprint=self.fingerprint)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(state, f)
+        os.replace(tmp_path, self.path)
+        self._last_save = time.monotonic()
+
+    def maybe_save(self, get_state):
+        """Saves :code:`get_state()` if :code:`interval` is passed since the last save."""
+        if self._last_save is None or time.monotonic() - self._last_save >= self.interval:
+            self.save(get_state())
+
+    def save_result(self, method, result, counter):
+        """Saves the final result :code:`[value, profile_points, status]` of the method and returns it.
+        The results stopped by errors or limits are not saved, so :code:`resume` continues from the last state."""
+        if result[2] not in RETRY_STATUSES:
+            self.save({"method": method, "result": result, "counter": counter})
+        return result
+
+    def load(self, method=None):
+        """Reads the state or returns :code:`None` if the file does not exist.
+
+        Parameters
+        ----------
+        method : String or None
+            expected method, :code:`ValueError` is raised if the state was saved by another method.
+            :code:`ValueError` is raised as well if the state was saved with another :code:`fingerprint`.
+        """
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path, "rb") as f:
+            state = pickle.load(f)
+        if method is not None and state["method"] != method:
+            raise ValueError("Checkpoint {} is created by method {}, not {}".format(self.path, state["method"], method))
+        saved = state.get("fingerprint")
+        if self.fingerprint is not None and saved is not None and saved != self.fingerprint:
+            changed = sorted(key for key in set(saved) | set(self.fingerprint) if saved.get(key) != self.fingerprint.get(key))
+            raise ValueError("Checkpoint {} is created with other {}".format(self.path, ", ".join(changed)))
+        return state
+
+    def clear(self):
+        """Removes the checkpoint file."""
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def as_checkpoint(checkpoint, **inputs):
+    """Applies :code:`checkpoint` option of the public functions: path or :code:`Checkpoint` or :code:`None`.
+    The search :code:`inputs` are bound as the fingerprint, see :code:`Checkpoint.bind`."""
+    if checkpoint is None:
+        return None
+    if not isinstance(checkpoint, Checkpoint):
+        checkpoint = Checkpoint(checkpoint)
+    return checkpoint.bind(**inputs) if inputs else checkpoint
+
+
+def _plain(value):
+    # arrays and numpy scalars are compared as lists and Python numbers
+    if isinstance(value, (np.ndarray, np.generic, list, tuple)):
+        return np.asarray(value).tolist()
+    return value
@@ -1,10 +1,17 @@
-import math
+import threading
 import warnings
 
 import numpy as np
 import nlopt
 
 from .structures import ProfilePoint
+from .cache import cached_loss_func
+from .batch import batch_method
+from .tracing import traced_loss_func, tracer_context
+from .gradient import finite_difference_gradient, resolve_gradient
+from .checkpoint import as_checkpoint
+from .budget import resolve_deadline, time_left
+from .optimizers import as_backend, check_local_alg, ForcedStop, FAILURE, ROUNDOFF_LIMITED
 
 
 def get_right_endpoint_cico(
@@ -30,10 +37,16 @@ def get_right_endpoint_cico(
         nonlocal theta_num
         return theta[theta_num]
 
+    def scan_grad(theta):
+        grad = np.zeros(len(theta))
+        grad[theta_num] = 1.
+        return grad
+
     return get_right_endpoint_cico_with_scan_func(
         theta_init,
         loss_func,
         scan_func,
+        scan_grad=scan_grad,
         theta_bounds=theta_bounds,
         scan_bound=scan_bound,
         scan_tol=scan_tol,
@@ -54,78 +67,131 @@ def get_right_endpoint_cico_with_scan_func(
     loss_tol=1e-3,  # i do not know how to use it
     # good results in :LN_NELDERMEAD, :LN_COBYLA, :LN_PRAXIS,
     # errors in :LN_BOBYQA, :LN_SBPLX, :LN_NEWUOA
+    # gradient-based :LD_LBFGS, :LD_SLSQP, :LD_MMA are used under :AUGLAG
     local_alg=nlopt.LN_NELDERMEAD,
     # options for local fitter :max_iter
     # ftol_abs=1e-3,
     max_iter=10**5,
+    cache=None,  # EvaluationCache or True to memoize loss_func
+    grad_func=None,  # gradient of loss_func or "loss" for (loss, grad) output, see profile()
+    scan_grad=None,  # gradient of scan_func, finite differences by default
+    tracer=None,  # EvaluationTracer to record loss_func calls
+    checkpoint=None,  # path or Checkpoint to save the best feasible point
+    resume=False,  # start from the checkpoint point
+    time_budget=None,  # wall time limit, seconds
+    deadline=None,  # time.monotonic() value to stop
+    initial_step=None,  # initial step of optimizer for every component, e.g. from WaldIntervals
     **kwargs
 ):
     if (theta_bounds is None):
         theta_bounds = np.tile([(-1)*np.inf, np.inf], (len(theta_init), 1))
 
+    loss_func, grad_func = resolve_gradient(loss_func, grad_func)
+    # the final loss_func(optx) is taken from the cache
+    loss_func = cached_loss_func(traced_loss_func(loss_func, tracer), cache)
+
     # dim of the theta vector
     n_theta = len(theta_init)
 
     # checking arguments
-    # methods which are not supported
-    if local_alg in [nlopt.LN_BOBYQA, nlopt.LN_SBPLX, nlopt.LN_NEWUOA]:
-        warnings.warn("Using current local_alg may result in wrong output.",  DeprecationWarning, stacklevel=2)
+    check_local_alg(local_alg, theta_init)
 
-    # when using :LN_NELDERMEAD initial parameters should not be zero
-    if local_alg == nlopt.LN_NELDERMEAD:
-        zeroParameter = [math.isclose(theta_init[i], 0., abs_tol=1e-2) for i in range(n_theta)]
-        if any(zeroParameter):
-            warnings.warn("Close-to-zero parameters found when using LN_NELDERMEAD.", DeprecationWarning, stacklevel=2)
-            print(np.where(zeroParameter))
+    deadline = resolve_deadline(time_budget, deadline)
+
+    checkpoint = as_checkpoint(checkpoint, theta_init=theta_init, scan_bound=scan_bound,
+                               scan_tol=scan_tol, loss_tol=loss_tol)
+    state = checkpoint.load("CICO_ONE_PASS") if (checkpoint is not None and resume) else None
+    if state is not None and "result" in state:
+        return state["result"]
 
     # optimizer
-    local_opt = nlopt.opt(local_alg, n_theta)
-    local_opt.set_ftol_abs(scan_tol)  # ftol_abs
+    backend = as_backend(local_alg)
 
     # Constraints function
     out_of_bound = False
+    counter = 0
+    # the best point inside critical level is the start point after resume
+    # and the partial result after timeout
+    best_x, best_scan, best_loss = None, None, None
+    if state is not None:
+        counter, best_x, best_loss = state["counter"], state["theta"], state["loss"]
+        best_scan = scan_func(best_x)
+        theta_init = best_x
+    # the state is changed under the lock, the backends can call the constraint from several threads
+    lock = threading.Lock()
+
+    def record(x, loss, n_calls):
+        nonlocal out_of_bound, counter, best_x, best_scan, best_loss
+        with lock:
+            counter += n_calls
+
+            if loss < 0:
+                scan = scan_func(x)
+                if scan > scan_bound:
+                    out_of_bound = True
+                    raise ForcedStop("Out of the scan bound but in ll constraint.")
+                if best_scan is None or scan > best_scan:
+                    best_x, best_scan, best_loss = np.array(x), scan, loss
+            if checkpoint is not None and best_x is not None:
+                checkpoint.maybe_save(lambda: {"method": "CICO_ONE_PASS", "theta": best_x, "loss": best_loss, "counter": counter})
+        return loss
+
     def constraints_func(x, g):
-        nonlocal out_of_bound
+        n_calls = 1
         try:
             loss = loss_func(x)
+            # gradient is required for gradient-based local algorithms only
+            if g.size > 0:
+                if grad_func is None:
+                    g[:] = finite_difference_gradient(loss_func, x, loss)
+                    n_calls += n_theta
+                else:
+                    g[:] = grad_func(x)
         except:
             warnings.warn("Error when call loss_func{}".format(x), UserWarning, stacklevel=2)
-            raise nlopt.ForcedStop("loss function error.")
-
-        if (loss < 0) and (scan_func(x) > scan_bound):
-            out_of_bound = True
-            raise nlopt.ForcedStop("Out of the scan bound but in ll constraint.")
-        else:
-            return loss
-
-    # constrain optimizer
-    opt = nlopt.opt(nlopt.LN_AUGLAG, n_theta)
-    opt.set_ftol_abs(scan_tol)
-    opt.set_max_objective(lambda x, g: scan_func(x))
-    """
-    lb = [theta_bounds[i][0] for i in range(n_theta)]  # minimum.(theta_bounds)
-    ub = [theta_bounds[i][1] for i in range(n_theta)]  # maximum.(theta_bounds)
-    opt.set_lower_bounds(lb)
-    opt.set_upper_bounds(ub)
-    """
-    opt.set_local_optimizer(local_opt)
-    opt.set_maxeval(max_iter)
-
-    # inequality constraints
-    opt.add_inequality_constraint(constraints_func, loss_tol)
-    for i in range(n_theta):
-        opt.add_inequality_constraint(lambda x, g: x[i] - theta_bounds[i][1], 0)
-    for i in range(n_theta):
-        opt.add_inequality_constraint(lambda x, g: theta_bounds[i][0] - x[i], 0)
-    # start optimization
-    try:
-        optx = opt.optimize(theta_init)
-        optf = opt.last_optimum_value()
-        ret = opt.last_optimize_result()
-    except nlopt.ForcedStop:
-        ret = -5
-
-    if ret == -5 and not out_of_bound:
+            raise ForcedStop("loss function error.")
+        return record(x, loss, n_calls)
+
+    batch = batch_method(loss_func)
+    if batch is not None:
+        # the backends evaluating several points at once call the batch loss_func
+        def constraints_func_batch(xs):
+            try:
+                losses = np.asarray(batch(xs), dtype=np.float64)
+            except:
+                warnings.warn("Error when call loss_func{}".format(xs), UserWarning, stacklevel=2)
+                raise ForcedStop("loss function error.")
+            for x, loss in zip(xs, losses):
+                record(x, loss, 1)
+            return losses
+        constraints_func.batch = constraints_func_batch
+
+    def objective_func(x, g):
+        scan = scan_func(x)
+        if g.size > 0:
+            g[:] = finite_difference_gradient(scan_func, x, scan) if scan_grad is None else scan_grad(x)
+        return scan
+
+    # inequality constraint for loss, theta_bounds are native bounds of the optimizer,
+    # i.e. one Python callback per evaluation instead of 2 n_theta + 1
+    constraints = [(constraints_func, loss_tol)]
+    theta_bounds = np.asarray(theta_bounds, dtype=np.float64)
+    # start constrained optimization, ret is 6 (MAXTIME_REACHED) when the deadline is passed
+    with tracer_context(tracer, stage="constrained_optim"):
+        optx, optf, ret = backend.maximize_constrained(
+            objective_func,
+            constraints,
+            theta_init,
+            ftol_abs=scan_tol,
+            maxeval=max_iter,
+            maxtime=None if deadline is None else time_left(deadline),
+            initial_step=initial_step,
+            lb=theta_bounds[:, 0],
+            ub=theta_bounds[:, 1]
+            )
+
+    if (ret == -5 and not out_of_bound) or ret in (FAILURE, ROUNDOFF_LIMITED):
+        # the failures of optimizer, e.g. no feasible point or non-finite loss_func
         pp = []
         res = [None, pp, "LOSS_ERROR_STOP"]
     elif ret == 5:
@@ -135,10 +201,18 @@ def get_right_endpoint_cico_with_scan_func(
         pp = []
         res = [None, pp, "SCAN_BOUND_REACHED"]
     elif ret == 3:
-        loss = loss_func(optx)
-        pp = [ProfilePoint(optf, loss, optx, ret, None)]
+        with tracer_context(tracer, stage="final_check"):
+            loss = loss_func(optx)
+        counter += 1
+        pp = [ProfilePoint(optf, loss, optx, ret, counter)]
         res = [optf, pp, "BORDER_FOUND_BY_SCAN_TOL"]
+    elif ret == 6:
+        # the best point inside critical level found before timeout
+        pp = [] if best_x is None else [ProfilePoint(best_scan, best_loss, best_x, ret, counter)]
+        res = [None, pp, "TIME_BUDGET_STOP"]
     else:
         raise RuntimeError("No interpretation of the optimization results.")
 
+    if checkpoint is not None:
+        checkpoint.save_result("CICO_ONE_PASS", res, counter)
     return res
@@ -0,0 +1,245 @@
+import os
+import threading
+
+import numpy as np
+
+from .batch import scalar_loss
+
+# file starts with magic bytes and number of parameters (int64)
+_MAGIC = b"LPEVLOG1"
+_HEADER_SIZE = 16
+
+
+class EvaluationLog:
+    """Append-only file of :code:`loss_func` evaluations. Every record is :code:`n_theta + 1` float64
+    values: parameter vector and loss. The stored records are read through :code:`numpy.memmap`, so
+    large logs are not loaded into memory. The log is used to replay the analysis without the model,
+    see :code:`replay`.
+
+    One log must be used for one :code:`loss_func` only because the function itself is not stored.
+    The records are only appended to the end of the file, so several logs of the same path, e.g. in different
+    threads, do not overwrite each other and the records of the others are found after the next :code:`append`.
+    The log cannot be shared by processes.
+
+    Parameters
+    ----------
+    path : String
+        path to the log file. The existing file is opened for appending.
+    n_theta : Int or None
+        length of parameter vector. :code:`None` means it is taken from the existing file or from the first record.
+
+    Attributes
+    ----------
+    hits : Int
+        number of lookups served from the log.
+    misses : Int
+        number of lookups not found in the log.
+    """
+    def __init__(self, path, n_theta=None):
+        self.path = path
+        self.n_theta = n_theta
+        self.hits = 0
+        self.misses = 0
+        self._size = 0  # number of complete records
+        self._indexed = 0  # number of records in the indexes
+        self._index = {}  # exact key -> record number
+        self._grids = {}  # atol -> {cell of first component -> record numbers}
+        self._map = None
+        self._file = None
+        self._lock = threading.Lock()
+
+        if os.path.exists(path):
+            self._check_header()
+            # the incomplete last record after crash is cut off, the next record is appended after the complete ones
+            size = os.path.getsize(path)
+            self._size = (size - _HEADER_SIZE) // self._record_bytes()
+            if _HEADER_SIZE + self._size * self._record_bytes() != size:
+                with open(path, "r+b") as f:
+                    f.truncate(_HEADER_SIZE + self._size * self._record_bytes())
+            self._sync()
+
+    def _check_header(self):
+        with open(self.path, "rb") as f:
+            header = f.read(_HEADER_SIZE)
+        if len(header) < _HEADER_SIZE or header[0:8] != _MAGIC:
+            raise ValueError("{} is not an evaluation log".format(self.path))
+        n_theta_file = int.from_bytes(header[8:16], "little")
+        if self.n_theta is not None and self.n_theta != n_theta_file:
+            raise ValueError("Log {} stores {} parameters, not {}".format(self.path, n_theta_file, self.n_theta))
+        self.n_theta = n_theta_file
+
+    def _record_bytes(self):
+        return (self.n_theta + 1) * 8
+
+    def _records(self):
+        if self._size == 0:
+            return np.zeros((0, (self.n_theta or 0) + 1))
+        # the map is created again only when the records appended after the last mapping are read
+        if self._map is None or len(self._map) < self._size:
+            self._map = np.memmap(self.path, dtype=np.float64, mode="r", offset=_HEADER_SIZE,
+                                  shape=(self._size, self.n_theta + 1))
+        return self._map[0:self._size]
+
+    def _add_to_indexes(self, i, theta):
+        self._index.setdefault(self.key(theta), i)
+        for atol, grid in self._grids.items():
+            grid.setdefault(_cell(theta[0], atol), []).append(i)
+        self._indexed = i + 1
+
+    def _sync(self):
+        """Adds the records written after the last indexing, e.g. by other :code:`EvaluationLog` of the same file."""
+        if self._indexed < self._size:
+            thetas = np.array(self.thetas[self._indexed:self._size])
+            for i, theta in enumerate(thetas, self._indexed):
+                self._add_to_indexes(i, theta)
+
+    def _grid(self, atol):
+        grid = self._grids.get(atol)
+        if grid is None:
+            grid = {}
+            for i, x in enumerate(np.array(self.thetas[0:self._indexed, 0])):
+                grid.setdefault(_cell(x, atol), []).append(i)
+            self._grids[atol] = grid
+        return grid
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def thetas(self):
+        """Memory mapped 2-D array of stored parameter vectors."""
+        return self._records()[:, 0:-1]
+
+    @property
+    def losses(self):
+        """Memory mapped array of stored loss values."""
+        return self._records()[:, -1]
+
+    @staticmethod
+    def key(theta):
+        # adding zero turns -0.0 into 0.0
+        return (np.asarray(theta, dtype=np.float64) + 0.0).tobytes()
+
+    def append(self, theta, loss):
+        """Writes one evaluation to the end of the file. The file is opened once and kept open for appending,
+        see :code:`close`."""
+        theta = np.asarray(theta, dtype=np.float64)
+        with self._lock:
+            if self.n_theta is None and os.path.exists(self.path):
+                self._check_header()
+            if self.n_theta is None:
+                self.n_theta = len(theta)
+            if len(theta) != self.n_theta:
+                raise ValueError("Log {} stores {} parameters, got {}".format(self.path, self.n_theta, len(theta)))
+            if self._file is None:
+                self._file = open(self.path, "ab")
+                if self._file.tell() == 0:
+                    self._file.write(_MAGIC + self.n_theta.to_bytes(8, "little"))
+                    self._file.flush()
+            self._file.write(np.append(theta, loss).astype(np.float64).tobytes())
+            self._file.flush()
+            size = (os.fstat(self._file.fileno()).st_size - _HEADER_SIZE) // self._record_bytes()
+            if size == self._size + 1 and self._indexed == self._size:
+                self._size = size
+                self._add_to_indexes(size - 1, theta)
+            else:
+                # other writer has appended records to the same file
+                self._size = size
+                self._sync()
+
+    def close(self):
+        """Closes the file opened for appending. The next :code:`append` opens it again."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def find(self, theta, atol=0.):
+        """Returns the stored loss for :code:`theta` or :code:`None`.
+
+        Parameters
+        ----------
+        theta : Array[Float64]
+            parameter vector.
+        atol : Float64
+            absolute tolerance for every component. :code:`0` means exact match, otherwise the nearest record
+            (by maximal component difference) within the tolerance is used. The candidates are taken from
+            the grid of the first component with the step :code:`atol`, so the lookup does not scan the whole log.
+        """
+        with self._lock:
+            i = self._index.get(self.key(theta))
+            if i is None and atol > 0 and self._indexed > 0:
+                theta = np.asarray(theta, dtype=np.float64)
+                grid = self._grid(atol)
+                cell = _cell(theta[0], atol)
+                candidates = sorted(grid.get(cell - 1, []) + grid.get(cell, []) + grid.get(cell + 1, []))
+                if candidates:
+                    distance = np.max(np.abs(self.thetas[candidates] - theta), axis=1)
+                    nearest = int(np.argmin(distance))
+                    if distance[nearest] <= atol:
+                        i = candidates[nearest]
+            if i is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return float(self.losses[i])
+
+    def record(self, loss_func):
+        """Returns version of :code:`loss_func` which appends every call to the log."""
+        return ReplayLossFunc(self, loss_func, replay=False)
+
+    def replay(self, loss_func=None, atol=0.):
+        """Returns function serving the values from the log. The points which are not found are calculated
+        by :code:`loss_func` and appended to the log. Without :code:`loss_func` the miss raises :code:`KeyError`,
+        i.e. the analysis repeated with the same options runs without the model.
+
+        Parameters
+        ----------
+        loss_func : Function or None
+            real loss function for the missing points.
+        atol : Float64
+            tolerance of parameter matching, see :code:`find`.
+        """
+        return ReplayLossFunc(self, loss_func, atol=atol)
+
+    def info(self):
+        """Returns statistics as dictionary with keys: :code:`hits, misses, size`."""
+        return {"hits": self.hits, "misses": self.misses, "size": self._size}
+
+
+class ReplayLossFunc:
+    """Callable wrapper of :code:`loss_func` using :code:`EvaluationLog`.
+
+    Parameters
+    ----------
+    log : EvaluationLog
+        storage of evaluations.
+    loss_func : Function or None
+        original loss function.
+    atol : Float64
+        tolerance of parameter matching.
+    replay : Bool
+        :code:`False` calls :code:`loss_func` for every point and only records the values.
+    """
+    def __init__(self, log, loss_func=None, atol=0., replay=True):
+        self.log = log
+        self.loss_func = None if loss_func is None else scalar_loss(loss_func)
+        self.atol = atol
+        self.replay = replay
+
+    def __call__(self, theta):
+        if self.replay:
+            loss = self.log.find(theta, self.atol)
+            if loss is not None:
+                return loss
+            if self.loss_func is None:
+                raise KeyError("theta {} is not found in the log {}".format(list(theta), self.log.path))
+        loss = self.loss_func(theta)
+        self.log.append(theta, loss)
+        return loss
+
+
+def _cell(x, atol):
+    if not np.isfinite(x):
+        return float(x)
+    return int(np.floor(x / atol))
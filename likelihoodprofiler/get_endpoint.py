@@ -1,9 +1,18 @@
+import threading
+
 import numpy as np
 import nlopt
 
-from .support_math_func import scaling, unscaling
-from .structures import ProfilePoint, EndPoint
-from .get_right_endpoint import get_right_endpoint
+from .support_math_func import unscaling, ScaleTransform
+from .structures import ProfilePoint, EndPoint, EndPointStep
+from .get_right_endpoint import iter_right_endpoint, run_to_end
+from .cache import cached_loss_func
+from .batch import batch_method
+from .gradient import resolve_gradient
+from .tracing import traced_loss_func, tracer_context
+from .checkpoint import as_checkpoint
+from .budget import resolve_deadline
+from .wald import get_wald_intervals
 
 
 def get_endpoint(
@@ -19,6 +28,14 @@ def get_endpoint(
     scan_tol=1e-3,
     loss_tol=1e-3,
     local_alg=nlopt.LN_NELDERMEAD,
+    cache=None,
+    grad_func=None,
+    tracer=None,
+    checkpoint=None,
+    resume=False,
+    time_budget=None,
+    deadline=None,
+    wald=None,
     **kwargs):
     """Calculates right or left endpoint of CI for parameter component. It is a wripper
     of `get_right_endpoint` functions for selection of direction and using different
@@ -33,7 +50,7 @@ def get_endpoint(
     loss_func : Function
         loss function :math:`\\Lambda\\left(\\Theta\\right)` the profile of which is analyzed. Usually we use log-likelihood for profile analysis in form :math:`\\Lambda( \\theta ) = - 2 ln\\left( L(\\Theta) \\right)`.
     method : String
-        computational method to evaluate interval endpoint. Currently the following methods are implemented: :code:`"CICO_ONE_PASS"`, :code:`"LIN_EXTRAPOL"`, :code:`"QUADR_EXTRAPOL"`.
+        computational method to evaluate interval endpoint. Currently the following methods are implemented: :code:`"CICO_ONE_PASS"`, :code:`"LIN_EXTRAPOL"`, :code:`"QUADR_EXTRAPOL"`, :code:`"BRACKET_BRENT"`, :code:`"SURROGATE"`.
     direction : String
         :code:`"right"` or :code:`"left"` endpoint to estimate.
     loss_crit : Float64
@@ -49,7 +66,23 @@ def get_endpoint(
     loss_tol : Float64
         Absolute tolerance of :code:`loss_func` at :code:`loss_crit` (stop criterion). *Restriction*. Currently is not effective for :code:`nlopt.CICO_ONE_PASS` methods because of limitation in :code:`nlopt.LN_AUGLAG` interface.
     local_alg : Function
-        algorithm of optimization. Currently the local derivation free algorithms form NLOPT pack were tested. The methods: :code:`nlopt.LN_NELDERMEAD, nlopt.LN_COBYLA, nlopt.LN_PRAXIS` show good results. Methods: :code:`nlopt.LN_BOBYQA, nlopt.LN_SBPLX, nlopt.LN_NEWUOA` is not recommended.
+        algorithm of optimization. Currently the local derivation free algorithms form NLOPT pack were tested. The methods: :code:`nlopt.LN_NELDERMEAD, nlopt.LN_COBYLA, nlopt.LN_PRAXIS` show good results. Methods: :code:`nlopt.LN_BOBYQA, nlopt.LN_SBPLX, nlopt.LN_NEWUOA` is not recommended. Other optimizers are set by :code:`"scipy:<method>"` string, e.g. :code:`"scipy:L-BFGS-B"`, or :code:`OptimizerBackend` object, see :code:`likelihoodprofiler.optimizers`.
+    cache : Bool or EvaluationCache or None
+        memoizes :code:`loss_func` values so repeated points are not calculated twice. :code:`True` creates :code:`EvaluationCache` with default options. The default :code:`None` means no caching.
+    grad_func : Function or String or None
+        gradient of :code:`loss_func` for :code:`nlopt.LD_*` algorithms: function of parameter vector or :code:`"loss"` if :code:`loss_func` returns tuple :code:`(loss, grad)`. The default :code:`None` means finite differences.
+    tracer : EvaluationTracer or None
+        records every :code:`loss_func` call with method, direction and stage, see :code:`EvaluationTracer`. Works in the current process only, i.e. not for :code:`"process"` mode.
+    checkpoint : String or Checkpoint or None
+        file to save the search state periodically and the result at the end, see :code:`Checkpoint`. The default :code:`None` means no saving.
+    resume : Bool
+        continues the search from :code:`checkpoint` state if it exists. The finished search returns the saved result without :code:`loss_func` calls. :code:`ValueError` is raised if the state was saved with other :code:`theta_init, theta_num, direction, scale, loss_crit, scan_bound, scan_tol` or :code:`loss_tol`.
+    time_budget : Float64 or None
+        wall time limit of the search, seconds. After the limit the search returns partial result with :code:`"TIME_BUDGET_STOP"` status, the found profile points and :code:`bracket`. The default :code:`None` means no limit.
+    deadline : Float64 or None
+        moment to stop the search as :code:`time.monotonic()` value, it is used together with :code:`time_budget`.
+    wald : Bool or WaldIntervals or None
+        Wald pre-pass, see :code:`get_wald_intervals`: :code:`True` to calculate it or the result calculated before. It sets the default :code:`scan_bound`, :code:`scan_hini` and the initial step of CICO optimizer from the Hessian at :code:`theta_init`. The default :code:`None` means no pre-pass.
     **kwargs : Any
         the additional keyword arguments passed to :code:`get_right_endpoint` for specific :code:`method`.
 
@@ -58,6 +91,69 @@ def get_endpoint(
     class EndPoint
          object storing confidence endpoint and profile points found on fly.
 
+    """
+    return run_to_end(iter_endpoint(
+        theta_init,
+        theta_num,
+        loss_func,
+        method,
+        direction,
+        loss_crit=loss_crit,
+        scale=scale,
+        theta_bounds=theta_bounds,
+        scan_bound=scan_bound,
+        scan_tol=scan_tol,
+        loss_tol=loss_tol,
+        local_alg=local_alg,
+        cache=cache,
+        grad_func=grad_func,
+        tracer=tracer,
+        checkpoint=checkpoint,
+        resume=resume,
+        time_budget=time_budget,
+        deadline=deadline,
+        wald=wald,
+        **kwargs
+        ))
+
+
+def iter_endpoint(
+    theta_init,
+    theta_num,
+    loss_func,
+    method,
+    direction="right",
+    loss_crit=0.0,
+    scale=[],
+    theta_bounds=[],
+    scan_bound=None,
+    scan_tol=1e-3,
+    loss_tol=1e-3,
+    local_alg=nlopt.LN_NELDERMEAD,
+    cache=None,
+    grad_func=None,
+    tracer=None,
+    checkpoint=None,
+    resume=False,
+    time_budget=None,
+    deadline=None,
+    wald=None,
+    **kwargs):
+    """Generator version of :code:`get_endpoint` showing the progress of the search. The arguments are the same
+    as for :code:`get_endpoint`, they are checked on the first step.
+
+    Every new profile point is yielded as :code:`EndPointStep` with :code:`None` status, current :code:`bracket`
+    and number of calls as soon as it is calculated. :code:`"LIN_EXTRAPOL"` and :code:`"QUADR_EXTRAPOL"` methods
+    yield points during the search, the other methods yield all points when the search is finished.
+    The last step has no point and stores the status and the endpoint value, after it the generator returns
+    :code:`EndPoint`. The search can be stopped by :code:`close()` or :code:`break`, then :code:`loss_func`
+    is not called anymore.
+
+    Returns
+    -------
+    Generator[EndPointStep]
+         steps of the search, the return value is :code:`EndPoint` as for :code:`get_endpoint`.
+
     """
     if len(scale) == 0:
         scale = np.tile("direct", len(theta_init))
@@ -67,12 +163,31 @@ def get_endpoint(
             np.tile([(-1)*np.inf, np.inf], (len(theta_init), 1)),
             )
 
-    if scan_bound is None:
-        x = -9.0 if (direction == "left") else 9.0
-        scan_bound = unscaling(x, scale[theta_num])
-
     isLeft = direction == "left"
 
+    deadline = resolve_deadline(time_budget, deadline)
+
+    # transforming, the scanned component changes sign for left direction
+    transform = ScaleTransform(scale, theta_bounds, flip=theta_num if isLeft else None)
+
+    loss_func, grad_func = resolve_gradient(loss_func, grad_func)
+    # calls are traced under the cache, i.e. the cache hits are not recorded
+    loss_func = cached_loss_func(traced_loss_func(loss_func, tracer), cache)
+
+    if wald is True:
+        with tracer_context(tracer, method=method, direction=direction, stage="wald"):
+            wald = get_wald_intervals(theta_init, loss_func, loss_crit, scale, theta_bounds)
+    if wald is not None:
+        if scan_bound is None:
+            scan_bound = wald.scan_bounds(theta_num)[0 if isLeft else 1]
+        scan_hini = wald.scan_hini(theta_num)
+        if scan_hini is not None:
+            kwargs.setdefault("scan_hini", scan_hini[0 if isLeft else 1])
+        kwargs.setdefault("initial_step", wald.initial_step())
+
+    if scan_bound is None:
+        scan_bound = transform.unscale_value(9.0, theta_num)
+
     # checking arguments
     # theta_bound[1] < theta_init < theta_bound[2]
     theta_init_outside_theta_bounds = [not(theta_bounds[i][0] < theta_init[i] < theta_bounds[i][1])
@@ -97,13 +212,15 @@ def get_endpoint(
 
     # 0 <= theta_bounds <= 1 for :logit
     less_than_zero_theta_bounds = all(i == "logit" for i in scale) \
-                                  and [theta_bounds[i][1] < 0 or theta_bounds[i][2] > 1 for i in range(len(theta_init))]
+                                  and [theta_bounds[i][0] < 0 or theta_bounds[i][1] > 1 for i in range(len(theta_init))]
     if less_than_zero_theta_bounds and any(less_than_zero_theta_bounds):
         raise ValueError(":logit scaled theta_bound min is outside range [0,1]: {}".format({np.where(less_than_zero_theta_bounds)}))
 
 
     # loss_func(theta_init) < loss_crit
-    if (not(loss_func(theta_init) < loss_crit)):
+    with tracer_context(tracer, method=method, direction=direction, stage="init_check"):
+        loss_init = loss_func(theta_init)
+    if (not(loss_init < loss_crit)):
         raise ValueError("Check theta_init and loss_crit: loss_func(theta_init) should be < loss_crit")
 
     # set counter in the scope
@@ -111,53 +228,98 @@ def get_endpoint(
     # set supreme, maximal or minimal value of scanned parameter inside critical
     supreme_gd = None
 
-    # transforming
-    n_scale = len(scale)
+    # the resumed search must have the same inputs
+    checkpoint = as_checkpoint(checkpoint, theta_init=theta_init, theta_num=theta_num, direction=direction, scale=scale,
+                               loss_crit=loss_crit, scan_bound=scan_bound, scan_tol=scan_tol, loss_tol=loss_tol)
+    state = checkpoint.load(method) if (checkpoint is not None and resume) else None
+    if state is not None:
+        # calls before the restart, the profile points are in transformed scale
+        counter = state["counter"]
+        pps_saved = state["result"][1] if "result" in state else state.get("pps", [])
+        for pp in pps_saved:
+            if pp.loss < 0 and (supreme_gd is None or pp.params[theta_num] > supreme_gd):
+                supreme_gd = pp.params[theta_num]
 
-    theta_init_gd = map(lambda i: scaling(theta_init[i], scale[i]), range(n_scale))
-    theta_init_gd = list(theta_init_gd)
+    theta_init_gd = transform.scale_vector(theta_init)
 
-    if isLeft:
-        theta_init_gd[theta_num] *= -1  # change direction
+    # counter and supreme are changed under the lock, the backends can call loss_func_gd from several threads
+    lock = threading.Lock()
 
     def loss_func_gd(theta_gd):
         nonlocal counter
-        nonlocal scale
         nonlocal supreme_gd
-        theta_g = np.copy(theta_gd)
-        if isLeft:
-            theta_g[theta_num] *= -1  # change direction
-
-        theta = map(lambda i: unscaling(theta_g[i], scale[i]), range(n_scale))
-        theta = list(theta)
+        # new array for every call, loss_func may keep its argument
+        theta = transform.unscale(theta_gd, np.empty(len(theta_gd)))
         # calculate function
         loss_norm = loss_func(theta) - loss_crit
 
-        # update counter
-        counter += 1
+        with lock:
+            # update counter
+            counter += 1
 
-        update_supreme = (loss_norm < 0) and (supreme_gd is None or (theta_gd[theta_num] > supreme_gd))
-        if update_supreme:
-            supreme_gd = theta_gd[theta_num]
+            update_supreme = (loss_norm < 0) and (supreme_gd is None or (theta_gd[theta_num] > supreme_gd))
+            if update_supreme:
+                supreme_gd = theta_gd[theta_num]
 
         return loss_norm
+    # methods do not trace loss_func_gd again
+    loss_func_gd.loss_func = loss_func
+
+    batch = batch_method(loss_func)
+    if batch is not None:
+        # the batches of profile points and finite differences reach the batch loss_func
+        def loss_func_gd_batch(thetas_gd):
+            nonlocal counter
+            nonlocal supreme_gd
+            thetas_gd = np.atleast_2d(np.asarray(thetas_gd, dtype=np.float64))
+            losses_norm = batch(transform.unscale(thetas_gd, np.empty(thetas_gd.shape))) - loss_crit
+
+            inside = thetas_gd[losses_norm < 0, theta_num]
+            with lock:
+                counter += len(thetas_gd)
+                if len(inside) > 0 and (supreme_gd is None or np.max(inside) > supreme_gd):
+                    supreme_gd = np.max(inside)
+
+            return losses_norm
+        loss_func_gd.batch = loss_func_gd_batch
+
+    if grad_func is None:
+        grad_func_gd = None  # finite differences in transformed scale
+    else:
+        def grad_func_gd(theta_gd):
+            theta = transform.unscale(theta_gd, np.empty(len(theta_gd)))
+            # chain rule for transformation
+            return np.asarray(grad_func(theta), dtype=np.float64) * transform.derivative(theta_gd)
+
+    theta_bounds_gd = np.column_stack((
+        transform.scale_vector([theta_bounds[i][0] for i in range(len(theta_init))]),
+        transform.scale_vector([theta_bounds[i][1] for i in range(len(theta_init))])
+        ))
+    if isLeft:
+        theta_bounds_gd[theta_num] = theta_bounds_gd[theta_num][::-1]  # change direction
 
-    theta_bounds_gd = map(
-        lambda i: [scaling(theta_bounds[i][0], scale[i]),
-                   scaling(theta_bounds[i][1], scale[i])
-                   ],
-        range(n_scale))
-    theta_bounds_gd = list(theta_bounds_gd)
+    scan_bound_gd = transform.scale_value(scan_bound, theta_num)
 
-    if isLeft:
-        theta_bounds_gd[theta_num] = (-1*theta_bounds_gd[theta_num][1], -1*theta_bounds_gd[theta_num][0]) # ??? # change direction
+    def temp_fun(pp):
+        params = transform.unscale(pp.params, np.empty(len(theta_init)))
+        return ProfilePoint(
+            params[theta_num],
+            pp.loss + loss_crit,
+            params,
+            pp.ret,
+            pp.counter
+        )
 
-    scan_bound_gd = scaling(scan_bound, scale[theta_num])
-    if isLeft:
-         scan_bound_gd *= -1  # change direction
+    # the endpoint is between supreme and the nearest optimized profile point outside critical level
+    def is_outside(pp):
+        return pp.ret > 0 and pp.ret not in (5, 6) and pp.loss >= 0
+
+    def bracket(outside_gd):
+        outside = transform.unscale_value(outside_gd, theta_num) if outside_gd is not None else None
+        return [transform.unscale_value(supreme_gd, theta_num), outside]
 
     # calculate endpoint using base method
-    optf_gd, pp_gd, status = get_right_endpoint(
+    search = iter_right_endpoint(
         theta_init_gd,
         theta_num,
         loss_func_gd,
@@ -167,28 +329,38 @@ def get_endpoint(
         scan_tol = scan_tol,
         loss_tol = loss_tol,
         local_alg = local_alg,
+        grad_func = grad_func_gd,
+        tracer = tracer,
+        checkpoint = checkpoint,
+        resume = resume,
+        deadline = deadline,
         **kwargs
     )
+    outside_gd = None
+    try:
+        while True:
+            # the context is set for the search only, not for the caller code between the steps
+            with tracer_context(tracer, method=method, direction=direction, stage="search"):
+                try:
+                    pp = next(search)
+                except StopIteration as e:
+                    optf_gd, pp_gd, status = e.value
+                    break
+            if is_outside(pp) and (outside_gd is None or pp.params[theta_num] < outside_gd):
+                outside_gd = pp.params[theta_num]
+            yield EndPointStep(temp_fun(pp), None, bracket(outside_gd), counter)
+    finally:
+        # closing the generator stops the search
+        search.close()
 
     # transforming back
-    if (isLeft and not(optf_gd is None)):
-        optf_gd *= -1  # change direction
-    optf = unscaling(optf_gd, scale[theta_num])
-
-    def temp_fun(pp):
-        if isLeft:
-             pp.params[theta_num] *= -1 # change direction
-        return ProfilePoint(
-            unscaling(pp.params[theta_num], scale[theta_num]),
-            pp.loss + loss_crit,
-            list(map(lambda i: unscaling(theta_init, i), scale)), # ??? Этот момент переписать
-            pp.ret,
-            pp.counter
-        )
+    optf = transform.unscale_value(optf_gd, theta_num)
     pps = [temp_fun(pp_gd[i]) for i in range(len(pp_gd))]
+    supreme = transform.unscale_value(supreme_gd, theta_num)
 
-    if (isLeft and supreme_gd is not None):
-         supreme_gd *= -1 # change direction
-    supreme = unscaling(supreme_gd, scale[theta_num])
+    # all points including the points found before the restart
+    outside_gd = [pp.params[theta_num] for pp in pp_gd if is_outside(pp)]
+    endpoint_bracket = bracket(min(outside_gd) if len(outside_gd) > 0 else None)
 
-    return EndPoint(optf, pps, status, direction, counter, supreme)
+    yield EndPointStep(None, status, endpoint_bracket, counter, optf)
+    return EndPoint(optf, pps, status, direction, counter, supreme, endpoint_bracket)
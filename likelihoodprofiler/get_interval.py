@@ -1,8 +1,15 @@
 import nlopt
 import numpy as np
-import matplotlib.pyplot as plt
 
 from .get_endpoint import get_endpoint, unscaling
+from .support_math_func import ScaleTransform
+from .parallel import executor_scope
+from .cache import cached_loss_func
+from .gradient import resolve_gradient
+from .tracing import traced_loss_func, tracer_context
+from .checkpoint import as_checkpoint
+from .budget import resolve_deadline
+from .wald import get_wald_intervals
 
 
 class ParamIntervalInput:
@@ -75,39 +82,32 @@ class ParamInterval:
         self.method = method
         self.result = result
 
-    def plot(self):
-        # input value
-        loss_crit = self.input.loss_crit
-        theta_num = self.input.theta_num
-        init_point_x = self.input.theta_init[theta_num]
-        loss_func = self.input.loss_func
-        init_point = [init_point_x, loss_func(self.input.theta_init)]
-        end_point_1 = self.result[0].value
-        end_point_2 = self.result[1].value
+    def plot(self, ax=None, show=True):
+        """Plots profile points, critical level and endpoints. Only the stored results are used, see :code:`render_report` for many intervals.
 
-        # calculate values
-        values = map(lambda x: [x.value, x.loss],
-                    self.result[0].profilePoints + self.result[1].profilePoints)
-        values = list(values)
-        values.sort()
-        x_values, y_values = list(zip(*values))
+        Parameters
+        ----------
+        ax : matplotlib.axes.Axes or None
+            axes to draw. The default :code:`None` means the current axes of :code:`pyplot`.
+        show : Bool
+            calls :code:`pyplot.show()` after drawing. It blocks in interactive backends.
 
-        # plot critical level
-        plt.axhline(y=loss_crit)
+        Returns
+        -------
+        matplotlib.axes.Axes
+            axes with the plot.
+        """
+        from .report import profile_panel_data, draw_profile
 
-        # plot pp
-        plt.plot(x_values, y_values, '.', linestyle='dashed', linewidth=2, markersize=12)
-
-        # plot init point
-        plt.plot(init_point[0], init_point[1], 'd')
-
-        # plot verticle line
-        if not(end_point_1 is None):
-            plt.axvline(x=end_point_1)
-        if not(end_point_2 is None):
-            plt.axvline(x=end_point_2)
-
-        plt.show()
+        if ax is None or show:
+            # matplotlib is imported on first plot, the workers computing intervals do not need it
+            import matplotlib.pyplot as plt
+        if ax is None:
+            ax = plt.gca()
+        draw_profile(ax, profile_panel_data(self))
+        if show:
+            plt.show()
+        return ax
 
 
 def get_interval(
@@ -122,6 +122,16 @@ def get_interval(
     scan_tol=1e-3,
     loss_tol=1e-3,
     local_alg=nlopt.LN_NELDERMEAD,
+    parallel=None,
+    max_workers=None,
+    cache=None,
+    grad_func=None,
+    tracer=None,
+    checkpoint=None,
+    resume=False,
+    time_budget=None,
+    deadline=None,
+    wald=None,
     **kwargs
     ):
     """Computes confidence interval for single component `theta_num` of parameter vector
@@ -136,7 +146,7 @@ def get_interval(
     loss_func : Function
         loss function :math:`\\Lambda\\left(\\theta\\right)` the profile of which is analyzed. Usually we use log-likelihood for profile analysis in form :math:`\\Lambda( \\theta ) = - 2 ln\\left( L(\\theta) \\right)`.
     method : String
-        computational method to evaluate interval endpoint. Currently the following methods are implemented: :code:`CICO_ONE_PASS`, :code:`LIN_EXTRAPOL`, :code:`QUADR_EXTRAPOL`.
+        computational method to evaluate interval endpoint. Currently the following methods are implemented: :code:`CICO_ONE_PASS`, :code:`LIN_EXTRAPOL`, :code:`QUADR_EXTRAPOL`, :code:`BRACKET_BRENT`, :code:`SURROGATE`.
     loss_crit : Float64
         critical level of loss function. The endpoint of CI for selected parameter is the value at which profile likelihood meets the value of :code:`loss_crit`.
     scale : String
@@ -150,7 +160,27 @@ def get_interval(
     loss_tol : Float64
         Absolute tolerance of :code:`loss_func` at :code:`loss_crit` (stop criterion). *Restriction*. Currently is not effective for :code:`nlopt.CICO_ONE_PASS` methods because of limitation in :code:`nlopt.LN_AUGLAG` interface.
     local_alg : Function
-        algorithm of optimization. Currently the local derivation free algorithms form NLOPT pack were tested. The methods: :code:`nlopt.LN_NELDERMEAD, nlopt.LN_COBYLA, nlopt.LN_PRAXIS` show good results. Methods: :code:`nlopt.LN_BOBYQA, nlopt.LN_SBPLX, nlopt.LN_NEWUOA` is not recommended.
+        algorithm of optimization. Currently the local derivation free algorithms form NLOPT pack were tested. The methods: :code:`nlopt.LN_NELDERMEAD, nlopt.LN_COBYLA, nlopt.LN_PRAXIS` show good results. Methods: :code:`nlopt.LN_BOBYQA, nlopt.LN_SBPLX, nlopt.LN_NEWUOA` is not recommended. Other optimizers are set by :code:`"scipy:<method>"` string, e.g. :code:`"scipy:L-BFGS-B"`, or :code:`OptimizerBackend` object, see :code:`likelihoodprofiler.optimizers`.
+    parallel : String or Executor or None
+        computes left and right endpoints concurrently. Possible values: :code:`"thread"`, :code:`"process"` or any :code:`concurrent.futures.Executor`. For :code:`"process"` the :code:`loss_func` must be picklable, i.e. defined at module level. The default :code:`None` computes endpoints one after another.
+    max_workers : Int or None
+        maximal number of workers for :code:`parallel` pool created internally.
+    cache : Bool or EvaluationCache or None
+        memoizes :code:`loss_func` values so repeated points are not calculated twice. :code:`True` creates :code:`EvaluationCache` with default options. The default :code:`None` means no caching.
+    grad_func : Function or String or None
+        gradient of :code:`loss_func` for :code:`nlopt.LD_*` algorithms: function of parameter vector or :code:`"loss"` if :code:`loss_func` returns tuple :code:`(loss, grad)`. The default :code:`None` means finite differences.
+    tracer : EvaluationTracer or None
+        records every :code:`loss_func` call with method, direction and stage, see :code:`EvaluationTracer`. Works in the current process only, i.e. not for :code:`"process"` mode.
+    checkpoint : String or Checkpoint or None
+        file to save the search state, see :code:`Checkpoint`. The endpoints are stored in the neighbour files with :code:`".left"` and :code:`".right"` suffixes. The default :code:`None` means no saving.
+    resume : Bool
+        continues both endpoint searches from :code:`checkpoint` files if they exist.
+    time_budget : Float64 or None
+        wall time limit for both endpoints, seconds. The time unused by the first endpoint is available for the second one. The endpoints which are not finished have :code:`"TIME_BUDGET_STOP"` status. The default :code:`None` means no limit.
+    deadline : Float64 or None
+        moment to stop the search as :code:`time.monotonic()` value, it is used together with :code:`time_budget`.
+    wald : Bool or WaldIntervals or None
+        Wald pre-pass calculated once for both endpoints, see :code:`get_endpoint`. It also sets the default :code:`scan_bounds` from the Wald interval. The default :code:`None` means no pre-pass.
     **kwargs : Any
         the additional keyword arguments passed to :code:`get_right_endpoint` for specific :code:`method`.
 
@@ -169,16 +199,25 @@ def get_interval(
             np.tile([(-1)*np.inf, np.inf], (len(theta_init), 1)),
             )
 
+    # the same cache for both endpoints and loss_init
+    loss_func, grad_func = resolve_gradient(loss_func, grad_func)
+    loss_func = cached_loss_func(traced_loss_func(loss_func, tracer), cache)
+
+    if wald is True:
+        with tracer_context(tracer, method=method, stage="wald"):
+            wald = get_wald_intervals(theta_init, loss_func, loss_crit, scale, theta_bounds)
+
     if scan_bounds is None:
-        scan_bounds = unscaling((-9.0, 9.0), scale[theta_num])
+        if wald is None:
+            transform = ScaleTransform(scale, theta_bounds)
+            scan_bounds = [transform.unscale_value(-9.0, theta_num), transform.unscale_value(9.0, theta_num)]
+        else:
+            scan_bounds = wald.scan_bounds(theta_num)
 
-    # both endpoints
-    endpoints = [get_endpoint(
-        theta_init,
-        theta_num,
-        loss_func,
-        method,
-        ["left", "right"][i],
+    checkpoint = as_checkpoint(checkpoint)
+    deadline = resolve_deadline(time_budget, deadline)
+
+    endpoint_kwargs = [dict(
         loss_crit=loss_crit,
         scale=scale,
         theta_bounds=theta_bounds,
@@ -186,9 +225,39 @@ def get_interval(
         scan_tol=scan_tol,
         loss_tol=loss_tol,
         local_alg=local_alg,
+        grad_func=grad_func,
+        tracer=tracer,
+        checkpoint=None if checkpoint is None else checkpoint.derive(["left", "right"][i]),
+        resume=resume,
+        deadline=deadline,
+        wald=wald,
         **kwargs
         ) for i in range(2)]
 
+    # both endpoints
+    if parallel is None:
+        endpoints = [get_endpoint(
+            theta_init,
+            theta_num,
+            loss_func,
+            method,
+            ["left", "right"][i],
+            **endpoint_kwargs[i]
+            ) for i in range(2)]
+    else:
+        # each EndPoint counts its own loss_func calls, so the counters are independent
+        with executor_scope(parallel, max_workers) as executor:
+            futures = [executor.submit(
+                get_endpoint,
+                theta_init,
+                theta_num,
+                loss_func,
+                method,
+                ["left", "right"][i],
+                **endpoint_kwargs[i]
+                ) for i in range(2)]
+            endpoints = [future.result() for future in futures]
+
     input = ParamIntervalInput(
         theta_init,
         theta_num,
@@ -203,9 +272,12 @@ def get_interval(
         kwargs
         )
 
+    with tracer_context(tracer, method=method, stage="loss_init"):
+        loss_init = loss_func(theta_init)
+
     return ParamInterval(
         input,
-        loss_func(theta_init),
+        loss_init,
         method,
         endpoints
         )
@@ -0,0 +1,239 @@
+import asyncio
+import inspect
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+import nlopt
+import numpy as np
+
+from .get_endpoint import get_endpoint, unscaling
+from .support_math_func import ScaleTransform
+from .get_interval import ParamIntervalInput, ParamInterval
+
+
+# one pool of search threads for every event loop, the workers exit when the loop is deleted
+_loop_executors = weakref.WeakKeyDictionary()
+_loop_executors_lock = threading.Lock()
+
+
+def loop_executor(loop):
+    """Returns :code:`ThreadPoolExecutor` running the synchronous searches of :code:`get_endpoint_async`
+    for the event :code:`loop`. The pool is created on the first call and shared by all searches of the loop.
+    Its size is the default of :code:`ThreadPoolExecutor`, i.e. :code:`min(32, os.cpu_count() + 4)`, the searches
+    over the limit wait in the queue. The pool is separate from the default executor of the loop, so
+    :code:`loss_func` can use :code:`loop.run_in_executor(None, ...)` while the searches wait for it."""
+    with _loop_executors_lock:
+        executor = _loop_executors.get(loop)
+        if executor is None:
+            executor = ThreadPoolExecutor(thread_name_prefix="likelihoodprofiler-async")
+            _loop_executors[loop] = executor
+        return executor
+
+
+def as_semaphore(max_concurrency):
+    """Applies :code:`max_concurrency` option: number or :code:`asyncio.Semaphore` shared between calls or :code:`None`."""
+    if max_concurrency is None or isinstance(max_concurrency, asyncio.Semaphore):
+        return max_concurrency
+    return asyncio.Semaphore(max_concurrency)
+
+
+async def _evaluate(loss_func, theta, semaphore):
+    if semaphore is None:
+        loss = loss_func(theta)
+        return (await loss) if inspect.isawaitable(loss) else loss
+    async with semaphore:
+        loss = loss_func(theta)
+        return (await loss) if inspect.isawaitable(loss) else loss
+
+
+def blocking_loss_func(loss_func, loop, semaphore=None, stop=None):
+    """Returns ordinary function of parameter vector running coroutine :code:`loss_func` on the event
+    :code:`loop` and waiting for the result. It must be called outside of the :code:`loop` thread.
+
+    Parameters
+    ----------
+    loss_func : Function
+        coroutine function (or function returning awaitable) of parameter vector.
+    loop : asyncio.AbstractEventLoop
+        running event loop.
+    semaphore : asyncio.Semaphore or None
+        limit of concurrent :code:`loss_func` calls.
+    stop : threading.Event or None
+        the calls raise :code:`RuntimeError` after the event is set, it stops the search.
+    """
+    def fun(theta):
+        if stop is not None and stop.is_set():
+            raise RuntimeError("The search is cancelled")
+        # optimizer may reuse the array of parameters
+        theta = np.array(theta, dtype=np.float64)
+        return asyncio.run_coroutine_threadsafe(_evaluate(loss_func, theta, semaphore), loop).result()
+    return fun
+
+
+async def get_endpoint_async(
+    theta_init,
+    theta_num,
+    loss_func,
+    method,
+    direction="right",
+    max_concurrency=None,
+    executor=None,
+    **kwargs):
+    """Asynchronous version of :code:`get_endpoint` for coroutine :code:`loss_func`.
+
+    The search itself is synchronous, so it is not a coroutine: it runs in a worker thread and the thread
+    waits for every :code:`loss_func` call while the coroutines are executed on the current event loop.
+    The loop is not blocked and many endpoints can be estimated concurrently, e.g. with :code:`asyncio.gather`,
+    but every running search occupies one thread, see :code:`loop_executor`.
+
+    Parameters
+    ----------
+    theta_init : Array[Float64]
+        starting values of parameter vector :math:`\\Theta`, see :code:`get_endpoint`.
+    theta_num : Int
+        number :math:`n` of vector component to compute confidence interval :math:`\\Theta^n`.
+    loss_func : Function
+        coroutine function of parameter vector returning the loss value. Ordinary functions are accepted as well but they block the loop.
+    method : String
+        computational method to evaluate interval endpoint, see :code:`get_endpoint`.
+    direction : String
+        :code:`"right"` or :code:`"left"` endpoint to estimate.
+    max_concurrency : Int or asyncio.Semaphore or None
+        maximal number of simultaneous :code:`loss_func` calls. Pass the same :code:`asyncio.Semaphore` to several calls to share the limit. The default :code:`None` means no limit.
+    executor : ThreadPoolExecutor or None
+        executor running the search. The default is the pool of the current event loop, see :code:`loop_executor`.
+    **kwargs : Any
+        the additional keyword arguments passed to :code:`get_endpoint`.
+
+    Returns
+    -------
+    class EndPoint
+         object storing confidence endpoint and profile points found on fly.
+
+    """
+    loop = asyncio.get_running_loop()
+    stop = threading.Event()
+    sync_loss_func = blocking_loss_func(loss_func, loop, as_semaphore(max_concurrency), stop)
+    search = partial(get_endpoint, theta_init, theta_num, sync_loss_func, method, direction, **kwargs)
+
+    if executor is None:
+        executor = loop_executor(loop)
+    try:
+        return await loop.run_in_executor(executor, search)
+    except asyncio.CancelledError:
+        # the thread cannot be cancelled, the next loss_func call stops it
+        stop.set()
+        raise
+
+
+async def get_interval_async(
+    theta_init,
+    theta_num,
+    loss_func,
+    method,
+    loss_crit=0.0,
+    scale=[],
+    theta_bounds=[],
+    scan_bounds=None,
+    scan_tol=1e-3,
+    loss_tol=1e-3,
+    local_alg=nlopt.LN_NELDERMEAD,
+    max_concurrency=None,
+    **kwargs
+    ):
+    """Asynchronous version of :code:`get_interval` for coroutine :code:`loss_func`. Both endpoints
+    are estimated concurrently on the current event loop, the searches run in two threads of the
+    loop pool, see :code:`get_endpoint_async`.
+
+    Several parameters are analyzed concurrently by :code:`asyncio.gather` of several calls. Pass the same
+    :code:`asyncio.Semaphore` as :code:`max_concurrency` to limit the total number of :code:`loss_func` calls.
+
+    Parameters
+    ----------
+    theta_init : Array[Float64]
+        starting values of parameter vector :math:`\\Theta`, see :code:`get_interval`.
+    theta_num : Int
+        number `n` of vector component to compute confidence interval :math:`\\Theta^n`.
+    loss_func : Function
+        coroutine function of parameter vector returning the loss value.
+    method : String
+        computational method to evaluate interval endpoint, see :code:`get_interval`.
+    loss_crit : Float64
+        critical level of loss function.
+    scale : Array[String]
+        vector of scale transformations for each component, see :code:`get_interval`.
+    theta_bounds : Array[Array[Float64,Float64]]
+        vector of bounds for each component, see :code:`get_interval`.
+    scan_bounds : Array[Float64,Float64]
+        vector of scan bound for :code:`theta_num` component, see :code:`get_interval`.
+    scan_tol : Float64
+        Absolute tolerance of scanned component (stop criterion).
+    loss_tol : Float64
+        Absolute tolerance of :code:`loss_func` at :code:`loss_crit` (stop criterion).
+    local_alg : Function
+        algorithm of optimization, see :code:`get_interval`.
+    max_concurrency : Int or asyncio.Semaphore or None
+        maximal number of simultaneous :code:`loss_func` calls for both endpoints. The default :code:`None` means no limit.
+    **kwargs : Any
+        the additional keyword arguments passed to :code:`get_endpoint_async`, e.g. :code:`executor`, and :code:`get_endpoint`.
+
+    Returns
+    -------
+    ParamInterval
+         structure storing all input data and estimated confidence interval.
+
+    """
+    if len(scale) == 0:
+        scale = np.tile("direct", len(theta_init))
+
+    if len(theta_bounds) == 0:
+        theta_bounds = unscaling(
+            np.tile([(-1)*np.inf, np.inf], (len(theta_init), 1)),
+            )
+
+    if scan_bounds is None:
+        transform = ScaleTransform(scale, theta_bounds)
+        scan_bounds = [transform.unscale_value(-9.0, theta_num), transform.unscale_value(9.0, theta_num)]
+
+    semaphore = as_semaphore(max_concurrency)
+
+    endpoints = await asyncio.gather(*[get_endpoint_async(
+        theta_init,
+        theta_num,
+        loss_func,
+        method,
+        ["left", "right"][i],
+        max_concurrency=semaphore,
+        loss_crit=loss_crit,
+        scale=scale,
+        theta_bounds=theta_bounds,
+        scan_bound=scan_bounds[i],
+        scan_tol=scan_tol,
+        loss_tol=loss_tol,
+        local_alg=local_alg,
+        **kwargs
+        ) for i in range(2)])
+    loss_init = await _evaluate(loss_func, np.array(theta_init, dtype=np.float64), semaphore)
+
+    input = ParamIntervalInput(
+        theta_init,
+        theta_num,
+        loss_func,
+        loss_crit,
+        scale,
+        theta_bounds,
+        scan_bounds,
+        scan_tol,
+        loss_tol,
+        local_alg,
+        kwargs
+        )
+
+    return ParamInterval(
+        input,
+        loss_init,
+        method,
+        list(endpoints)
+        )
@@ -0,0 +1,205 @@
+import os
+from concurrent.futures import Executor, wait, FIRST_COMPLETED
+
+import nlopt
+import numpy as np
+
+from .get_endpoint import get_endpoint, unscaling
+from .support_math_func import ScaleTransform
+from .get_interval import ParamIntervalInput, ParamInterval
+from .parallel import executor_scope
+from .cache import cached_loss_func
+from .gradient import resolve_gradient
+from .tracing import traced_loss_func, tracer_context
+from .checkpoint import as_checkpoint
+from .budget import resolve_deadline, time_left
+from .wald import get_wald_intervals
+
+
+def get_intervals(
+    theta_init,
+    loss_func,
+    method,
+    theta_nums=None,
+    loss_crit=0.0,
+    scale=[],
+    theta_bounds=[],
+    scan_bounds=None,
+    scan_tol=1e-3,
+    loss_tol=1e-3,
+    local_alg=nlopt.LN_NELDERMEAD,
+    parallel="process",
+    max_workers=None,
+    cache=None,
+    grad_func=None,
+    tracer=None,
+    checkpoint=None,
+    resume=False,
+    time_budget=None,
+    deadline=None,
+    wald=None,
+    **kwargs
+    ):
+    """Computes confidence intervals for several components of parameter vector. Every pair
+    of component and direction is submitted as a separate task to the executor.
+
+    Parameters
+    ----------
+    theta_init : Array[Float64]
+        starting values of parameter vector :math:`\\Theta`. The value of :code:`loss_func` must be lower than :code:`loss_crit`.
+    loss_func : Function
+        loss function :math:`\\Lambda\\left(\\Theta\\right)` the profile of which is analyzed. For :code:`"process"` mode it must be picklable, i.e. defined at module level.
+    method : String
+        computational method to evaluate interval endpoint, see :code:`get_interval`.
+    theta_nums : Array[Int] or None
+        numbers of components to compute confidence intervals. The default is all components.
+    loss_crit : Float64
+        critical level of loss function.
+    scale : Array[String]
+        vector of scale transformations for each component, see :code:`get_interval`.
+    theta_bounds : Array[Array[Float64,Float64]]
+        vector of bounds for each component, see :code:`get_interval`.
+    scan_bounds : Array[Array[Float64,Float64]] or None
+        vector of scan bounds for every component of :code:`theta_init` (items can be :code:`None`). The defaults are the same as in :code:`get_interval`.
+    scan_tol : Float64
+        Absolute tolerance of scanned component (stop criterion).
+    loss_tol : Float64
+        Absolute tolerance of :code:`loss_func` at :code:`loss_crit` (stop criterion).
+    local_alg : Function
+        algorithm of optimization, see :code:`get_interval`.
+    parallel : String or Executor
+        :code:`"process"` (default), :code:`"thread"` or any :code:`concurrent.futures.Executor`.
+    max_workers : Int or None
+        maximal number of workers for :code:`parallel` pool created internally. With :code:`time_budget` it is the number of endpoints running at once: the default is :code:`os.cpu_count()` for the internal pool, and it must be set to the number of workers of the user-supplied :code:`Executor`.
+    cache : Bool or EvaluationCache or None
+        memoizes :code:`loss_func` values, see :code:`get_interval`. The cache is shared between tasks in :code:`"thread"` mode only, every worker process has its own copy.
+    grad_func : Function or String or None
+        gradient of :code:`loss_func` for :code:`nlopt.LD_*` algorithms: function of parameter vector or :code:`"loss"` if :code:`loss_func` returns tuple :code:`(loss, grad)`. The default :code:`None` means finite differences.
+    tracer : EvaluationTracer or None
+        records every :code:`loss_func` call with method, direction and stage, see :code:`EvaluationTracer`. Works in the current process only, i.e. not for :code:`"process"` mode.
+    checkpoint : String or Checkpoint or None
+        file prefix to save the search states, see :code:`Checkpoint`. Every endpoint is stored in the neighbour file with suffix :code:`".<theta_num>.left"` or :code:`".<theta_num>.right"`. The default :code:`None` means no saving.
+    resume : Bool
+        continues the endpoint searches from :code:`checkpoint` files if they exist.
+    time_budget : Float64 or None
+        wall time limit for all intervals, seconds. The endpoints are submitted when a worker is free and get the equal share of the remaining time, i.e. the time unused by fast endpoints is carried over to the slow ones. The endpoints which are not finished have :code:`"TIME_BUDGET_STOP"` status. The default :code:`None` means no limit.
+    deadline : Float64 or None
+        moment to stop the search as :code:`time.monotonic()` value, it is used together with :code:`time_budget`.
+    wald : Bool or WaldIntervals or None
+        Wald pre-pass calculated once for all components, see :code:`get_interval`. The default :code:`None` means no pre-pass.
+    **kwargs : Any
+        the additional keyword arguments passed to :code:`get_right_endpoint` for specific :code:`method`.
+
+    Returns
+    -------
+    Array[ParamInterval]
+         intervals in the order of :code:`theta_nums`.
+
+    """
+    n_theta = len(theta_init)
+
+    if theta_nums is None:
+        theta_nums = range(n_theta)
+    theta_nums = list(theta_nums)
+
+    if len(scale) == 0:
+        scale = np.tile("direct", n_theta)
+
+    if len(theta_bounds) == 0:
+        theta_bounds = unscaling(
+            np.tile([(-1)*np.inf, np.inf], (n_theta, 1)),
+            )
+
+    loss_func, grad_func = resolve_gradient(loss_func, grad_func)
+    loss_func = cached_loss_func(traced_loss_func(loss_func, tracer), cache)
+
+    if wald is True:
+        with tracer_context(tracer, method=method, stage="wald"):
+            wald = get_wald_intervals(theta_init, loss_func, loss_crit, scale, theta_bounds)
+
+    if scan_bounds is None:
+        scan_bounds = [None] * n_theta
+    transform = ScaleTransform(scale, theta_bounds)
+    scan_bounds = [
+        scan_bounds[i] if scan_bounds[i] is not None
+        else [transform.unscale_value(-9.0, i), transform.unscale_value(9.0, i)] if wald is None
+        else wald.scan_bounds(i)
+        for i in range(n_theta)
+        ]
+
+    checkpoint = as_checkpoint(checkpoint)
+
+    deadline = resolve_deadline(time_budget, deadline)
+
+    # the time is shared by the endpoints running at once, i.e. by the workers
+    if deadline is not None and max_workers is None:
+        if isinstance(parallel, Executor):
+            raise ValueError("max_workers is required for time_budget or deadline with the user-supplied Executor")
+        max_workers = os.cpu_count() or 1
+
+    tasks = [(theta_num, i) for theta_num in theta_nums for i in range(2)]
+
+    def submit(executor, task, task_budget=None):
+        theta_num, i = task
+        return executor.submit(
+            get_endpoint,
+            theta_init,
+            theta_num,
+            loss_func,
+            method,
+            ["left", "right"][i],
+            loss_crit=loss_crit,
+            scale=scale,
+            theta_bounds=theta_bounds,
+            scan_bound=scan_bounds[theta_num][i],
+            scan_tol=scan_tol,
+            loss_tol=loss_tol,
+            local_alg=local_alg,
+            grad_func=grad_func,
+            tracer=tracer,
+            checkpoint=None if checkpoint is None else checkpoint.derive("{}.{}".format(theta_num, ["left", "right"][i])),
+            resume=resume,
+            time_budget=task_budget,
+            wald=wald,
+            **kwargs
+            )
+
+    with executor_scope(parallel, max_workers) as executor:
+        if deadline is None:
+            futures = {task: submit(executor, task) for task in tasks}
+        else:
+            # every task gets its share of the rest of the time when a worker is free,
+            # so the time unused by fast tasks is spent by the slow ones
+            n_slots = max_workers
+            futures = {}
+            running = set()
+            for k, task in enumerate(tasks):
+                if len(running) >= n_slots:
+                    _, running = wait(running, return_when=FIRST_COMPLETED)
+                n_waiting = len(tasks) - k
+                task_budget = max(time_left(deadline), 0.) * min(n_slots, n_waiting) / n_waiting
+                futures[task] = submit(executor, task, task_budget)
+                running.add(futures[task])
+        # loss_init is the same for all components
+        with tracer_context(tracer, method=method, stage="loss_init"):
+            loss_init = loss_func(theta_init)
+        endpoints = [[futures[(theta_num, i)].result() for i in range(2)] for theta_num in theta_nums]
+
+    return [ParamInterval(
+        ParamIntervalInput(
+            theta_init,
+            theta_num,
+            loss_func,
+            loss_crit,
+            scale,
+            theta_bounds,
+            scan_bounds[theta_num],
+            scan_tol,
+            loss_tol,
+            local_alg,
+            kwargs
+            ),
+        loss_init,
+        method,
+        endpoints[k]
+        ) for k, theta_num in enumerate(theta_nums)]
@@ -1,9 +1,14 @@
 import numpy as np
 import nlopt
 
-from .cico_one_pass import get_right_endpoint_cico
-from .get_right_endpoint_by_lin_extrapol import get_right_endpoint_by_lin_extrapol
-from .method_quadr_extrapol import get_right_endpoint_by_quadr_extrapol
+
+def run_to_end(generator):
+    """Exhausts generator of profile points and returns its return value."""
+    while True:
+        try:
+            next(generator)
+        except StopIteration as e:
+            return e.value
 
 
 def get_right_endpoint(
@@ -45,7 +50,7 @@ def get_right_endpoint(
     loss_tol : Float64
         Absolute tolerance of :code:`loss_func` at :code:`loss_crit` (stop criterion). *Restriction*. Currently is not effective for :code:`nlopt.CICO_ONE_PASS` methods because of limitation in :code:`nlopt.LN_AUGLAG` interface.
     local_alg : Function
-        algorithm of optimization. Currently the local derivation free algorithms form NLOPT pack were tested. The methods: :code:`nlopt.LN_NELDERMEAD, nlopt.LN_COBYLA, nlopt.LN_PRAXIS` show good results. Methods: :code:`nlopt.LN_BOBYQA, nlopt.LN_SBPLX, nlopt.LN_NEWUOA` is not recommended.
+        algorithm of optimization. Currently the local derivation free algorithms form NLOPT pack were tested. The methods: :code:`nlopt.LN_NELDERMEAD, nlopt.LN_COBYLA, nlopt.LN_PRAXIS` show good results. Methods: :code:`nlopt.LN_BOBYQA, nlopt.LN_SBPLX, nlopt.LN_NEWUOA` is not recommended. Other optimizers are set by :code:`"scipy:<method>"` string, e.g. :code:`"scipy:L-BFGS-B"`, or :code:`OptimizerBackend` object, see :code:`likelihoodprofiler.optimizers`.
     **kwargs : Any
         the additional keyword arguments passed to :code:`get_right_endpoint` for specific :code:`method`.
 
@@ -54,11 +59,13 @@ def get_right_endpoint(
     Array
         * Right end point value: :code:`Float64`.
         * Profile points estimated on fly: :code:`Array[ ProfilePoint, 1]`
-        * Status of sulution: :code:`String`. One of values: :code:`"BORDER_FOUND_BY_SCAN_TOL"`, :code:`"SCAN_BOUND_REACHED"`.
+        * Status of sulution: :code:`String`. One of values: :code:`"BORDER_FOUND_BY_SCAN_TOL"`, :code:`"BORDER_FOUND_BY_LOSS_TOL"`, :code:`"SCAN_BOUND_REACHED"`, :code:`"MAX_ITER_STOP"`, :code:`"LOSS_ERROR_STOP"`, :code:`"TIME_BUDGET_STOP"`.
     """
+    # the method modules are imported on first use to keep the package import cheap
     if method == "CICO_ONE_PASS":
         if loss_tol is None:
             loss_tol = 1e-3
+        from .cico_one_pass import get_right_endpoint_cico
         return get_right_endpoint_cico(
             theta_init,
             theta_num,
@@ -74,6 +81,7 @@ def get_right_endpoint(
     elif method == "LIN_EXTRAPOL":
         if loss_tol is None:
             loss_tol = 0
+        from .get_right_endpoint_by_lin_extrapol import get_right_endpoint_by_lin_extrapol
         return get_right_endpoint_by_lin_extrapol(
             theta_init,
             theta_num,
@@ -92,6 +100,7 @@ def get_right_endpoint(
     elif method == "QUADR_EXTRAPOL":
         if loss_tol is None:
             loss_tol = 0
+        from .method_quadr_extrapol import get_right_endpoint_by_quadr_extrapol
         return get_right_endpoint_by_quadr_extrapol(
             theta_init,
             theta_num,
@@ -107,5 +116,92 @@ def get_right_endpoint(
             ftol_abs,
             **kwargs
         )
+    elif method == "BRACKET_BRENT":
+        if loss_tol is None:
+            loss_tol = 0
+        from .method_bracket_brent import get_right_endpoint_by_bracket_brent
+        return get_right_endpoint_by_bracket_brent(
+            theta_init,
+            theta_num,
+            loss_func,
+            theta_bounds,
+            scan_bound,
+            scan_tol,
+            loss_tol,
+            scan_hini,
+            scan_hmax,
+            local_alg,
+            max_iter,
+            ftol_abs,
+            **kwargs
+        )
+    elif method == "SURROGATE":
+        if loss_tol is None:
+            loss_tol = 0
+        from .method_surrogate import get_right_endpoint_by_surrogate
+        return get_right_endpoint_by_surrogate(
+            theta_init,
+            theta_num,
+            loss_func,
+            theta_bounds,
+            scan_bound,
+            scan_tol,
+            loss_tol,
+            scan_hini,
+            scan_hmax,
+            local_alg,
+            max_iter,
+            ftol_abs,
+            **kwargs
+        )
     else:
         raise ValueError("Unknown method")
+
+
+def iter_right_endpoint(
+    theta_init,
+    theta_num,
+    loss_func,
+    method="CICO_ONE_PASS",
+    theta_bounds=[],
+    scan_bound=9.0,
+    scan_tol=1e-3,
+    loss_tol=None,
+    scan_hini=1.,
+    scan_hmax=np.inf,
+    local_alg=nlopt.LN_NELDERMEAD,
+    max_iter=10**5,
+    ftol_abs=1e-3,
+    **kwargs
+):
+    """Generator version of :code:`get_right_endpoint` yielding profile points. The arguments are the same.
+    :code:`"LIN_EXTRAPOL"` and :code:`"QUADR_EXTRAPOL"` yield every point as soon as it is calculated,
+    the other methods yield all points after the search. The generator returns :code:`[value, pps, status]`.
+    """
+    if method == "LIN_EXTRAPOL":
+        from .get_right_endpoint_by_lin_extrapol import iter_right_endpoint_by_lin_extrapol as iter_method
+    elif method == "QUADR_EXTRAPOL":
+        from .method_quadr_extrapol import iter_right_endpoint_by_quadr_extrapol as iter_method
+    else:
+        result = get_right_endpoint(
+            theta_init, theta_num, loss_func, method, theta_bounds, scan_bound, scan_tol, loss_tol,
+            scan_hini, scan_hmax, local_alg, max_iter, ftol_abs, **kwargs
+        )
+        yield from result[1]
+        return result
+
+    return (yield from iter_method(
+        theta_init,
+        theta_num,
+        loss_func,
+        theta_bounds,
+        scan_bound,
+        scan_tol,
+        0 if loss_tol is None else loss_tol,
+        scan_hini,
+        scan_hmax,
+        local_alg,
+        max_iter,
+        ftol_abs,
+        **kwargs
+    ))
@@ -1,11 +1,16 @@
-import warnings
 import math
 import numpy as np
 import nlopt
 
 from .profile import profile
+from .optimizers import check_local_alg
+from .cache import cached_loss_func
+from .tracing import traced_loss_func, tracer_context
+from .checkpoint import as_checkpoint
+from .budget import resolve_deadline, time_left
+from .get_right_endpoint import run_to_end
 
-def get_right_endpoint_by_lin_extrapol(
+def iter_right_endpoint_by_lin_extrapol(
     theta_init,  # initial point of parameters
     theta_num,  # number of parameter to scan
     loss_func,  # lambda(theta) - labmbda_min - delta_lambda
@@ -22,25 +27,27 @@ def get_right_endpoint_by_lin_extrapol(
     local_alg=nlopt.LN_NELDERMEAD,
     max_iter=10**5,
     ftol_abs=1e-3,
+    cache=None,  # EvaluationCache or True to memoize loss_func
+    grad_func=None,  # gradient for LD_* algorithms, see profile()
+    tracer=None,  # EvaluationTracer to record loss_func calls
+    checkpoint=None,  # path or Checkpoint to save the search state
+    resume=False,  # continue from the checkpoint
+    time_budget=None,  # wall time limit, seconds
+    deadline=None,  # time.monotonic() value to stop
+    n_starts=1,  # local optimizations for every profile point, see profile()
+    starts_parallel=None,  # pool for the starts, see profile()
     **kwargs  # options for local fitter
     ):
+    """Generator version of :code:`get_right_endpoint_by_lin_extrapol` yielding every :code:`ProfilePoint`
+    as soon as it is calculated. The generator returns :code:`[value, pps, status]` at the end, closing
+    it stops the search without further :code:`loss_func` calls."""
     if len(theta_bounds) == 0:
         theta_bounds = np.tile([(-1)*np.inf, np.inf], (len(theta_init), 1))
 
-    # dim of the theta vector
-    n_theta = len(theta_init)
+    loss_func = cached_loss_func(traced_loss_func(loss_func, tracer), cache)
 
     # checking arguments
-    # methods which are not supported
-    if local_alg in [nlopt.LN_BOBYQA, nlopt.LN_SBPLX, nlopt.LN_NEWUOA]:
-        warnings.warn("Using current local_alg may result in wrong output.",  DeprecationWarning, stacklevel=2)
-
-    # when using :LN_NELDERMEAD initial parameters should not be zero
-    if local_alg == nlopt.LN_NELDERMEAD:
-        zeroParameter = [math.isclose(theta_init[i], 0., abs_tol=1e-2) for i in range(n_theta)]
-        if any(zeroParameter):
-            warnings.warn("Close-to-zero parameters found when using :LN_NELDERMEAD.",  DeprecationWarning, stacklevel=2)
-            print(np.where(zeroParameter))
+    check_local_alg(local_alg, theta_init)
 
 
     # to count loss function calls inside this function, accumulation
@@ -48,44 +55,71 @@ def get_right_endpoint_by_lin_extrapol(
     # empty container
     pps = []
 
+    deadline = resolve_deadline(time_budget, deadline)
+
+    checkpoint = as_checkpoint(checkpoint, theta_init=theta_init, theta_num=theta_num, scan_bound=scan_bound,
+                               scan_tol=scan_tol, loss_tol=loss_tol)
+    state = checkpoint.load("LIN_EXTRAPOL") if (checkpoint is not None and resume) else None
+    if state is not None and "result" in state:
+        return state["result"]
+
+    def finish(result):
+        if checkpoint is None:
+            return result
+        return checkpoint.save_result("LIN_EXTRAPOL", result, accum_counter)
+
     prof = profile(
         theta_init,
         theta_num,
         loss_func,
         theta_bounds=theta_bounds,
         local_alg=local_alg,
-        ftol_abs=loss_tol
+        ftol_abs=loss_tol,
+        grad_func=grad_func,
+        n_starts=n_starts,
+        starts_parallel=starts_parallel
     )
 
     # first iteration
     x_2 = theta_init[theta_num]
     theta_init_2 = theta_init
     iteration_count = 0
+    x_1 = None  # not initialized for the first iteration
+    point_1 = None  # not initialized for the first iteration
+
+    if state is not None:
+        pps, accum_counter, iteration_count = state["pps"], state["counter"], state["iteration_count"]
+        x_1, x_2, point_1, theta_init_2 = state["x_1"], state["x_2"], state["point_1"], state["theta_init_2"]
 
     # other iterations
     while True:
-        global x_1  # not initialized for the first iteration
-        global point_1  # not initialized for the first iteration
         iteration_count += 1  # to understand if this is a first iteration
+        if time_left(deadline) <= 0:
+            return finish([None, pps, "TIME_BUDGET_STOP"])
         # get profile point
-        point_2 = prof(
-            x_2,
-            theta_init_i=theta_init_2,  # hypothetically this makes optimization more effective
-            maxeval=max_iter - accum_counter  # how many calls left
-            )
+        with tracer_context(tracer, stage="profile"):
+            point_2 = prof(
+                x_2,
+                theta_init_i=theta_init_2,  # hypothetically this makes optimization more effective
+                maxeval=max_iter - accum_counter,  # how many calls left
+                deadline=deadline
+                )
         pps.append(point_2)
         accum_counter += point_2.counter # update counter
+        yield point_2
         if point_2.ret == 5:
-            return [None, pps, "MAX_ITER_STOP"]
+            return finish([None, pps, "MAX_ITER_STOP"])
         elif point_2.ret == -5:
-            return [None, pps, "LOSS_ERROR_STOP"]
+            return finish([None, pps, "LOSS_ERROR_STOP"])
+        elif point_2.ret == 6:  # the point is not optimal
+            return finish([None, pps, "TIME_BUDGET_STOP"])
         elif x_2 >= scan_bound and point_2.loss < 0.: # successfull result
-            return [None, pps, "SCAN_BOUND_REACHED"]
+            return finish([None, pps, "SCAN_BOUND_REACHED"])
         # no checking for the first iteration
         elif iteration_count>1 and (point_2.loss != point_1.loss) and math.isclose((x_2 - x_1) * point_2.loss / (point_2.loss - point_1.loss), 0, abs_tol = scan_tol): # successfull result
-            return [x_2, pps, "BORDER_FOUND_BY_SCAN_TOL"]
+            return finish([x_2, pps, "BORDER_FOUND_BY_SCAN_TOL"])
         elif math.isclose(point_2.loss, 0., abs_tol = loss_tol): # successfull result
-            return [x_2, pps, "BORDER_FOUND_BY_LOSS_TOL"]
+            return finish([x_2, pps, "BORDER_FOUND_BY_LOSS_TOL"])
 
         # next step
         if iteration_count == 1:
@@ -99,3 +133,71 @@ def get_right_endpoint_by_lin_extrapol(
         x_3 = min([x_2+scan_hmax, x_3_extrapol, theta_bounds[theta_num][1]])
         # preparation for the next iteration
         point_1, x_1, x_2, theta_init_2 = point_2, x_2, x_3, point_2.params
+
+        if checkpoint is not None:
+            checkpoint.maybe_save(lambda: {
+                "method": "LIN_EXTRAPOL",
+                "pps": pps,
+                "counter": accum_counter,
+                "iteration_count": iteration_count,
+                "x_1": x_1,
+                "x_2": x_2,
+                "point_1": point_1,
+                "theta_init_2": theta_init_2
+                })
+
+
+def get_right_endpoint_by_lin_extrapol(
+    theta_init,  # initial point of parameters
+    theta_num,  # number of parameter to scan
+    loss_func,  # lambda(theta) - labmbda_min - delta_lambda
+    # method, # function works only for method QUADR_EXTRAPOL
+
+    theta_bounds=[],
+    scan_bound=9.0,
+    scan_tol=1e-3,
+    loss_tol=0,  # 1e-3,
+    # method args
+    scan_hini=1,
+    scan_hmax=np.inf,
+    # local alg args
+    local_alg=nlopt.LN_NELDERMEAD,
+    max_iter=10**5,
+    ftol_abs=1e-3,
+    cache=None,  # EvaluationCache or True to memoize loss_func
+    grad_func=None,  # gradient for LD_* algorithms, see profile()
+    tracer=None,  # EvaluationTracer to record loss_func calls
+    checkpoint=None,  # path or Checkpoint to save the search state
+    resume=False,  # continue from the checkpoint
+    time_budget=None,  # wall time limit, seconds
+    deadline=None,  # time.monotonic() value to stop
+    n_starts=1,  # local optimizations for every profile point, see profile()
+    starts_parallel=None,  # pool for the starts, see profile()
+    **kwargs  # options for local fitter
+    ):
+    """Right endpoint by linear extrapolation of profile points, see :code:`iter_right_endpoint_by_lin_extrapol`.
+    Returns :code:`[value, pps, status]`."""
+    return run_to_end(iter_right_endpoint_by_lin_extrapol(
+        theta_init,
+        theta_num,
+        loss_func,
+        theta_bounds=theta_bounds,
+        scan_bound=scan_bound,
+        scan_tol=scan_tol,
+        loss_tol=loss_tol,
+        scan_hini=scan_hini,
+        scan_hmax=scan_hmax,
+        local_alg=local_alg,
+        max_iter=max_iter,
+        ftol_abs=ftol_abs,
+        cache=cache,
+        grad_func=grad_func,
+        tracer=tracer,
+        checkpoint=checkpoint,
+        resume=resume,
+        time_budget=time_budget,
+        deadline=deadline,
+        n_starts=n_starts,
+        starts_parallel=starts_parallel,
+        **kwargs
+        ))
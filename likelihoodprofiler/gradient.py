@@ -0,0 +1,168 @@
+import threading
+
+import numpy as np
+
+from .batch import batch_loss, scalar_loss
+from .optimizers import as_backend, GRADIENT_ALGS
+
+
+def is_gradient_alg(local_alg):
+    """Checks if :code:`local_alg` requires gradient, e.g. it is one of :code:`nlopt.LD_*` algorithms."""
+    return as_backend(local_alg).uses_gradient
+
+
+def finite_difference_gradient(loss_func, theta, f0=None, indexes=None, step=1e-6, vectorized=None):
+    """Forward finite difference approximation of :code:`loss_func` gradient. All perturbed
+    points are calculated as one batch, see :code:`batch_loss`.
+
+    Parameters
+    ----------
+    loss_func : Function
+        loss function, scalar or batch.
+    theta : Array[Float64]
+        point of differentiation.
+    f0 : Float64 or None
+        value of :code:`loss_func(theta)` if it is already known.
+    indexes : Array[Int] or None
+        components to differentiate. The default is all components.
+    step : Float64
+        relative step, the absolute step is :code:`step * max(1, abs(theta[i]))`.
+    vectorized : Bool or None
+        :code:`True` if :code:`loss_func` follows batch protocol.
+
+    Returns
+    -------
+    Array[Float64]
+        partial derivatives for :code:`indexes`.
+
+    """
+    theta = np.asarray(theta, dtype=np.float64)
+    if indexes is None:
+        indexes = np.arange(len(theta))
+    n = len(indexes)
+    steps = step * np.maximum(1.0, np.abs(theta[indexes]))
+
+    thetas = np.tile(theta, (n + (f0 is None), 1))
+    thetas[np.arange(n), indexes] += steps
+    losses = batch_loss(loss_func, thetas, vectorized)
+    if f0 is None:
+        f0 = losses[n]
+
+    return (losses[0:n] - f0) / steps
+
+
+def finite_difference_hessian(loss_func, theta, step=1e-4, vectorized=None):
+    """Central finite difference approximation of :code:`loss_func` gradient and Hessian. All
+    :code:`2 n^2 + 1` points are calculated as one batch, see :code:`batch_loss`.
+
+    Parameters
+    ----------
+    loss_func : Function
+        loss function, scalar or batch.
+    theta : Array[Float64]
+        point of differentiation.
+    step : Float64
+        relative step, the absolute step is :code:`step * max(1, abs(theta[i]))`.
+    vectorized : Bool or None
+        :code:`True` if :code:`loss_func` follows batch protocol.
+
+    Returns
+    -------
+    Array
+        * Value of :code:`loss_func(theta)`.
+        * Gradient: :code:`Array[Float64]`.
+        * Hessian: :code:`Array[Array[Float64]]`.
+
+    """
+    theta = np.asarray(theta, dtype=np.float64)
+    n = len(theta)
+    steps = step * np.maximum(1.0, np.abs(theta))
+    shifts = np.diag(steps)
+
+    # theta, theta +- h_i, theta +- h_i +- h_j for i < j
+    pairs = [(i, j) for i in range(n) for j in range(i + 1, n)]
+    thetas = [theta]
+    thetas += [theta + shifts[i] for i in range(n)] + [theta - shifts[i] for i in range(n)]
+    for i, j in pairs:
+        thetas += [
+            theta + shifts[i] + shifts[j],
+            theta + shifts[i] - shifts[j],
+            theta - shifts[i] + shifts[j],
+            theta - shifts[i] - shifts[j]
+            ]
+    losses = batch_loss(loss_func, np.array(thetas), vectorized)
+
+    f0 = losses[0]
+    f_plus = losses[1:n+1]
+    f_minus = losses[n+1:2*n+1]
+    grad = (f_plus - f_minus) / (2. * steps)
+    hess = np.diag((f_plus - 2. * f0 + f_minus) / steps**2)
+    for k, (i, j) in enumerate(pairs):
+        f_pp, f_pm, f_mp, f_mm = losses[2*n+1+4*k:2*n+5+4*k]
+        hess[i, j] = hess[j, i] = (f_pp - f_pm - f_mp + f_mm) / (4. * steps[i] * steps[j])
+
+    return f0, grad, hess
+
+
+class LossGradSplit:
+    """Splits function returning tuple :code:`(loss, grad)` into loss and gradient functions.
+    The last result is stored so the pair of calls for the same point calculates the function once.
+    The result is stored per thread, so the concurrent optimizations get their own gradients.
+
+    Parameters
+    ----------
+    loss_grad_func : Function
+        function returning :code:`(loss, grad)`.
+    """
+    def __init__(self, loss_grad_func):
+        self.loss_grad_func = loss_grad_func
+        self._local = threading.local()
+
+    def __getstate__(self):
+        # thread-local storage cannot be pickled, required for process pools
+        return {"loss_grad_func": self.loss_grad_func}
+
+    def __setstate__(self, state):
+        self.__init__(state["loss_grad_func"])
+
+    def loss(self, theta):
+        loss, grad = self.loss_grad_func(theta)
+        # key and gradient are one value, i.e. they are always from the same call
+        self._local.last = (np.asarray(theta, dtype=np.float64).tobytes(), np.asarray(grad, dtype=np.float64))
+        return loss
+
+    def grad(self, theta):
+        key = np.asarray(theta, dtype=np.float64).tobytes()
+        last = getattr(self._local, "last", None)
+        if last is None or last[0] != key:
+            self.loss(theta)
+            last = self._local.last
+        return last[1]
+
+
+def resolve_gradient(loss_func, grad_func=None):
+    """Prepares :code:`loss_func` and gradient function from :code:`grad_func` option.
+
+    Parameters
+    ----------
+    loss_func : Function
+        loss function.
+    grad_func : Function or String or None
+        gradient of :code:`loss_func` as function of parameter vector, or :code:`"loss"` if :code:`loss_func`
+        returns tuple :code:`(loss, grad)`. :code:`None` means finite differences when gradient is required.
+
+    Returns
+    -------
+    Array
+        * Scalar loss function.
+        * Gradient function or :code:`None` for finite differences.
+
+    """
+    if grad_func is None or callable(grad_func):
+        # the batch loss function is called through batch method of the wrapper
+        return scalar_loss(loss_func), grad_func
+    elif grad_func == "loss":
+        split = LossGradSplit(loss_func)
+        return split.loss, split.grad
+    else:
+        raise ValueError("Unknown grad_func option {}".format(grad_func))
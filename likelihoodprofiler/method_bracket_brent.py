@@ -0,0 +1,220 @@
+import math
+import numpy as np
+import nlopt
+
+from .profile import profile
+from .optimizers import check_local_alg
+from .cache import cached_loss_func
+from .tracing import traced_loss_func, tracer_context
+from .checkpoint import as_checkpoint
+from .budget import resolve_deadline, time_left
+
+
+def brent_step(a, fa, b, fb, c, fc, d, e, tol):
+    """One step of Brent's root finding for the bracket :code:`[b, c]`, :code:`b` is the best estimate
+    and :code:`a` is the previous one. The inverse quadratic or secant interpolation is used when it
+    is inside the bracket and converges fast enough, otherwise bisection.
+
+    Returns
+    -------
+    Array
+        the next point and new values of step lengths :code:`d, e`.
+    """
+    xm = 0.5 * (c - b)
+    interpolate = abs(e) >= tol and abs(fa) > abs(fb) and all(math.isfinite(f) for f in (fa, fb, fc))
+    if interpolate:
+        s = fb / fa
+        if a == c:
+            # secant
+            p = 2. * xm * s
+            q = 1. - s
+        else:
+            # inverse quadratic interpolation
+            q = fa / fc
+            r = fb / fc
+            p = s * (2. * xm * q * (q - r) - (b - a) * (r - 1.))
+            q = (q - 1.) * (r - 1.) * (s - 1.)
+        if p > 0:
+            q = -q
+        p = abs(p)
+        if 2. * p < min(3. * xm * q - abs(tol * q), abs(e * q)):
+            e, d = d, p / q
+        else:
+            d = e = xm
+    else:
+        d = e = xm
+    x = b + d if abs(d) > tol else b + math.copysign(tol, xm)
+    return x, d, e
+
+
+def get_right_endpoint_by_bracket_brent(
+    theta_init,  # initial point of parameters
+    theta_num,  # number of parameter to scan
+    loss_func,  # lambda(theta) - labmbda_min - delta_lambda
+    theta_bounds=[],
+    scan_bound=9.0,
+    scan_tol=1e-3,
+    loss_tol=0,  # 1e-3,
+    # method args
+    scan_hini=1.,
+    scan_hmax=np.inf,
+    # local alg args
+    local_alg=nlopt.LN_NELDERMEAD,
+    max_iter=10**5,
+    ftol_abs=1e-3,
+    cache=None,  # EvaluationCache or True to memoize loss_func
+    grad_func=None,  # gradient for LD_* algorithms, see profile()
+    tracer=None,  # EvaluationTracer to record loss_func calls
+    checkpoint=None,  # path or Checkpoint to save the search state
+    resume=False,  # continue from the checkpoint
+    time_budget=None,  # wall time limit, seconds
+    deadline=None,  # time.monotonic() value to stop
+    n_starts=1,  # local optimizations for every profile point, see profile()
+    starts_parallel=None,  # pool for the starts, see profile()
+    **kwargs  # options for local fitter
+    ):
+    """Finds the right endpoint in two stages. The profile function is calculated with increasing steps
+    (extrapolated by secant when the profile grows) until it crosses zero, then the root is refined
+    inside the bracket by Brent's method. Every profile point starts optimization from the parameters
+    of the nearest bracket end.
+    """
+    if len(theta_bounds) == 0:
+        theta_bounds = np.tile([(-1)*np.inf, np.inf], (len(theta_init), 1))
+
+    loss_func = cached_loss_func(traced_loss_func(loss_func, tracer), cache)
+
+    # checking arguments
+    check_local_alg(local_alg, theta_init)
+
+    # to count loss function calls inside this function, accumulation
+    accum_counter = 0
+    # empty container
+    pps = []
+
+    deadline = resolve_deadline(time_budget, deadline)
+
+    checkpoint = as_checkpoint(checkpoint, theta_init=theta_init, theta_num=theta_num, scan_bound=scan_bound,
+                               scan_tol=scan_tol, loss_tol=loss_tol)
+    state = checkpoint.load("BRACKET_BRENT") if (checkpoint is not None and resume) else None
+    if state is not None and "result" in state:
+        return state["result"]
+
+    def finish(result):
+        if checkpoint is None:
+            return result
+        return checkpoint.save_result("BRACKET_BRENT", result, accum_counter)
+
+    prof = profile(
+        theta_init,
+        theta_num,
+        loss_func,
+        theta_bounds=theta_bounds,
+        local_alg=local_alg,
+        ftol_abs=loss_tol,
+        grad_func=grad_func,
+        n_starts=n_starts,
+        starts_parallel=starts_parallel
+    )
+
+    x_max = min(scan_bound, theta_bounds[theta_num][1])
+
+    # expansion stage: the last point inside is a, the new point is b
+    # bracketing stage: the root is between b (best estimate) and c, a is the previous b
+    x_next = theta_init[theta_num]
+    theta_init_next = theta_init
+    bracketed = False
+    a = fa = pa = None
+    b = fb = pb = None
+    c = fc = pc = None
+    d = e = None
+
+    if state is not None:
+        pps, accum_counter, bracketed, x_next, theta_init_next = state["pps"], state["counter"], state["bracketed"], state["x_next"], state["theta_init_next"]
+        a, fa, pa, b, fb, pb, c, fc, pc, d, e = state["points"]
+
+    while True:
+        if time_left(deadline) <= 0:
+            return finish([None, pps, "TIME_BUDGET_STOP"])
+
+        # get profile point
+        with tracer_context(tracer, stage="profile"):
+            point = prof(
+                x_next,
+                theta_init_i=theta_init_next,  # the nearest known point
+                maxeval=max_iter - accum_counter,  # how many calls left
+                deadline=deadline
+                )
+        pps.append(point)
+        accum_counter += point.counter # update counter
+        if point.ret == 5:
+            return finish([None, pps, "MAX_ITER_STOP"])
+        elif point.ret == -5:
+            return finish([None, pps, "LOSS_ERROR_STOP"])
+        elif point.ret == 6:  # the point is not optimal
+            return finish([None, pps, "TIME_BUDGET_STOP"])
+        elif not math.isfinite(point.loss):
+            # nan is neither inside nor outside, the border cannot be bracketed
+            return finish([None, pps, "LOSS_ERROR_STOP"])
+        elif math.isclose(point.loss, 0., abs_tol=loss_tol):
+            return finish([x_next, pps, "BORDER_FOUND_BY_LOSS_TOL"])
+
+        if not bracketed:
+            if b is None and point.loss > 0.:
+                # theta_init is outside critical level, going right until the first point inside
+                if x_next >= x_max:
+                    return finish([None, pps, "SCAN_BOUND_REACHED"])
+                x_next = min([x_next + scan_hini, x_max])
+                theta_init_next = point.params
+            elif point.loss < 0.:
+                if x_next >= x_max:
+                    return finish([None, pps, "SCAN_BOUND_REACHED"])
+                # next step
+                if b is None:
+                    x_extrapol = x_next + scan_hini
+                else:
+                    step = x_next - b
+                    if point.loss > fb:
+                        # secant overshoots for convex profile, so the next point is usually outside
+                        x_extrapol = x_next + min(max(step * point.loss / (fb - point.loss), step), 4. * step)
+                    else:
+                        x_extrapol = x_next + 2. * step
+                b, fb, pb = x_next, point.loss, point.params
+                x_next = min([x_next + scan_hmax, x_extrapol, x_max])
+                theta_init_next = pb
+            elif point.loss > 0.:
+                # profile crosses zero between b and x_next
+                bracketed = True
+                a, fa, pa = b, fb, pb
+                b, fb, pb = x_next, point.loss, point.params
+                c, fc, pc = a, fa, pa
+                d = e = b - a
+        else:
+            a, fa, pa = b, fb, pb
+            b, fb, pb = x_next, point.loss, point.params
+            if (fb > 0) == (fc > 0):
+                c, fc, pc = a, fa, pa
+                d = e = b - a
+
+        if bracketed:
+            if abs(fc) < abs(fb):
+                a, fa, pa = b, fb, pb
+                b, fb, pb = c, fc, pc
+                c, fc, pc = a, fa, pa
+            tol = 2. * np.finfo(float).eps * abs(b) + 0.5 * scan_tol
+            # the bracket is small or the secant correction is small like in LIN_EXTRAPOL
+            if abs(0.5 * (c - b)) <= tol or (fa != fb and abs((b - a) * fb / (fb - fa)) <= scan_tol):
+                return finish([b, pps, "BORDER_FOUND_BY_SCAN_TOL"])
+            x_next, d, e = brent_step(a, fa, b, fb, c, fc, d, e, tol)
+            # warm start from the nearest end of the bracket
+            theta_init_next = pb if abs(x_next - b) <= abs(x_next - c) else pc
+
+        if checkpoint is not None:
+            checkpoint.maybe_save(lambda: {
+                "method": "BRACKET_BRENT",
+                "pps": pps,
+                "counter": accum_counter,
+                "bracketed": bracketed,
+                "x_next": x_next,
+                "theta_init_next": theta_init_next,
+                "points": (a, fa, pa, b, fb, pb, c, fc, pc, d, e)
+                })
@@ -0,0 +1,212 @@
+import math
+import numpy as np
+import nlopt
+
+from .profile import profile
+from .optimizers import check_local_alg
+from .cache import cached_loss_func
+from .tracing import traced_loss_func, tracer_context
+from .checkpoint import as_checkpoint
+from .budget import resolve_deadline, time_left
+
+
+def fit_local_polynomial(xs, losses, x_ref, degree=2):
+    """Local polynomial model of the profile near :code:`x_ref` by weighted least squares.
+    The weights decrease with the distance relative to the :code:`degree + 1` nearest points,
+    so the model almost interpolates them and far points only stabilize the fit.
+
+    Returns
+    -------
+    Array
+        coefficients of the polynomial of :code:`x - x_ref`, highest power first as in :code:`np.roots`.
+    """
+    dx = np.asarray(xs, dtype=np.float64) - x_ref
+    losses = np.asarray(losses, dtype=np.float64)
+    degree = min(degree, len(dx) - 1)
+    dist = np.abs(dx)
+    h = max(np.sort(dist)[degree], np.finfo(float).tiny)
+    w = np.sqrt(1. / (1. + (dist / h)**4))
+    A = np.vander(dx, degree + 1) * w[:, None]
+    return np.linalg.lstsq(A, losses * w, rcond=None)[0]
+
+
+def surrogate_root(xs, losses, x_ref, lo, hi=None):
+    """Zero of the local polynomial model inside :code:`(lo, hi)` nearest to :code:`x_ref`,
+    :code:`hi = None` means the first zero to the right of :code:`lo`. Returns :code:`None` if there is no zero."""
+    coef = fit_local_polynomial(xs, losses, x_ref)
+    roots = np.roots(coef) if np.any(coef[:-1] != 0.) else []
+    roots = [r.real + x_ref for r in roots if abs(r.imag) <= 1e-9 * max(1., abs(r.real))]
+    roots = [r for r in roots if r > lo and (hi is None or r < hi)]
+    if len(roots) == 0:
+        return None
+    if hi is None:
+        return min(roots)
+    return min(roots, key=lambda r: abs(r - x_ref))
+
+
+def get_right_endpoint_by_surrogate(
+    theta_init,  # initial point of parameters
+    theta_num,  # number of parameter to scan
+    loss_func,  # lambda(theta) - labmbda_min - delta_lambda
+    theta_bounds=[],
+    scan_bound=9.0,
+    scan_tol=1e-3,
+    loss_tol=0,  # 1e-3,
+    # method args
+    scan_hini=1.,
+    scan_hmax=np.inf,
+    # local alg args
+    local_alg=nlopt.LN_NELDERMEAD,
+    max_iter=10**5,
+    ftol_abs=1e-3,
+    cache=None,  # EvaluationCache or True to memoize loss_func
+    grad_func=None,  # gradient for LD_* algorithms, see profile()
+    tracer=None,  # EvaluationTracer to record loss_func calls
+    checkpoint=None,  # path or Checkpoint to save the search state
+    resume=False,  # continue from the checkpoint
+    time_budget=None,  # wall time limit, seconds
+    deadline=None,  # time.monotonic() value to stop
+    n_starts=1,  # local optimizations for every profile point, see profile()
+    starts_parallel=None,  # pool for the starts, see profile()
+    **kwargs  # options for local fitter
+    ):
+    """Finds the right endpoint using surrogate model of the profile function. The local quadratic
+    polynomial is fitted to all profile points calculated so far and its zero is the next scan value.
+    The search stops when the zero is closer than :code:`scan_tol` to the last point or the bracket
+    of the crossing is narrower than :code:`scan_tol`. Before the crossing is bracketed the step
+    is limited by four distances from the initial point (at least :code:`scan_hini`), inside the
+    bracket bisection is used when the model has no zero. Every profile point starts optimization
+    from the parameters of the nearest calculated point.
+    """
+    if len(theta_bounds) == 0:
+        theta_bounds = np.tile([(-1)*np.inf, np.inf], (len(theta_init), 1))
+
+    loss_func = cached_loss_func(traced_loss_func(loss_func, tracer), cache)
+
+    # checking arguments
+    check_local_alg(local_alg, theta_init)
+
+    # to count loss function calls inside this function, accumulation
+    accum_counter = 0
+    # empty container
+    pps = []
+
+    deadline = resolve_deadline(time_budget, deadline)
+
+    checkpoint = as_checkpoint(checkpoint, theta_init=theta_init, theta_num=theta_num, scan_bound=scan_bound,
+                               scan_tol=scan_tol, loss_tol=loss_tol)
+    state = checkpoint.load("SURROGATE") if (checkpoint is not None and resume) else None
+    if state is not None and "result" in state:
+        return state["result"]
+
+    def finish(result):
+        if checkpoint is None:
+            return result
+        return checkpoint.save_result("SURROGATE", result, accum_counter)
+
+    prof = profile(
+        theta_init,
+        theta_num,
+        loss_func,
+        theta_bounds=theta_bounds,
+        local_alg=local_alg,
+        ftol_abs=loss_tol,
+        grad_func=grad_func,
+        n_starts=n_starts,
+        starts_parallel=starts_parallel
+    )
+
+    x_init = theta_init[theta_num]
+    x_max = min(scan_bound, theta_bounds[theta_num][1])
+
+    x_next = x_init
+    theta_init_next = theta_init
+
+    if state is not None:
+        pps, accum_counter, x_next, theta_init_next = state["pps"], state["counter"], state["x_next"], state["theta_init_next"]
+
+    while True:
+        if time_left(deadline) <= 0:
+            return finish([None, pps, "TIME_BUDGET_STOP"])
+        # the profile without optimization does not check maxeval
+        if accum_counter >= max_iter:
+            return finish([None, pps, "MAX_ITER_STOP"])
+
+        # get profile point
+        with tracer_context(tracer, stage="profile"):
+            point = prof(
+                x_next,
+                theta_init_i=theta_init_next,  # the nearest known point
+                maxeval=max_iter - accum_counter,  # how many calls left
+                deadline=deadline
+                )
+        pps.append(point)
+        accum_counter += point.counter # update counter
+        if point.ret == 5:
+            return finish([None, pps, "MAX_ITER_STOP"])
+        elif point.ret == -5:
+            return finish([None, pps, "LOSS_ERROR_STOP"])
+        elif point.ret == 6:  # the point is not optimal
+            return finish([None, pps, "TIME_BUDGET_STOP"])
+        elif not math.isfinite(point.loss):
+            # the surrogate cannot be fitted to nan, the next point would be the same
+            return finish([None, pps, "LOSS_ERROR_STOP"])
+        elif math.isclose(point.loss, 0., abs_tol=loss_tol):
+            return finish([x_next, pps, "BORDER_FOUND_BY_LOSS_TOL"])
+
+        # the surrogate data: all points with valid loss
+        valid = [pp for pp in pps if pp.loss is not None and math.isfinite(pp.loss)]
+        xs = [pp.value for pp in valid]
+        losses = [pp.loss for pp in valid]
+
+        inside = [pp for pp in valid if pp.loss < 0.]
+        if len(inside) == 0:
+            # theta_init is outside critical level, going right until the first point inside
+            if x_next >= x_max:
+                return finish([None, pps, "SCAN_BOUND_REACHED"])
+            x_next = min([x_next + scan_hini, x_max])
+            theta_init_next = point.params
+        else:
+            # the crossing is between lo (inside) and hi (outside)
+            lo_point = max(inside, key=lambda pp: pp.value)
+            lo = lo_point.value
+            outside = [pp for pp in valid if pp.loss > 0. and pp.value > lo]
+            hi_point = min(outside, key=lambda pp: pp.value) if len(outside) > 0 else None
+
+            if hi_point is None:
+                if lo >= x_max:
+                    return finish([None, pps, "SCAN_BOUND_REACHED"])
+                x_root = surrogate_root(xs, losses, x_next, lo) if len(valid) > 1 else None
+                if x_root is not None and abs(x_root - x_next) <= scan_tol:
+                    return finish([x_next, pps, "BORDER_FOUND_BY_SCAN_TOL"])
+                # extrapolation is limited by the distance already passed
+                step_max = 4. * max(lo - x_init, scan_hini)
+                if x_root is None:
+                    x_root = lo + (scan_hini if lo == x_init else 2. * (lo - x_init))
+                x_next = min([max(x_root, lo + scan_tol), lo + step_max, lo + scan_hmax, x_max])
+            else:
+                hi = hi_point.value
+                if hi - lo <= scan_tol:
+                    best = lo_point if abs(lo_point.loss) <= abs(hi_point.loss) else hi_point
+                    return finish([best.value, pps, "BORDER_FOUND_BY_SCAN_TOL"])
+                x_root = surrogate_root(xs, losses, x_next, lo, hi)
+                if x_root is not None and abs(x_root - x_next) <= scan_tol:
+                    return finish([x_next, pps, "BORDER_FOUND_BY_SCAN_TOL"])
+                if x_root is None:
+                    x_root = 0.5 * (lo + hi)
+                # keeping the distance from the bracket ends to shrink the bracket
+                margin = min(0.5 * scan_tol, 0.25 * (hi - lo))
+                x_next = min(max(x_root, lo + margin), hi - margin)
+
+            # warm start from the nearest point
+            nearest = min(valid, key=lambda pp: abs(pp.value - x_next))
+            theta_init_next = nearest.params
+
+        if checkpoint is not None:
+            checkpoint.maybe_save(lambda: {
+                "method": "SURROGATE",
+                "pps": pps,
+                "counter": accum_counter,
+                "x_next": x_next,
+                "theta_init_next": theta_init_next
+                })
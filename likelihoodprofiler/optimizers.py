@@ -0,0 +1,350 @@
+import math
+import time
+import warnings
+
+import nlopt
+import numpy as np
+
+# return codes of optimization, the values of NLOPT are used for all backends
+SUCCESS = 1
+FTOL_REACHED = 3
+XTOL_REACHED = 4
+MAXEVAL_REACHED = 5
+MAXTIME_REACHED = 6
+FAILURE = -1
+ROUNDOFF_LIMITED = -4
+FORCED_STOP = -5
+
+# local derivative-based algorithms from NLOPT pack
+GRADIENT_ALGS = [
+    nlopt.LD_LBFGS,
+    nlopt.LD_LBFGS_NOCEDAL,
+    nlopt.LD_SLSQP,
+    nlopt.LD_MMA,
+    nlopt.LD_CCSAQ,
+    nlopt.LD_TNEWTON,
+    nlopt.LD_TNEWTON_PRECOND,
+    nlopt.LD_TNEWTON_PRECOND_RESTART,
+    nlopt.LD_TNEWTON_RESTART,
+    nlopt.LD_VAR1,
+    nlopt.LD_VAR2
+]
+
+# local algorithms which may result in wrong output
+NOT_RECOMMENDED_ALGS = [nlopt.LN_BOBYQA, nlopt.LN_SBPLX, nlopt.LN_NEWUOA]
+
+# NLOPT_FAILURE is RuntimeError in older versions of nlopt
+FAILURE_ERRORS = (RuntimeError, getattr(nlopt, "runtime_error", RuntimeError))
+
+
+def check_local_alg(local_alg, theta_init, stacklevel=3):
+    """Warns about :code:`local_alg` which is not recommended, i.e. :code:`NOT_RECOMMENDED_ALGS`, and about
+    close-to-zero components of :code:`theta_init` for :code:`nlopt.LN_NELDERMEAD`. The :code:`stacklevel`
+    is counted from the method calling the function."""
+    if local_alg in NOT_RECOMMENDED_ALGS:
+        warnings.warn("Using current local_alg may result in wrong output.", DeprecationWarning, stacklevel=stacklevel)
+
+    # when using LN_NELDERMEAD initial parameters should not be zero
+    if local_alg == nlopt.LN_NELDERMEAD:
+        zero_parameters = [i for i in range(len(theta_init)) if math.isclose(theta_init[i], 0., abs_tol=1e-2)]
+        if len(zero_parameters) > 0:
+            warnings.warn("Close-to-zero parameters {} found when using LN_NELDERMEAD.".format(zero_parameters),
+                          DeprecationWarning, stacklevel=stacklevel)
+
+
+class ForcedStop(Exception):
+    """Raised inside objective or constraint function to stop optimization with :code:`FORCED_STOP` code."""
+
+
+class OptimizerBackend:
+    """Interface of optimizers used by profile and CICO engines.
+
+    The objective and constraint functions have NLOPT signature :code:`f(x, grad)`: :code:`grad` is empty array
+    for derivative-free algorithms or array to fill with gradient if :code:`uses_gradient` is :code:`True`.
+    The functions raise :code:`ForcedStop` to stop optimization. Results are returned as :code:`(x, f, ret)`
+    where :code:`ret` is NLOPT return code, i.e. :code:`3` or :code:`1` for success, :code:`5` for :code:`maxeval`,
+    :code:`6` for :code:`maxtime`, :code:`-5` for forced stop, :code:`-1` and :code:`-4` for failures.
+    The best point found before failure is returned in the last case.
+
+    A function can have optional attribute :code:`batch`: function of 2-D array of points (one point per row)
+    returning 1-D array of values. It is used by the backends evaluating several points at once, see
+    :code:`ParallelSimplexBackend`.
+
+    Attributes
+    ----------
+    uses_gradient : Bool
+        :code:`True` if the algorithm requires gradient.
+    """
+    uses_gradient = False
+
+    def minimize(self, func, x0, lb, ub, ftol_abs=1e-3, maxeval=10**5, maxtime=None):
+        """Minimizes :code:`func` inside bounds :code:`lb, ub` starting from :code:`x0`.
+        :code:`maxtime` is the limit in seconds or :code:`None`."""
+        raise NotImplementedError
+
+    def maximize_constrained(self, func, constraints, x0, ftol_abs=1e-3, maxeval=10**5, maxtime=None, initial_step=None, lb=None, ub=None):
+        """Maximizes :code:`func` subject to inequality constraints: list of :code:`(c, tol)` meaning :code:`c(x, grad) <= tol`.
+        :code:`initial_step` is the array of steps for every component, :code:`nan` or :code:`None` means the default of the algorithm.
+        :code:`lb` and :code:`ub` are bounds of components (infinite values for no bound) handled by the algorithm itself,
+        :code:`None` means no bounds."""
+        raise NotImplementedError
+
+
+class _Best:
+    """Calls counter and the best point for the case of failure."""
+    def __init__(self, func, sign=1.):
+        self.func = func
+        self.sign = sign
+        self.x = None
+        self.f = None
+        self.counter = 0
+
+    def __call__(self, x, grad):
+        f = self.func(x, grad)
+        self.counter += 1
+        if math.isfinite(f) and (self.f is None or self.sign * f < self.sign * self.f):
+            self.x, self.f = np.copy(x), f
+        return f
+
+
+class NloptBackend(OptimizerBackend):
+    """Backend on NLOPT algorithms.
+
+    Parameters
+    ----------
+    local_alg : Int
+        NLOPT algorithm, e.g. :code:`nlopt.LN_NELDERMEAD`. The constrained optimization uses it as
+        subsidiary algorithm of :code:`nlopt.LN_AUGLAG` (:code:`nlopt.AUGLAG` for :code:`nlopt.LD_*`).
+    """
+    def __init__(self, local_alg=nlopt.LN_NELDERMEAD):
+        self.local_alg = local_alg
+        self.uses_gradient = local_alg in GRADIENT_ALGS
+
+    @staticmethod
+    def _wrap(func):
+        def wrapped(x, grad):
+            try:
+                return func(x, grad)
+            except ForcedStop as e:
+                raise nlopt.ForcedStop(str(e))
+        return wrapped
+
+    def _run(self, opt, best, x0):
+        try:
+            x = opt.optimize(x0)
+            return x, opt.last_optimum_value(), opt.last_optimize_result()
+        except nlopt.ForcedStop:
+            return x0, None, FORCED_STOP
+        except nlopt.RoundoffLimited: # typical for inexact gradients
+            return self._best_or_start(best, x0), best.f, ROUNDOFF_LIMITED
+        except FAILURE_ERRORS: # NLOPT_FAILURE, e.g. line search failed in LD_LBFGS
+            return self._best_or_start(best, x0), best.f, FAILURE
+
+    @staticmethod
+    def _best_or_start(best, x0):
+        # x0 if there is no point with finite value
+        return x0 if best.x is None else best.x
+
+    @staticmethod
+    def _set_maxtime(opt, maxtime):
+        # NLOPT treats non-positive value as no limit
+        opt.set_maxtime(0. if maxtime is None else max(maxtime, 1e-9))
+
+    @staticmethod
+    def _set_initial_step(opt, x0, initial_step):
+        if initial_step is None:
+            return
+        step = np.array(initial_step, dtype=np.float64)
+        default = ~np.isfinite(step)
+        if np.any(default):
+            step[default] = opt.get_initial_step(np.asarray(x0, dtype=np.float64))[default]
+        opt.set_initial_step(step)
+
+    def minimize(self, func, x0, lb, ub, ftol_abs=1e-3, maxeval=10**5, maxtime=None):
+        opt = nlopt.opt(self.local_alg, len(x0))
+        opt.set_ftol_abs(ftol_abs)
+        opt.set_lower_bounds(lb)
+        opt.set_upper_bounds(ub)
+        best = _Best(self._wrap(func))
+        opt.set_min_objective(best)
+        opt.set_maxeval(maxeval)
+        self._set_maxtime(opt, maxtime)
+        return self._run(opt, best, x0)
+
+    def maximize_constrained(self, func, constraints, x0, ftol_abs=1e-3, maxeval=10**5, maxtime=None, initial_step=None, lb=None, ub=None):
+        n = len(x0)
+        local_opt = nlopt.opt(self.local_alg, n)
+        local_opt.set_ftol_abs(ftol_abs)
+        self._set_initial_step(local_opt, x0, initial_step)
+
+        auglag = nlopt.AUGLAG if self.uses_gradient else nlopt.LN_AUGLAG
+        opt = nlopt.opt(auglag, n)
+        opt.set_ftol_abs(ftol_abs)
+        best = _Best(self._wrap(func), sign=-1.)
+        opt.set_max_objective(best)
+        opt.set_local_optimizer(local_opt)
+        opt.set_maxeval(maxeval)
+        self._set_maxtime(opt, maxtime)
+        self._set_initial_step(opt, x0, initial_step)
+        # AUGLAG passes the bounds to the subsidiary algorithm
+        if lb is not None:
+            opt.set_lower_bounds(lb)
+        if ub is not None:
+            opt.set_upper_bounds(ub)
+        for constraint, tol in constraints:
+            opt.add_inequality_constraint(self._wrap(constraint), tol)
+        return self._run(opt, best, x0)
+
+
+# replaces infinite constraint values in scipy backend
+BIG_VALUE = 1e20
+
+
+class _Stop(Exception):
+    def __init__(self, ret):
+        self.ret = ret
+
+
+class ScipyBackend(OptimizerBackend):
+    """Backend on :code:`scipy.optimize.minimize`. SciPy is imported on the first use.
+
+    Parameters
+    ----------
+    method : String
+        method of :code:`scipy.optimize.minimize`: :code:`"Nelder-Mead"`, :code:`"Powell"`, :code:`"L-BFGS-B"`,
+        :code:`"SLSQP"`, :code:`"trust-constr"`, :code:`"COBYLA"`, etc. The constrained optimization (CICO) uses
+        the method if it supports constraints, otherwise :code:`"SLSQP"` for gradient-based and :code:`"COBYLA"`
+        for derivative-free methods.
+    options : Dict or None
+        additional options of the method.
+    """
+    GRADIENT_METHODS = ["CG", "BFGS", "Newton-CG", "L-BFGS-B", "TNC", "SLSQP", "trust-constr"]
+    CONSTRAINED_METHODS = ["SLSQP", "trust-constr", "COBYLA", "COBYQA"]
+
+    def __init__(self, method="Nelder-Mead", options=None):
+        self.method = method
+        self.options = {} if options is None else options
+        self.uses_gradient = method in self.GRADIENT_METHODS
+
+    def _tol_options(self, method, ftol_abs):
+        # the nearest analogue of absolute tolerance for every method
+        tol = ftol_abs if ftol_abs > 0 else 1e-8
+        options = {
+            "Nelder-Mead": {"fatol": tol, "xatol": 1e-6},
+            "Powell": {"ftol": tol},
+            "L-BFGS-B": {"ftol": tol},
+            "SLSQP": {"ftol": tol},
+            "COBYLA": {"tol": tol},
+            "trust-constr": {"xtol": tol}
+        }.get(method, {})
+        options.update(self.options)
+        return options
+
+    def _objective(self, func, uses_gradient, counter, maxeval, deadline, sign=1.):
+        n_calls = [0]
+        def objective(x):
+            if n_calls[0] >= maxeval:
+                raise _Stop(MAXEVAL_REACHED)
+            if deadline is not None and time.monotonic() >= deadline:
+                raise _Stop(MAXTIME_REACHED)
+            n_calls[0] += 1
+            grad = np.zeros(len(x)) if uses_gradient else np.zeros(0)
+            f = counter(np.asarray(x, dtype=np.float64), grad)
+            if uses_gradient:
+                return sign * f, sign * grad
+            return sign * f
+        return objective
+
+    def _run(self, method, objective, best, x0, sign=1., **kwargs):
+        from scipy.optimize import minimize
+
+        try:
+            res = minimize(objective, np.asarray(x0, dtype=np.float64), method=method, **kwargs)
+        except _Stop as e:
+            return best.x if best.x is not None else x0, best.f, e.ret
+        except ForcedStop:
+            return x0, None, FORCED_STOP
+        if res.success:
+            return res.x, sign * res.fun, FTOL_REACHED
+        if best.x is None:
+            return x0, None, FAILURE
+        message = str(res.message).lower()
+        if "maximum" in message or "limit" in message:
+            # internal limits of the method, e.g. maxiter
+            return best.x, best.f, MAXEVAL_REACHED
+        return best.x, best.f, FAILURE
+
+    @staticmethod
+    def _bounds(n, lb, ub):
+        # scipy form of bounds, None for no bounds
+        lb = np.full(n, -np.inf) if lb is None else lb
+        ub = np.full(n, np.inf) if ub is None else ub
+        if not (np.any(np.isfinite(lb)) or np.any(np.isfinite(ub))):
+            return None
+        return [(l if np.isfinite(l) else None, u if np.isfinite(u) else None) for l, u in zip(lb, ub)]
+
+    def minimize(self, func, x0, lb, ub, ftol_abs=1e-3, maxeval=10**5, maxtime=None):
+        deadline = None if maxtime is None else time.monotonic() + maxtime
+        best = _Best(func)
+        objective = self._objective(func, self.uses_gradient, best, maxeval, deadline)
+        return self._run(
+            self.method, objective, best, x0,
+            jac=self.uses_gradient or None,
+            bounds=self._bounds(len(x0), lb, ub),
+            options=self._tol_options(self.method, ftol_abs)
+            )
+
+    def maximize_constrained(self, func, constraints, x0, ftol_abs=1e-3, maxeval=10**5, maxtime=None, initial_step=None, lb=None, ub=None):
+        deadline = None if maxtime is None else time.monotonic() + maxtime
+        if self.method in self.CONSTRAINED_METHODS:
+            method = self.method
+        else:
+            method = "SLSQP" if self.uses_gradient else "COBYLA"
+        uses_gradient = method in self.GRADIENT_METHODS
+
+        best = _Best(func, sign=-1.)
+        objective = self._objective(func, uses_gradient, best, maxeval, deadline, sign=-1.)
+
+        def scipy_constraint(constraint, tol):
+            # scipy form is c(x) >= 0, the value and gradient are calculated together and reused
+            # infinite values, e.g. for infinite bounds, make SLSQP subproblem incompatible
+            last = {}
+            def evaluate(x):
+                x = np.asarray(x, dtype=np.float64)
+                key = x.tobytes()
+                if last.get("key") != key:
+                    grad = np.zeros(len(x) if uses_gradient else 0)
+                    last.update(key=key, value=constraint(x, grad), grad=grad)
+                return last
+            c = {"type": "ineq", "fun": lambda x: np.clip(tol - evaluate(x)["value"], -BIG_VALUE, BIG_VALUE)}
+            if uses_gradient:
+                c["jac"] = lambda x: -evaluate(x)["grad"]
+            return c
+
+        options = self._tol_options(method, ftol_abs)
+        if initial_step is not None and method == "COBYLA" and np.any(np.isfinite(initial_step)):
+            # the only method with the option, it is scalar
+            options.setdefault("rhobeg", float(np.nanmin(initial_step)))
+
+        return self._run(
+            method, objective, best, x0, sign=-1.,
+            jac=uses_gradient or None,
+            constraints=[scipy_constraint(constraint, tol) for constraint, tol in constraints],
+            bounds=self._bounds(len(x0), lb, ub),
+            options=options
+            )
+
+
+def as_backend(local_alg):
+    """Applies :code:`local_alg` option: NLOPT algorithm code, :code:`"scipy:<method>"` string,
+    :code:`"parallel_simplex"` for :code:`ParallelSimplexBackend` with default options or :code:`OptimizerBackend`."""
+    if isinstance(local_alg, OptimizerBackend):
+        return local_alg
+    if isinstance(local_alg, str):
+        if local_alg.startswith("scipy:"):
+            return ScipyBackend(local_alg[len("scipy:"):])
+        if local_alg == "parallel_simplex":
+            from .parallel_simplex import ParallelSimplexBackend
+            return ParallelSimplexBackend()
+        raise ValueError("Unknown local_alg {}: use NLOPT algorithm, \"scipy:<method>\", \"parallel_simplex\" or OptimizerBackend".format(local_alg))
+    return NloptBackend(local_alg)
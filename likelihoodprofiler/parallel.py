@@ -0,0 +1,34 @@
+from concurrent.futures import Executor
+from contextlib import contextmanager
+
+
+@contextmanager
+def executor_scope(parallel, max_workers=None):
+    """Context manager providing :code:`concurrent.futures.Executor` for parallel modes.
+
+    Parameters
+    ----------
+    parallel : String or Executor
+        :code:`"thread"` for :code:`ThreadPoolExecutor`, :code:`"process"` for :code:`ProcessPoolExecutor`
+        or any user-supplied :code:`Executor`. The user-supplied executor is not shut down on exit.
+    max_workers : Int or None
+        maximal number of workers for the created pool. The default is chosen by :code:`concurrent.futures`.
+
+    Returns
+    -------
+    Executor
+        executor to submit the tasks.
+
+    """
+    if isinstance(parallel, Executor):
+        yield parallel
+    elif parallel == "thread":
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers) as executor:
+            yield executor
+    elif parallel == "process":
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers) as executor:
+            yield executor
+    else:
+        raise ValueError("Unknown parallel mode {}: use \"thread\", \"process\" or Executor".format(parallel))
@@ -0,0 +1,264 @@
+import time
+from contextlib import nullcontext
+
+import numpy as np
+
+from .optimizers import OptimizerBackend, ForcedStop, FTOL_REACHED, XTOL_REACHED, MAXEVAL_REACHED, MAXTIME_REACHED, FAILURE, FORCED_STOP
+from .parallel import executor_scope
+
+
+class _Stop(Exception):
+    def __init__(self, ret):
+        self.ret = ret
+
+
+class _Evaluator:
+    """Evaluates batches of points for one optimization run and checks the limits. The functions are called through :code:`batch` attribute if it exists,
+    otherwise on :code:`executor` or one after another."""
+    def __init__(self, executor, maxeval, deadline):
+        self.executor = executor
+        self.maxeval = maxeval
+        self.deadline = deadline
+        self.counter = 0
+
+    def check(self, n_points):
+        if self.counter + n_points > self.maxeval:
+            raise _Stop(MAXEVAL_REACHED)
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            raise _Stop(MAXTIME_REACHED)
+
+    def values(self, func, xs):
+        batch = getattr(func, "batch", None)
+        if batch is not None:
+            values = batch(xs)
+        elif self.executor is None:
+            values = [func(x, np.zeros(0)) for x in xs]
+        else:
+            values = list(self.executor.map(lambda x: func(x, np.zeros(0)), xs))
+        values = np.asarray(values, dtype=np.float64).reshape(len(xs))
+        # failures and nan are never accepted
+        return np.where(np.isnan(values), np.inf, values)
+
+
+class ParallelSimplexBackend(OptimizerBackend):
+    """Derivative-free backend proposing several trial points per iteration: parallel Nelder-Mead
+    method of D. Lee and M. Wiswall. Every iteration moves :code:`batch_size` worst vertices of the simplex
+    at once: all reflections are one batch and the expansions or contractions are the second one, so
+    :code:`loss_func` is called with batches of several points. The simplex shrinks when no vertex is improved.
+
+    The batch is evaluated by :code:`func.batch(xs)` if the function has the attribute, e.g. :code:`profile`
+    sets it for the loss function marked by :code:`vectorized`, otherwise on the :code:`parallel` pool
+    or one point after another. The constrained optimization (CICO) uses augmented Lagrangian
+    with the same simplex method for the subproblems.
+
+    Parameters
+    ----------
+    parallel : String or Executor or None
+        pool to evaluate batches if the function has no :code:`batch` attribute: :code:`"thread"` or
+        any :code:`concurrent.futures.Executor` which runs local functions, e.g. thread pool. The pool
+        is created for every optimization if it is not :code:`Executor`. The default :code:`None` evaluates
+        points one after another.
+    max_workers : Int or None
+        maximal number of workers for :code:`parallel` pool created internally.
+    batch_size : Int or None
+        number of vertices moved per iteration. The default :code:`None` means half of the dimension. The
+        value close to the dimension decreases the number of iterations but the simplex tends to collapse.
+    speculative : Bool
+        evaluates reflection, expansion and both contractions as one batch of :code:`4 batch_size` points,
+        i.e. one parallel step per iteration instead of two for the price of more calls.
+    initial_size : Float64
+        relative size of the initial simplex, the steps are :code:`initial_size * max(1, abs(x0))`.
+    xtol_rel : Float64
+        relative size of the simplex to stop.
+    """
+    uses_gradient = False
+
+    def __init__(self, parallel=None, max_workers=None, batch_size=None, speculative=False, initial_size=0.1, xtol_rel=1e-8):
+        if parallel == "process":
+            raise ValueError("Process pool cannot evaluate local functions, use \"thread\" or Executor")
+        self.parallel = parallel
+        self.max_workers = max_workers
+        self.batch_size = batch_size
+        self.speculative = speculative
+        self.initial_size = initial_size
+        self.xtol_rel = xtol_rel
+
+    def _executor_scope(self):
+        if self.parallel is None:
+            return nullcontext()
+        return executor_scope(self.parallel, self.max_workers)
+
+    def _initial_simplex(self, x0, lb, ub, initial_step):
+        step = self.initial_size * np.maximum(1., np.abs(x0))
+        if initial_step is not None:
+            initial_step = np.asarray(initial_step, dtype=np.float64)
+            step = np.where(np.isfinite(initial_step) & (initial_step > 0), initial_step, step)
+        # the steps towards the far bound
+        step = np.where(x0 + step > ub, -step, step)
+        return np.vstack((x0, x0 + np.diag(step)))
+
+    def _search(self, evaluate, x0, lb, ub, ftol_abs, initial_step, evaluator):
+        """Minimizes :code:`evaluate(xs)` starting from :code:`x0`, returns :code:`(x, f, ret)`."""
+        clip = lambda xs: np.clip(xs, lb, ub)
+        simplex = clip(self._initial_simplex(x0, lb, ub, initial_step))
+        evaluator.check(len(simplex))
+        values = evaluate(simplex)
+        n = len(x0)
+        p = max(1, n // 2) if self.batch_size is None else min(self.batch_size, n)
+        m = n + 1 - p  # vertices which are not updated
+        size0 = np.max(np.abs(simplex[1:] - simplex[0]))
+        try:
+            while True:
+                order = np.argsort(values, kind="stable")
+                simplex, values = simplex[order], values[order]
+                if np.isfinite(values[-1]) and values[-1] - values[0] <= ftol_abs:
+                    return simplex[0], values[0], FTOL_REACHED
+                if np.max(np.abs(simplex[1:] - simplex[0])) <= self.xtol_rel * max(size0, np.max(np.abs(simplex[0])), 1e-300):
+                    return simplex[0], values[0], XTOL_REACHED
+
+                # p worst vertices are moved as in Nelder-Mead against the centroid of the others
+                centroid = np.mean(simplex[0:m], axis=0)
+                direction = centroid - simplex[m:]
+                reflected = clip(centroid + direction)
+                candidates = {
+                    "expanded": clip(centroid + 2. * direction),
+                    "outside": clip(centroid + 0.5 * direction),
+                    "inside": clip(centroid - 0.5 * direction)
+                    }
+                if self.speculative:
+                    evaluator.check(4 * p)
+                    trial = evaluate(np.vstack([reflected] + list(candidates.values())))
+                    f_reflected = trial[0:p]
+                    f_candidates = dict(zip(candidates, np.split(trial[p:], 3)))
+                else:
+                    evaluator.check(p)
+                    f_reflected = evaluate(reflected)
+
+                # the second point for every vertex, None if the reflection is accepted
+                kinds = [
+                    "expanded" if f_reflected[k] < values[0]
+                    else None if f_reflected[k] < values[m - 1]
+                    else "outside" if f_reflected[k] < values[m + k]
+                    else "inside"
+                    for k in range(p)
+                    ]
+                second = [k for k in range(p) if kinds[k] is not None]
+                if not self.speculative and len(second) > 0:
+                    evaluator.check(len(second))
+                    f_second = evaluate(np.array([candidates[kinds[k]][k] for k in second]))
+                    f_candidates = {kind: np.full(p, np.inf) for kind in candidates}
+                    for k, f in zip(second, f_second):
+                        f_candidates[kinds[k]][k] = f
+
+                improved = False
+                for k in range(p):
+                    kind = kinds[k]
+                    if kind is None or (kind == "expanded" and f_candidates[kind][k] >= f_reflected[k]):
+                        new, f_new = reflected[k], f_reflected[k]
+                    # the inside contraction must improve the vertex, e.g. inf is not replaced by inf
+                    elif kind == "expanded" or (kind == "outside" and f_candidates[kind][k] <= f_reflected[k]) \
+                            or (kind == "inside" and f_candidates[kind][k] < values[m + k]):
+                        new, f_new = candidates[kind][k], f_candidates[kind][k]
+                    else:
+                        continue
+                    simplex[m + k], values[m + k] = new, f_new
+                    improved = True
+
+                if not improved:
+                    # shrink towards the best vertex
+                    evaluator.check(n)
+                    simplex[1:] = 0.5 * (simplex[0] + simplex[1:])
+                    values[1:] = evaluate(simplex[1:])
+        except _Stop as e:
+            i = np.argmin(values)
+            return simplex[i], values[i], e.ret
+
+    def minimize(self, func, x0, lb, ub, ftol_abs=1e-3, maxeval=10**5, maxtime=None):
+        x0 = np.asarray(x0, dtype=np.float64)
+        lb, ub = np.asarray(lb, dtype=np.float64), np.asarray(ub, dtype=np.float64)
+        deadline = None if maxtime is None else time.monotonic() + maxtime
+        with self._executor_scope() as executor:
+            evaluator = _Evaluator(executor, maxeval, deadline)
+            def evaluate(xs):
+                values = evaluator.values(func, xs)
+                evaluator.counter += len(xs)
+                return values
+            try:
+                x, f, ret = self._search(evaluate, np.clip(x0, lb, ub), lb, ub, ftol_abs, None, evaluator)
+            except ForcedStop:
+                return x0, None, FORCED_STOP
+        if not np.isfinite(f):
+            # no finite value, the simplex could not move
+            return x0, None, ret if ret in (MAXEVAL_REACHED, MAXTIME_REACHED) else FAILURE
+        return x, f, ret
+
+    def maximize_constrained(self, func, constraints, x0, ftol_abs=1e-3, maxeval=10**5, maxtime=None, initial_step=None, lb=None, ub=None):
+        x0 = np.asarray(x0, dtype=np.float64)
+        n = len(x0)
+        lb = np.full(n, -np.inf) if lb is None else np.asarray(lb, dtype=np.float64)
+        ub = np.full(n, np.inf) if ub is None else np.asarray(ub, dtype=np.float64)
+        deadline = None if maxtime is None else time.monotonic() + maxtime
+        tols = np.array([tol for _, tol in constraints], dtype=np.float64)
+
+        # multipliers and penalty of augmented Lagrangian for constraints c(x) - tol <= 0
+        lambdas = np.zeros(len(constraints))
+        rho = 1.
+        # the best feasible point
+        best = {"x": None, "f": None}
+
+        with self._executor_scope() as executor:
+            evaluator = _Evaluator(executor, maxeval, deadline)
+
+            def evaluate_all(xs):
+                # objective and constraint violations for every point
+                violations = np.column_stack([evaluator.values(c, xs) for c, _ in constraints]) - tols \
+                    if len(constraints) > 0 else np.zeros((len(xs), 0))
+                f = -evaluator.values(func, xs)  # minimization of -func
+                evaluator.counter += len(xs)
+                feasible = np.all(violations <= 0., axis=1) & np.isfinite(f)
+                if np.any(feasible):
+                    i = np.flatnonzero(feasible)[np.argmin(f[feasible])]
+                    if best["f"] is None or -f[i] > best["f"]:
+                        best["x"], best["f"] = np.copy(xs[i]), -f[i]
+                return f, violations
+
+            def lagrangian(xs):
+                f, violations = evaluate_all(xs)
+                penalty = np.sum(np.maximum(0., lambdas + rho * violations)**2 - lambdas**2, axis=1) / (2. * rho)
+                return f + penalty
+
+            x = np.clip(x0, lb, ub)
+            f_prev, icm_prev = None, np.inf
+            try:
+                while True:
+                    x, _, ret = self._search(lagrangian, x, lb, ub, ftol_abs, initial_step, evaluator)
+                    if ret in (MAXEVAL_REACHED, MAXTIME_REACHED):
+                        return self._constrained_result(best, x0, ret)
+                    evaluator.check(1)
+                    f, violations = evaluate_all(x[None, :])
+                    f, violations = f[0], violations[0]
+                    # the measure of constraints and complementarity violation as in NLOPT AUGLAG
+                    icm = np.max(np.abs(np.maximum(violations, -lambdas / rho)), initial=0.)
+                    lambdas = np.maximum(0., lambdas + rho * violations)
+                    if icm > 0.5 * icm_prev:
+                        rho *= 10.
+                    converged = f_prev is not None and abs(f - f_prev) <= ftol_abs
+                    if converged and np.all(violations <= 0.):
+                        return x, -f, FTOL_REACHED
+                    if rho > 1e12:
+                        # the constraints are not satisfied, the best feasible point if any
+                        if best["x"] is None:
+                            return x0, None, FAILURE
+                        return best["x"], best["f"], FTOL_REACHED
+                    f_prev, icm_prev = f, icm
+            except _Stop as e:
+                return self._constrained_result(best, x0, e.ret)
+            except ForcedStop:
+                return x0, None, FORCED_STOP
+
+    @staticmethod
+    def _constrained_result(best, x0, ret):
+        if best["x"] is None:
+            return x0, None, ret
+        return best["x"], best["f"], ret
+
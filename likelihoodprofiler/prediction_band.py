@@ -0,0 +1,252 @@
+import threading
+
+import nlopt
+import numpy as np
+
+from .cico_one_pass import get_right_endpoint_cico_with_scan_func
+from .structures import ProfilePoint, EndPoint
+from .parallel import executor_scope
+from .cache import cached_loss_func
+from .gradient import resolve_gradient
+from .tracing import traced_loss_func, tracer_context
+
+
+class _NormalizedLoss:
+    # loss_func - loss_crit, the class is picklable and keeps loss_func attribute for traced_loss_func
+    def __init__(self, loss_func, loss_crit):
+        self.loss_func = loss_func
+        self.loss_crit = loss_crit
+
+    def __call__(self, theta):
+        return self.loss_func(theta) - self.loss_crit
+
+
+class _SignedScan:
+    # scan function or its gradient multiplied by sign, the lower bound is the maximum of -scan_func
+    # the last value is reused for the same theta, e.g. objective and feasibility check of one point
+    def __init__(self, func, sign):
+        self.func = func
+        self.sign = sign
+        self._last = None
+
+    def __call__(self, theta):
+        key = np.asarray(theta, dtype=np.float64).tobytes()
+        last = self._last
+        if last is not None and last[0] == key:
+            return last[1]
+        value = self.sign * np.asarray(self.func(theta))
+        self._last = (key, value)
+        return value
+
+
+def _band_sweep(theta_init, loss_norm, loss_crit, scan_funcs, scan_grads, ks, direction, scan_bounds, warm_start, cico_kwargs):
+    # sequential warm-started part of the band, it is module level function to be picklable
+    sign, i = (-1., 0) if direction == "left" else (1., 1)
+    tracer = cico_kwargs.get("tracer")
+    theta_start = theta_init
+    endpoints = []
+    for k in ks:
+        counter = 0
+        # maximal signed scan value inside critical level as supreme of get_endpoint
+        supreme = None
+        scan = _SignedScan(scan_funcs[k], sign)
+        lock = threading.Lock()
+        def loss_counted(theta):
+            nonlocal counter, supreme
+            loss = loss_norm(theta)
+            # CICO calculates scan_func for the points inside as well, so the value is reused
+            value = float(scan(theta)) if loss < 0 else None
+            with lock:
+                counter += 1
+                if value is not None and (supreme is None or value > supreme):
+                    supreme = value
+            return loss
+        # keeps the tracer of loss_norm visible for traced_loss_func
+        loss_counted.loss_func = loss_norm
+
+        with tracer_context(tracer, method="CICO_ONE_PASS", direction=direction, stage="band"):
+            optf, pps, status = get_right_endpoint_cico_with_scan_func(
+                theta_start,
+                loss_counted,
+                scan,
+                scan_grad=None if scan_grads is None or scan_grads[k] is None else _SignedScan(scan_grads[k], sign),
+                scan_bound=sign * scan_bounds[k][i],
+                **cico_kwargs
+                )
+        # back to the sign of scan_func and the level of loss_func
+        pps = [ProfilePoint(sign * pp.value, pp.loss + loss_crit, pp.params, pp.ret, pp.counter) for pp in pps]
+        value = None if optf is None else sign * optf
+        endpoints.append(EndPoint(value, pps, status, direction, counter, None if supreme is None else sign * supreme))
+
+        if warm_start and status.startswith("BORDER_FOUND") and len(pps) > 0:
+            theta_start = pps[-1].params  # warm start from the neighbour
+    return endpoints
+
+
+class PredictionBand:
+    """Structure storing confidence band of predictions, i.e. confidence intervals for several scan functions.
+
+    Parameters
+    ----------
+    theta_init : Array[Float64]
+        starting values of parameter vector :math:`\\Theta`.
+    loss_init : Float64
+        value of :code:`loss_func(theta_init)`.
+    loss_crit : Float64
+        critical level of loss function.
+    scan_bounds : Array[Array[Float64,Float64]]
+        scan bounds for every scan function.
+    endpoints : Array[Array[EndPoint,EndPoint]]
+        lower (:code:`"left"`) and upper (:code:`"right"`) endpoints for every scan function. :code:`supreme` of the endpoint
+        is the minimal or maximal value of the scan function inside critical level found by the search.
+    """
+    def __init__(self, theta_init, loss_init, loss_crit, scan_bounds, endpoints):
+        self.theta_init = theta_init
+        self.loss_init = loss_init
+        self.loss_crit = loss_crit
+        self.scan_bounds = scan_bounds
+        self.endpoints = endpoints
+
+    @property
+    def band(self):
+        """Lower and upper bounds as array of shape :code:`(n, 2)`, :code:`nan` for the endpoints which are not found."""
+        return np.array([
+            [np.nan if ep.value is None else ep.value for ep in pair]
+            for pair in self.endpoints
+            ], dtype=np.float64).reshape(len(self.endpoints), 2)
+
+    @property
+    def status(self):
+        """Statuses :code:`[lower, upper]` for every scan function."""
+        return [[ep.status for ep in pair] for pair in self.endpoints]
+
+
+def get_prediction_band(
+    theta_init,
+    loss_func,
+    scan_funcs,
+    loss_crit=0.0,
+    theta_bounds=None,
+    scan_bounds=None,
+    scan_tol=1e-3,
+    loss_tol=1e-3,
+    local_alg=nlopt.LN_NELDERMEAD,
+    scan_grads=None,
+    warm_start=True,
+    n_chunks=1,
+    parallel=None,
+    max_workers=None,
+    cache=None,
+    grad_func=None,
+    tracer=None,
+    **kwargs
+    ):
+    """Computes confidence band of predictions: lower and upper bounds of every scan function
+    :math:`h_k\\left(\\Theta\\right)` over the confidence region :math:`\\Lambda\\left(\\Theta\\right) < loss\\_crit`
+    by :code:`"CICO_ONE_PASS"` method. The lower bound is the maximum of :math:`-h_k`.
+
+    The scan functions are expected to be ordered so that neighbours are close, e.g. predictions
+    for successive time points. For every direction the bounds are calculated one after another and every
+    constrained optimization starts from the optimal parameters of the previous scan function.
+    The functions can be split into :code:`n_chunks` parts for each direction which are calculated concurrently.
+
+    Parameters
+    ----------
+    theta_init : Array[Float64]
+        starting values of parameter vector :math:`\\Theta`. The value of :code:`loss_func` must be lower than :code:`loss_crit`.
+    loss_func : Function
+        loss function :math:`\\Lambda\\left(\\Theta\\right)`. For :code:`"process"` mode it must be picklable, i.e. defined at module level.
+    scan_funcs : Array[Function]
+        scan functions :math:`h_k\\left(\\Theta\\right)`, e.g. model predictions. For :code:`"process"` mode they must be picklable.
+    loss_crit : Float64
+        critical level of loss function.
+    theta_bounds : Array[Array[Float64,Float64]] or None
+        vector of bounds for each component in format :math:`(left_border, right_border)`.
+    scan_bounds : Array[Float64,Float64] or Array[Array[Float64,Float64]] or None
+        bounds of scan functions: one pair for all functions or pair for every function. The default :code:`None` means :code:`(-9, 9)` as for :code:`"direct"` scale in :code:`get_interval`.
+    scan_tol : Float64
+        Absolute tolerance of scan functions (stop criterion).
+    loss_tol : Float64
+        Absolute tolerance of :code:`loss_func` at :code:`loss_crit`.
+    local_alg : Function
+        algorithm of optimization, see :code:`get_interval`.
+    scan_grads : Array[Function or None] or None
+        gradients of scan functions for gradient-based :code:`local_alg`. The default :code:`None` means finite differences.
+    warm_start : Bool
+        starts every optimization from the optimum of the neighbour. :code:`False` starts all of them from :code:`theta_init`.
+    n_chunks : Int
+        number of independent parts for each direction. The first function of every part starts from :code:`theta_init`.
+    parallel : String or Executor or None
+        calculates parts concurrently: :code:`"thread"`, :code:`"process"` or any :code:`concurrent.futures.Executor`.
+        The default :code:`None` calculates parts one after another.
+    max_workers : Int or None
+        maximal number of workers for :code:`parallel` pool created internally.
+    cache : Bool or EvaluationCache or None
+        memoizes :code:`loss_func` values for all scan functions, see :code:`get_interval`. The cache is shared between parts in :code:`"thread"` mode only.
+    grad_func : Function or String or None
+        gradient of :code:`loss_func` for :code:`nlopt.LD_*` algorithms, see :code:`get_intervals`.
+    tracer : EvaluationTracer or None
+        records every :code:`loss_func` call, the stage of the calls is :code:`"band"`. Works in the current process only.
+    **kwargs : Any
+        the additional keyword arguments passed to :code:`get_right_endpoint_cico_with_scan_func`, e.g. :code:`max_iter` or :code:`time_budget` for every bound.
+
+    Returns
+    -------
+    PredictionBand
+        bounds in the order of :code:`scan_funcs`.
+
+    """
+    n_scan = len(scan_funcs)
+
+    if scan_bounds is None:
+        scan_bounds = (-9.0, 9.0)
+    if np.ndim(scan_bounds) == 1:
+        scan_bounds = [scan_bounds] * n_scan
+    if len(scan_bounds) != n_scan:
+        raise ValueError("scan_bounds length {} is not equal to the number of scan functions {}".format(len(scan_bounds), n_scan))
+
+    if scan_grads is not None and len(scan_grads) != n_scan:
+        raise ValueError("scan_grads length {} is not equal to the number of scan functions {}".format(len(scan_grads), n_scan))
+
+    loss_func, grad_func = resolve_gradient(loss_func, grad_func)
+    loss_func = cached_loss_func(traced_loss_func(loss_func, tracer), cache)
+
+    with tracer_context(tracer, method="CICO_ONE_PASS", stage="loss_init"):
+        loss_init = loss_func(theta_init)
+    if loss_init >= loss_crit:
+        raise ValueError("Check theta_init and loss_crit: loss_func(theta_init) should be < loss_crit")
+
+    loss_norm = _NormalizedLoss(loss_func, loss_crit)
+    cico_kwargs = dict(
+        theta_bounds=theta_bounds,
+        scan_tol=scan_tol,
+        loss_tol=loss_tol,
+        local_alg=local_alg,
+        grad_func=grad_func,
+        tracer=tracer,
+        **kwargs
+        )
+
+    chunks = [
+        (direction, chunk)
+        for direction in ("left", "right")
+        for chunk in np.array_split(np.arange(n_scan), n_chunks) if len(chunk) > 0
+        ]
+
+    def sweep_args(direction, chunk):
+        return (theta_init, loss_norm, loss_crit, scan_funcs, scan_grads, chunk, direction, scan_bounds, warm_start, cico_kwargs)
+
+    if parallel is None:
+        results = [_band_sweep(*sweep_args(direction, chunk)) for direction, chunk in chunks]
+    else:
+        with executor_scope(parallel, max_workers) as executor:
+            futures = [executor.submit(_band_sweep, *sweep_args(direction, chunk)) for direction, chunk in chunks]
+            results = [future.result() for future in futures]
+
+    endpoints = [[None, None] for k in range(n_scan)]
+    for (direction, chunk), chunk_endpoints in zip(chunks, results):
+        i = 0 if direction == "left" else 1
+        for k, ep in zip(chunk, chunk_endpoints):
+            endpoints[k][i] = ep
+
+    return PredictionBand(theta_init, loss_init, loss_crit, scan_bounds, endpoints)
@@ -1,9 +1,64 @@
+import threading
 import warnings
+import weakref
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor, as_completed, wait
 
 import nlopt
 import numpy as np
 
-from .structures import ProfilePoint
+from .structures import ProfilePoint, ProfilePointBatch
+from .batch import batch_loss, batch_method
+from .gradient import finite_difference_gradient, resolve_gradient
+from .budget import time_left
+from .optimizers import as_backend, ForcedStop, FORCED_STOP, MAXEVAL_REACHED
+
+
+def halton(n, d, skip=1):
+    """Halton quasi-random sequence: :code:`n` points in :code:`[0, 1)^d` starting from the number :code:`skip`."""
+    primes = []
+    k = 2
+    while len(primes) < d:
+        if all(k % p != 0 for p in primes):
+            primes.append(k)
+        k += 1
+
+    out = np.empty((n, d))
+    for j, p in enumerate(primes):
+        for i in range(n):
+            # radical inverse of i + skip in base p
+            k, f, r = i + skip, 1., 0.
+            while k > 0:
+                f /= p
+                r += f * (k % p)
+                k //= p
+            out[i, j] = r
+    return out
+
+
+def multistart_points(theta, lb, ub, n_starts, spread=0.5):
+    """Starting points for multi-start optimization: :code:`theta` and :code:`n_starts - 1` Halton points
+    in the box :code:`theta +- spread * max(1, abs(theta))` restricted by bounds :code:`lb, ub`."""
+    theta = np.asarray(theta, dtype=np.float64)
+    half = spread * np.maximum(1., np.abs(theta))
+    low = np.maximum(theta - half, lb)
+    high = np.minimum(theta + half, ub)
+    # the first Halton point is the center of the box
+    return np.vstack((theta, low + halton(n_starts - 1, len(theta), skip=2) * (high - low)))
+
+
+class CallBudget:
+    """Number of :code:`loss_func` calls shared by the parallel starts of one profile point."""
+    def __init__(self, maxeval):
+        self.maxeval = maxeval
+        self.spent = 0
+        self._lock = threading.Lock()
+
+    def add(self, n_calls):
+        with self._lock:
+            self.spent += n_calls
+
+    def exhausted(self):
+        return self.spent >= self.maxeval
 
 
 def profile(
@@ -14,26 +69,38 @@ def profile(
     theta_bounds=None,
     local_alg=nlopt.LN_NELDERMEAD,
     ftol_abs=1e-3,
+    grad_func=None,
+    n_starts=1,
+    starts_spread=0.5,
+    starts_parallel=None,
      **kwargs
 ):
     """Short summary.
 
-    It generates the profile function based on :code:`loss_func`. Used internally in methods :code:`"LIN_EXTRAPOL"`, :code:`"QUADR_EXTRAPOL"`.
+    It generates the profile function based on :code:`loss_func`. Used internally in methods :code:`"LIN_EXTRAPOL"`, :code:`"QUADR_EXTRAPOL"`, :code:`"BRACKET_BRENT"`, :code:`"SURROGATE"`.
     ----------
     theta_init : Array[Float64]
         starting values of parameter vector :math:`\\Theta`. The starting values is not necessary to be the optimum values for :code:`loss_func` but it the value of :code:`loss_func` must be lower than :code:`loss_crit`.
     theta_num : Int
         number :math:`n` of vector component to compute confidence interval :math:`\\Theta^n`.
     loss_func : Function
-        loss function :math:`\\Lambda\\left(\\Theta\\right)` the profile of which is analyzed. Usually we use log-likelihood for profile analysis in form :math:`\\Lambda( \\theta ) = - 2 ln\\left( L(\\Theta) \\right)`.
+        loss function :math:`\\Lambda\\left(\\Theta\\right)` the profile of which is analyzed. Usually we use log-likelihood for profile analysis in form :math:`\\Lambda( \\theta ) = - 2 ln\\left( L(\\Theta) \\right)`. The batch loss function, see :code:`vectorized`, gets several points at once from the backends proposing several points per iteration, e.g. :code:`"parallel_simplex"`, and one-row batches from the others.
     skip_optim : Bool
         set :code:`True` if you need marginal profile, i.e. profile without optimization. Default is :code:`False`.
     theta_bounds :Array[Array[Float64,Float64]]
         vector of bounds for each component in format :math:`(left_border, right_border)`. This bounds define the ranges for possible parameter values. The defaults are the non-limited values taking into account the :code:`scale`, i.e. :math:`(0, Inf)` for :code:`"log"` scale.
     local_alg : Function
-        algorithm of optimization. Currently the local derivation free algorithms form NLOPT pack were tested. The methods: :code:`nlopt.LN_NELDERMEAD, nlopt.LN_COBYLA, nlopt.LN_PRAXIS` show good results. Methods: :code:`nlopt.LN_BOBYQA, nlopt.LN_SBPLX, nlopt.LN_NEWUOA` is not recommended.
+        algorithm of optimization. Currently the local derivation free algorithms form NLOPT pack were tested. The methods: :code:`nlopt.LN_NELDERMEAD, nlopt.LN_COBYLA, nlopt.LN_PRAXIS` show good results. Methods: :code:`nlopt.LN_BOBYQA, nlopt.LN_SBPLX, nlopt.LN_NEWUOA` is not recommended. The derivative-based algorithms :code:`nlopt.LD_LBFGS, nlopt.LD_SLSQP, nlopt.LD_MMA` can be used for smooth :code:`loss_func`, see :code:`grad_func`. Other optimizers are set by :code:`"scipy:<method>"` string, e.g. :code:`"scipy:L-BFGS-B"`, or :code:`OptimizerBackend` object, see :code:`likelihoodprofiler.optimizers`.
     ftol_abs : Float64
          absolute tolerance criterion for profile function.
+    grad_func : Function or String or None
+        gradient of :code:`loss_func` for :code:`nlopt.LD_*` algorithms: function of parameter vector or :code:`"loss"` if :code:`loss_func` returns tuple :code:`(loss, grad)`. The default :code:`None` means forward finite differences calculated as one batch, see :code:`vectorized`.
+    n_starts : Int
+        number of local optimizations for every profile point. The first one starts from :code:`theta_init_i`, the others from quasi-random points around it, see :code:`multistart_points`. The starts are stopped when two of them agree with the best value within :code:`ftol_abs` (:code:`1e-6` if :code:`ftol_abs` is zero). The best point is returned with the total number of calls. The default :code:`1` is single optimization.
+    starts_spread : Float64
+        size of the box for the starting points relative to :code:`max(1, abs(theta))`.
+    starts_parallel : String or Executor or None
+        runs the starts on :code:`"thread"` pool or user-supplied thread pool, e.g. :code:`ThreadPoolExecutor`, the running starts are stopped by the next :code:`loss_func` call after the agreement. Thread pools only: the starts share the stop event and the limit of calls in memory, so :code:`"process"` and :code:`ProcessPoolExecutor` raise :code:`ValueError`. The :code:`"thread"` pool of :code:`n_starts` workers is created once and used for all profile points, it lives as long as the returned function and is shut down by its :code:`close()` or when the function is deleted. The parallel starts share :code:`maxeval`: the start which finds the limit reached returns its best point with :code:`MAXEVAL_REACHED`. The default :code:`None` runs the starts one after another.
     **kwargs : Any
         the additional keyword arguments passed to :code:`get_right_endpoint` for specific :code:`method`.
 
@@ -41,7 +108,8 @@ def profile(
     -------
     Function
         Returns profile function for selected parameter component. Each call of the function
-        starts optimization.
+        starts optimization. The function arguments: value of the component, :code:`theta_init_i` starting point,
+        :code:`maxeval` and :code:`deadline` (:code:`time.monotonic()` value) limits.
 
     """
 
@@ -50,6 +118,10 @@ def profile(
 
     theta_length = len(theta_init)
 
+    # the scalar loss_func, the batches and finite differences use its batch method if any
+    loss_func, grad_func = resolve_gradient(loss_func, grad_func)
+    batch = batch_method(loss_func)
+
     # set indexes
     indexes_rest = np.arange(0, theta_length, 1)
     indexes_rest = np.delete(indexes_rest, theta_num)
@@ -58,9 +130,10 @@ def profile(
     lb = [theta_bounds[i][0] for i in indexes_rest]
     ub = [theta_bounds[i][1] for i in indexes_rest]
     if skip_optim or theta_length == 1:
-        def profileFuncSkipOptim(x, theta_init_i=theta_init, maxeval=10**5):
+        def profileFuncSkipOptim(x, theta_init_i=theta_init, maxeval=10**5, deadline=None):
             nonlocal theta_init
-            theta_full = theta_init_i[0:theta_num] + [x] + theta_init_i[theta_num+1:len(theta_init_i)]
+            theta_full = list(theta_init_i)
+            theta_full[theta_num] = x
             loss = loss_func(theta_full)
             return ProfilePoint(
                 x,
@@ -71,36 +144,112 @@ def profile(
             )
         return profileFuncSkipOptim
     else:
-        opt = nlopt.opt(local_alg, theta_length - 1)
-        opt.set_ftol_abs(ftol_abs)
-        opt.set_lower_bounds(lb)
-        opt.set_upper_bounds(ub)
+        backend = as_backend(local_alg)
+
+        starts_tol = ftol_abs if ftol_abs > 0 else 1e-6
 
+        # the starts are local functions sharing the stop event and the budget
+        if starts_parallel == "process" or isinstance(starts_parallel, ProcessPoolExecutor):
+            raise ValueError("Process pool cannot run the starts, use \"thread\" or thread pool Executor")
+        own_pool = None
+        if n_starts > 1 and starts_parallel is not None and not isinstance(starts_parallel, Executor):
+            if starts_parallel != "thread":
+                raise ValueError("Unknown starts_parallel {}: use \"thread\" or Executor".format(starts_parallel))
+            # one pool for all profile points
+            starts_parallel = own_pool = ThreadPoolExecutor(n_starts)
 
-        def profileFunc(x, theta_init_i = theta_init, maxeval = 10**5):
+        # one local optimization, returns ProfilePoint (None if cancelled by stop) and number of calls
+        def optimize(x, theta_start, maxeval, deadline, stop=None, budget=None):
             counter = 0
-            theta_init_rest = np.delete(theta_init_i, theta_num)
+            cancelled = False
+            exhausted = False
+            # best value for the start stopped by the shared budget
+            best_loss, best_rest = None, None
 
-            def loss_func_rest(theta_rest, g):
+            # the counter is changed under the lock, the backends can call the function from several threads
+            lock = threading.Lock()
+
+            def count(n_calls):
                 nonlocal counter
+                with lock:
+                    counter += n_calls
+                if budget is not None:
+                    budget.add(n_calls)
+
+            def remember(loss, theta_rest):
+                nonlocal best_loss, best_rest
+                if budget is not None and np.isfinite(loss):
+                    with lock:
+                        if best_loss is None or loss < best_loss:
+                            best_loss, best_rest = loss, np.array(theta_rest, dtype=np.float64)
+
+            def check_stop():
+                nonlocal cancelled, exhausted
+                if stop is not None and stop.is_set():
+                    cancelled = True
+                    raise ForcedStop("the start is cancelled.")
+                if budget is not None and budget.exhausted():
+                    exhausted = True
+                    raise ForcedStop("maxeval of the starts is reached.")
+
+            def loss_func_rest(theta_rest, g):
+                check_stop()
                 theta_full = np.concatenate((theta_rest[0:theta_num], [x], theta_rest[theta_num:len(theta_rest)]), axis=0)
                 try:
                     loss = loss_func(theta_full)
+                    count(1)
+                    remember(loss, theta_rest)
+                    # gradient is required for gradient-based algorithms only
+                    if g.size > 0:
+                        if grad_func is None:
+                            g[:] = finite_difference_gradient(loss_func, theta_full, loss, indexes_rest)
+                            count(len(indexes_rest))
+                        else:
+                            g[:] = np.asarray(grad_func(theta_full))[indexes_rest]
                 except:
                     warnings.warn("Error when call loss_func{}".format(theta_full), UserWarning, stacklevel=2)
-                    raise nlopt.ForcedStop("loss function error.")
-                counter += 1
+                    raise ForcedStop("loss function error.")
                 return loss
-            # set optimizer
-            opt.set_min_objective(loss_func_rest)
-            opt.set_maxeval(maxeval)
-            # start optimization
-            try:
-                theta_opt = opt.optimize(theta_init_rest)
-                loss = opt.last_optimum_value()
-                ret = opt.last_optimize_result()
-            except nlopt.ForcedStop: # to heve normal return instead of Error
-                return ProfilePoint(x, 1e200, theta_init_i, -5, counter)
+
+            def loss_func_rest_batch(thetas_rest):
+                check_stop()
+                thetas_full = np.insert(thetas_rest, theta_num, x, axis=1)
+                try:
+                    losses = batch_loss(batch, thetas_full, True)
+                    count(len(thetas_full))
+                    if len(losses) > 0:
+                        i = int(np.argmin(losses))
+                        remember(losses[i], thetas_rest[i])
+                except:
+                    warnings.warn("Error when call loss_func{}".format(thetas_full), UserWarning, stacklevel=2)
+                    raise ForcedStop("loss function error.")
+                return losses
+            if batch is not None:
+                loss_func_rest.batch = loss_func_rest_batch
+
+            # start optimization, ret is 6 (MAXTIME_REACHED) when the deadline is passed
+            # the best point is returned when derivative-based algorithm fails near the optimum
+            theta_opt, loss, ret = backend.minimize(
+                loss_func_rest,
+                theta_start,
+                lb,
+                ub,
+                ftol_abs=ftol_abs,
+                maxeval=maxeval,
+                maxtime=None if deadline is None else time_left(deadline)
+                )
+            if cancelled:
+                return None, counter
+            if exhausted:
+                if best_rest is None:
+                    return None, counter
+                theta_opt = np.concatenate((best_rest[0:theta_num], [x], best_rest[theta_num:]), axis=0)
+                return ProfilePoint(x, best_loss, theta_opt, MAXEVAL_REACHED, counter), counter
+            if ret == FORCED_STOP: # to heve normal return instead of Error
+                return ProfilePoint(x, 1e200, None, -5, counter), counter
+            if ret < 0 and loss is None:
+                # the failure without any finite value of loss_func is the same as error
+                return ProfilePoint(x, 1e200, None, -5, counter), counter
 
             theta_opt = np.concatenate((theta_opt[0:theta_num], [x], theta_opt[theta_num:]), axis=0)
             return ProfilePoint(
@@ -109,5 +258,105 @@ def profile(
                 theta_opt,
                 ret,
                 counter
-            )
+            ), counter
+
+        def agreed(points):
+            # two best values are the same, i.e. the global optimum is likely found
+            losses = sorted(pp.loss for pp in points if pp.loss is not None and np.isfinite(pp.loss))
+            return len(losses) > 1 and losses[1] - losses[0] <= starts_tol
+
+        def multistart(x, theta_init_i, maxeval, deadline):
+            starts = multistart_points(np.delete(theta_init_i, theta_num), lb, ub, n_starts, starts_spread)
+            points = []
+            counter = 0
+            if starts_parallel is None:
+                for theta_start in starts:
+                    point, n_calls = optimize(x, theta_start, maxeval - counter, deadline)
+                    counter += n_calls
+                    if point.ret == -5:
+                        return ProfilePoint(x, 1e200, theta_init_i, -5, counter)
+                    points.append(point)
+                    if agreed(points) or point.ret in (5, 6) or counter >= maxeval:
+                        break
+            else:
+                stop = threading.Event()
+                budget = CallBudget(maxeval)
+                futures = [starts_parallel.submit(optimize, x, theta_start, maxeval, deadline, stop, budget) for theta_start in starts]
+                for future in as_completed(futures):
+                    point, _ = future.result()
+                    if point is None:
+                        continue
+                    points.append(point)
+                    if point.ret == -5 or agreed(points):
+                        stop.set()
+                        break
+                for future in futures:
+                    future.cancel()
+                # the running starts are stopped on the next call
+                wait(futures)
+                counter = sum(future.result()[1] for future in futures if not future.cancelled())
+                if len(points) == 0 or points[-1].ret == -5:
+                    return ProfilePoint(x, 1e200, theta_init_i, -5, counter)
+
+            valid = [pp for pp in points if pp.loss is not None and np.isfinite(pp.loss)]
+            best = min(valid, key=lambda pp: pp.loss) if len(valid) > 0 else points[0]
+            # the limit of calls is shared by all starts
+            ret = MAXEVAL_REACHED if counter >= maxeval and not agreed(points) else best.ret
+            return ProfilePoint(x, best.loss, best.params, ret, counter)
+
+        def profileFunc(x, theta_init_i = theta_init, maxeval = 10**5, deadline = None):
+            if n_starts > 1:
+                return multistart(x, theta_init_i, maxeval, deadline)
+            point, _ = optimize(x, np.delete(theta_init_i, theta_num), maxeval, deadline)
+            if point.ret == -5:
+                return ProfilePoint(x, 1e200, theta_init_i, -5, point.counter)
+            return point
+        if own_pool is not None:
+            # the pool is shut down by close() or when the function is deleted
+            profileFunc.close = weakref.finalize(profileFunc, own_pool.shutdown, wait=False)
         return profileFunc
+
+
+def marginal_profile(
+    theta_init,
+    theta_num,
+    loss_func,
+    xs,
+    vectorized=None
+):
+    """Calculates marginal profile, i.e. profile without optimization, for array of values.
+    It is vectorized analogue of :code:`profile(..., skip_optim=True)`.
+
+    Parameters
+    ----------
+    theta_init : Array[Float64]
+        values of parameter vector :math:`\\Theta` fixed for all components except :code:`theta_num`.
+    theta_num : Int
+        number :math:`n` of vector component to scan.
+    loss_func : Function
+        loss function. The batch loss function taking 2-D array of parameter vectors and returning 1-D array of losses is called once for all :code:`xs`, see :code:`vectorized`.
+    xs : Array[Float64]
+        values of :code:`theta_num` component.
+    vectorized : Bool or None
+        :code:`True` if :code:`loss_func` follows batch protocol. The default :code:`None` checks :code:`is_vectorized(loss_func)`.
+
+    Returns
+    -------
+    ProfilePointBatch
+        columnar profile points in the order of :code:`xs`.
+
+    """
+    xs = np.asarray(xs, dtype=np.float64).ravel()
+    n_points = len(xs)
+
+    thetas = np.tile(np.asarray(theta_init, dtype=np.float64), (n_points, 1))
+    thetas[:, theta_num] = xs
+    losses = batch_loss(loss_func, thetas, vectorized)
+
+    return ProfilePointBatch(
+        xs,
+        losses,
+        thetas,
+        np.ones(n_points, dtype=np.int64),  # OPTIMIZATION_SKIPPED
+        np.ones(n_points, dtype=np.int64)
+    )
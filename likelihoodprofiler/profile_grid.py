@@ -0,0 +1,105 @@
+import nlopt
+import numpy as np
+
+from .profile import profile
+from .structures import ProfilePointBatch
+from .parallel import executor_scope
+
+
+def _sweep(theta_init, theta_num, loss_func, xs, maxeval, profile_kwargs):
+    # sequential warm-started part of the grid, it is module level function to be picklable
+    prof = profile(theta_init, theta_num, loss_func, **profile_kwargs)
+    theta_init_i = theta_init
+    pps = []
+    for x in xs:
+        pp = prof(x, theta_init_i=theta_init_i, maxeval=maxeval)
+        pps.append(pp)
+        if pp.ret != -5:
+            theta_init_i = pp.params  # warm start from the neighbour
+    return pps
+
+
+def profile_grid(
+    theta_init,
+    theta_num,
+    loss_func,
+    xs,
+    theta_bounds=None,
+    local_alg=nlopt.LN_NELDERMEAD,
+    ftol_abs=1e-3,
+    maxeval=10**5,
+    n_chunks=1,
+    parallel=None,
+    max_workers=None,
+    **kwargs
+):
+    """Calculates profile function over the grid of values. The grid is swept outward from
+    :code:`theta_init[theta_num]` in both directions and every point starts optimization from
+    the optimal parameters of its neighbour.
+
+    Parameters
+    ----------
+    theta_init : Array[Float64]
+        starting values of parameter vector :math:`\\Theta`, usually the optimum of :code:`loss_func`.
+    theta_num : Int
+        number :math:`n` of vector component to scan.
+    loss_func : Function
+        loss function :math:`\\Lambda\\left(\\Theta\\right)` the profile of which is analyzed.
+    xs : Array[Float64]
+        values of :code:`theta_num` component.
+    theta_bounds : Array[Array[Float64,Float64]]
+        vector of bounds for each component in format :math:`(left_border, right_border)`.
+    local_alg : Function
+        algorithm of optimization, see :code:`profile`.
+    ftol_abs : Float64
+        absolute tolerance criterion for profile function.
+    maxeval : Int
+        maximal number of :code:`loss_func` calls for every point.
+    n_chunks : Int
+        number of independent parts for each direction. The first point of every part starts from :code:`theta_init`.
+    parallel : String or Executor or None
+        calculates parts concurrently: :code:`"thread"`, :code:`"process"` or any :code:`concurrent.futures.Executor`.
+        For :code:`"process"` the :code:`loss_func` must be picklable. The default :code:`None` calculates parts one after another.
+    max_workers : Int or None
+        maximal number of workers for :code:`parallel` pool created internally.
+    **kwargs : Any
+        the additional keyword arguments passed to :code:`profile`.
+
+    Returns
+    -------
+    ProfilePointBatch
+        columnar profile points in the order of :code:`xs`.
+
+    """
+    xs = np.asarray(xs, dtype=np.float64).ravel()
+    x_init = theta_init[theta_num]
+
+    # outward order: to the right ascending and to the left descending
+    right = np.flatnonzero(xs >= x_init)
+    right = right[np.argsort(xs[right], kind="stable")]
+    left = np.flatnonzero(xs < x_init)
+    left = left[np.argsort(-xs[left], kind="stable")]
+
+    chunks = [chunk for side in (left, right) for chunk in np.array_split(side, n_chunks) if len(chunk) > 0]
+
+    profile_kwargs = dict(
+        theta_bounds=theta_bounds,
+        local_alg=local_alg,
+        ftol_abs=ftol_abs,
+        **kwargs
+    )
+    if parallel is None:
+        results = [_sweep(theta_init, theta_num, loss_func, xs[chunk], maxeval, profile_kwargs) for chunk in chunks]
+    else:
+        with executor_scope(parallel, max_workers) as executor:
+            futures = [executor.submit(
+                _sweep, theta_init, theta_num, loss_func, xs[chunk], maxeval, profile_kwargs
+                ) for chunk in chunks]
+            results = [future.result() for future in futures]
+
+    pps = [None] * len(xs)
+    for chunk, chunk_pps in zip(chunks, results):
+        for i, pp in zip(chunk, chunk_pps):
+            pps[i] = pp
+
+    return ProfilePointBatch.from_points(pps)
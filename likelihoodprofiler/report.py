@@ -0,0 +1,143 @@
+import os
+
+from .parallel import executor_scope
+
+
+def profile_panel_data(interval, title=None):
+    """Data of one profile panel taken from the stored results of :code:`ParamInterval`, :code:`loss_func` is not called.
+    The data is a plain dictionary, so it can be sent to worker processes without :code:`loss_func`.
+
+    Parameters
+    ----------
+    interval : ParamInterval
+        result of :code:`get_interval`.
+    title : String or None
+        title of the panel. The default is :code:`"theta[<theta_num>] <method>"`.
+
+    Returns
+    -------
+    Dict
+        profile points :code:`x, y` sorted by :code:`x`, :code:`loss_crit`, :code:`init` point, :code:`endpoints`,
+        :code:`statuses`, :code:`scale` of the component and :code:`title`.
+    """
+    theta_num = interval.input.theta_num
+    values = sorted(
+        [pp.value, pp.loss]
+        for ep in interval.result for pp in ep.profilePoints
+        if pp.value is not None and pp.loss is not None
+        )
+    return {
+        "x": [v[0] for v in values],
+        "y": [v[1] for v in values],
+        "loss_crit": interval.input.loss_crit,
+        "init": [interval.input.theta_init[theta_num], interval.loss_init],
+        "endpoints": [ep.value for ep in interval.result],
+        "statuses": [ep.status for ep in interval.result],
+        "scale": interval.input.scale[theta_num],
+        "title": "theta[{}] {}".format(theta_num, interval.method) if title is None else title
+        }
+
+
+def draw_profile(ax, data):
+    """Draws profile panel on matplotlib :code:`Axes` from :code:`profile_panel_data` output."""
+    # plot critical level
+    ax.axhline(y=data["loss_crit"])
+
+    # plot pp
+    if len(data["x"]) > 0:
+        ax.plot(data["x"], data["y"], '.', linestyle='dashed', linewidth=2, markersize=12)
+
+    # plot init point
+    ax.plot(data["init"][0], data["init"][1], 'd')
+
+    # plot verticle line
+    for value in data["endpoints"]:
+        if value is not None:
+            ax.axvline(x=value)
+
+    if data["scale"] == "log":
+        ax.set_xscale("log")
+    ax.set_title(data["title"], fontsize="small")
+    return ax
+
+
+def _render_page(panels, path, ncols, panel_size, dpi):
+    # module level function to be picklable, pyplot is not used: the figure
+    # has its own Agg canvas, so there is no global state and no display
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    ncols = max(1, min(ncols, len(panels)))
+    nrows = max(1, -(-len(panels) // ncols))
+    fig = Figure(figsize=(panel_size[0] * ncols, panel_size[1] * nrows))
+    FigureCanvasAgg(fig)
+    for k, data in enumerate(panels):
+        draw_profile(fig.add_subplot(nrows, ncols, k + 1), data)
+    fig.tight_layout()
+    fig.savefig(path, dpi=dpi)
+    return path
+
+
+def render_report(
+    intervals,
+    path,
+    ncols=4,
+    panels_per_page=16,
+    panel_size=(4., 3.),
+    dpi=100,
+    titles=None,
+    parallel=None,
+    max_workers=None
+    ):
+    """Renders profiles of many parameters to image files without display. Every page is a grid
+    of panels, one panel for one :code:`ParamInterval`. Only the stored profile points and :code:`loss_init`
+    are used, so the model is not evaluated, and the Agg canvas is used instead of :code:`pyplot`,
+    so it works in batch jobs.
+
+    Parameters
+    ----------
+    intervals : Array[ParamInterval]
+        results of :code:`get_interval` or :code:`get_intervals`.
+    path : String
+        output file, the format is taken from extension, e.g. :code:`"report.png"` or :code:`"report.pdf"`.
+        It can contain :code:`{page}` field for the page number. If there are several pages and there is
+        no field, the page number is added before extension: :code:`"report_0.png"`, :code:`"report_1.png"`, ...
+    ncols : Int
+        number of panels in a row.
+    panels_per_page : Int
+        maximal number of panels on a page.
+    panel_size : Array[Float64, Float64]
+        width and height of one panel, inches.
+    dpi : Int
+        resolution of raster formats.
+    titles : Array[String] or None
+        titles of the panels. The default is :code:`"theta[<theta_num>] <method>"`.
+    parallel : String or Executor or None
+        renders pages concurrently: :code:`"thread"`, :code:`"process"` or any :code:`concurrent.futures.Executor`.
+        Only the panel data is sent to workers, :code:`loss_func` is not required to be picklable.
+        The default :code:`None` renders pages one after another.
+    max_workers : Int or None
+        maximal number of workers for :code:`parallel` pool created internally.
+
+    Returns
+    -------
+    Array[String]
+        paths of the written files.
+
+    """
+    if titles is not None and len(titles) != len(intervals):
+        raise ValueError("titles length {} is not equal to the number of intervals {}".format(len(titles), len(intervals)))
+
+    panels = [profile_panel_data(interval, None if titles is None else titles[k]) for k, interval in enumerate(intervals)]
+    pages = [panels[i:i + panels_per_page] for i in range(0, len(panels), panels_per_page)]
+
+    if "{page}" not in path and len(pages) > 1:
+        root, ext = os.path.splitext(path)
+        path = root + "_{page}" + ext
+    paths = [path.format(page=i) for i in range(len(pages))]
+
+    if parallel is None:
+        return [_render_page(page, p, ncols, panel_size, dpi) for page, p in zip(pages, paths)]
+    with executor_scope(parallel, max_workers) as executor:
+        futures = [executor.submit(_render_page, page, p, ncols, panel_size, dpi) for page, p in zip(pages, paths)]
+        return [future.result() for future in futures]
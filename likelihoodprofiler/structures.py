@@ -1,3 +1,8 @@
+import zipfile
+
+import numpy as np
+
+
 class ProfilePoint:
     """Structure storing one point from profile function.
 
@@ -11,6 +16,8 @@ class ProfilePoint:
 
     ret values - -5, 5, 3
     """
+    __slots__ = ("value", "loss", "params", "ret", "counter")
+
     def __init__(self, value, loss, params, ret, counter):
         self.value = value
         self.loss = loss
@@ -19,6 +26,82 @@ class ProfilePoint:
         self.counter = counter
 
 
+class ProfilePointBatch:
+    """Columnar structure storing several points from profile function.
+
+    Parameters
+    ----------
+    value : Array[Float64]            # x values of profile points
+    loss : Array[Float64]             # y values of profile points
+    params : Array[Array[Float64]]    # 2-D array of loss_func arguments, one row per point
+    ret : Array[Int]                  # return values from NLOpt.optimize()
+    counter : Array[Int]              # numbers of loss_func() calls to calculate the values
+
+    """
+    fields = ("value", "loss", "params", "ret", "counter")
+
+    def __init__(self, value, loss, params, ret, counter):
+        self.value = np.asarray(value, dtype=np.float64)
+        self.loss = np.asarray(loss, dtype=np.float64)
+        self.params = np.asarray(params, dtype=np.float64)
+        self.ret = np.asarray(ret, dtype=np.int64)
+        self.counter = np.asarray(counter, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.value)
+
+    def __getitem__(self, i):
+        return ProfilePoint(
+            self.value[i],
+            self.loss[i],
+            self.params[i],
+            self.ret[i],
+            self.counter[i]
+        )
+
+    def to_points(self):
+        """Returns list of :code:`ProfilePoint`."""
+        return [self[i] for i in range(len(self))]
+
+    @classmethod
+    def from_points(cls, points):
+        """Creates batch from list of :code:`ProfilePoint`."""
+        return cls(
+            [pp.value for pp in points],
+            [pp.loss for pp in points],
+            [pp.params for pp in points],
+            [pp.ret for pp in points],
+            [0 if pp.counter is None else pp.counter for pp in points]
+        )
+
+    @classmethod
+    def concatenate(cls, batches):
+        """Joins several batches, e.g. profile points of many endpoints, into one batch."""
+        batches = list(batches)
+        return cls(*[np.concatenate([getattr(b, field) for b in batches]) for field in cls.fields])
+
+    def save(self, path):
+        """Writes the arrays to uncompressed :code:`.npz` file, which can be loaded with memory mapping."""
+        with open(path, "wb") as f:
+            np.savez(f, **{field: getattr(self, field) for field in self.fields})
+
+    @classmethod
+    def load(cls, path, mmap_mode="r"):
+        """Reads batch from :code:`.npz` file created by :code:`save`.
+
+        Parameters
+        ----------
+        path : String
+            path to the file.
+        mmap_mode : String or None
+            mode of :code:`numpy.memmap` for the arrays, i.e. the data are read from disk on access. :code:`None` reads the arrays into memory.
+        """
+        if mmap_mode is None:
+            with np.load(path) as data:
+                return cls(*[data[field] for field in cls.fields])
+        return cls(*[_npz_memmap(path, field, mmap_mode) for field in cls.fields])
+
+
 class EndPoint:
     """Structure storing end point for confidence interval.
 
@@ -30,15 +113,65 @@ class EndPoint:
     direction : String                  # "right" or "left"
     counter : Int                       # number of loss_func() calls to calculate the endpoint
     supreme : Float64 or None           # maximal value inside profile interval
+    bracket : Array[Float64 or None]    # known values inside and outside critical level around the endpoint
 
     status values - "BORDER_FOUND_BY_SCAN_TOL", "BORDER_FOUND_LOSS_TOL",
-    "SCAN_BOUND_REACHED", "MAX_ITER_STOP", "LOSS_ERROR_STOP"
+    "SCAN_BOUND_REACHED", "MAX_ITER_STOP", "LOSS_ERROR_STOP", "TIME_BUDGET_STOP"
 
     """
-    def __init__(self, value, profilePoints, status, direction, counter, supreme):
+    def __init__(self, value, profilePoints, status, direction, counter, supreme, bracket=None):
         self.value = value
         self.profilePoints = profilePoints
         self.status = status
         self.direction = direction
         self.counter = counter
         self.supreme = supreme
+        self.bracket = [supreme, None] if bracket is None else bracket
+
+
+class EndPointStep:
+    """Structure storing progress of endpoint search, it is yielded by :code:`iter_endpoint`.
+
+    Parameters
+    ----------
+    point : ProfilePoint or None        # new profile point, None if the search stops without new point
+    status : String or None             # None while the search continues, the result of analysis for the last step
+    bracket : Array[Float64 or None]    # known values inside and outside critical level at the moment
+    counter : Int                       # number of loss_func() calls up to the moment
+    value : Float64 or None             # value of endpoint for the last step
+
+    """
+    __slots__ = ("point", "status", "bracket", "counter", "value")
+
+    def __init__(self, point, status, bracket, counter, value=None):
+        self.point = point
+        self.status = status
+        self.bracket = bracket
+        self.counter = counter
+        self.value = value
+
+
+def _npz_memmap(path, name, mmap_mode):
+    """Maps array :code:`name` of uncompressed :code:`.npz` file to memory. The array data
+    starts after zip local header and :code:`.npy` header of the member."""
+    with zipfile.ZipFile(path) as zf:
+        info = zf.getinfo(name + ".npy")
+    if info.compress_type != zipfile.ZIP_STORED:
+        raise ValueError("Array {} in {} is compressed and cannot be memory mapped".format(name, path))
+    with open(path, "rb") as f:
+        # local file header: 30 bytes, file name and extra field lengths at 26 and 28
+        f.seek(info.header_offset)
+        header = f.read(30)
+        name_length = int.from_bytes(header[26:28], "little")
+        extra_length = int.from_bytes(header[28:30], "little")
+        f.seek(info.header_offset + 30 + name_length + extra_length)
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+        offset = f.tell()
+    if int(np.prod(shape)) == 0:
+        return np.empty(shape, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode=mmap_mode, offset=offset, shape=shape,
+                     order="F" if fortran_order else "C")
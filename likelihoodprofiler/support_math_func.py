@@ -1,4 +1,5 @@
 import math
+import threading
 
 import numpy as np
 
@@ -9,7 +10,7 @@ Function transforming interval [0,1] to [-Inf, Inf] using logit transformation.
 
 
 def logit10(x):
-    return math.log(x / (1.0 - x), 10)
+    return np.log10(x / (1.0 - x))
 
 """
     logistic10(x::Float64)
@@ -19,11 +20,11 @@ Inverse function for [`logit10`](@ref).
 
 
 def logistic10(x):
-    10**(x) / (10**(x) + 1.0)
+    return 1.0 / (1.0 + np.power(10.0, np.negative(x)))
 
 
 """
-    scaling(x::Float64, scale::Symbol = :direct)
+    scaling(x::Float64, scale::Symbol = :direct, bounds = nothing)
 Transforms values from specific scale to range [-Inf, Inf] based on option.
 
 ## Return
@@ -31,11 +32,12 @@ Transformed value.
 
 ## Arguments
 * `x`: input value.
-* `scale`: transformation type: `:direct, :log, :logit`.
+* `scale`: transformation type: `:direct, :log, :logit, :bounded`.
+* `bounds`: `(lower, upper)` finite bounds for `:bounded` scale.
 """
 
 
-def scaling(x, scale="direct"):
+def scaling(x, scale="direct", bounds=None):
     if x == np.inf * (-1):
         return np.inf * (-1)
 
@@ -44,12 +46,39 @@ def scaling(x, scale="direct"):
     elif scale == "log":
         return np.log10(x)
     elif scale == "logit":
-        return np.logit10(x)
+        return logit10(x)
+    elif scale == "bounded":
+        return logit10((x - bounds[0]) / (bounds[1] - bounds[0]))
     else:
         raise ValueError(scale, "scale type is not supported")
 
 """
-    unscaling(x::Float64, scale::Symbol = :direct)
+    unscaling_derivative(x::Float64, scale::Symbol = :direct)
+Derivative of [`unscaling`](@ref) by `x`, it is used to transform gradients.
+
+## Arguments
+* `x`: input value.
+* `scale`: transformation type: `:direct, :log, :logit, :bounded`.
+* `bounds`: `(lower, upper)` finite bounds for `:bounded` scale.
+"""
+
+
+def unscaling_derivative(x, scale="direct", bounds=None):
+    if scale == "direct":
+        return 1.0
+    elif scale == "log":
+        return np.power(10, x) * math.log(10)
+    elif scale == "logit":
+        p = logistic10(x)
+        return p * (1.0 - p) * math.log(10)
+    elif scale == "bounded":
+        p = logistic10(x)
+        return (bounds[1] - bounds[0]) * p * (1.0 - p) * math.log(10)
+    else:
+        raise ValueError(scale, "scale type is not supported")
+
+"""
+    unscaling(x::Float64, scale::Symbol = :direct, bounds = nothing)
 Transforms values from [-Inf, Inf] to specific scale based on option. Inverse function
 for [`scaling`](@ref).
 
@@ -58,11 +87,12 @@ Transformed value.
 
 ## Arguments
 * `x`: input value.
-* `scale`: transformation type: `:direct, :log, :logit`.
+* `scale`: transformation type: `:direct, :log, :logit, :bounded`.
+* `bounds`: `(lower, upper)` finite bounds for `:bounded` scale.
 """
 
 
-def unscaling(x, scale="direct"):
+def unscaling(x, scale="direct", bounds=None):
     """
     print("---UNSCALING---")
     print(x)
@@ -77,5 +107,128 @@ def unscaling(x, scale="direct"):
         return np.power(10, x)
     elif scale == "logit":
         return logistic10(x)
+    elif scale == "bounded":
+        return bounds[0] + (bounds[1] - bounds[0]) * logistic10(x)
     else:
         raise BaseException("scale type is not supported") #DomainError
+
+
+class ScaleTransform:
+    """Vectorized transformation of parameter vector between specific scales and the optimization
+    scale [-Inf, Inf]. Index arrays for every scale type are precomputed once, so the transformation
+    of the whole vector costs a few NumPy operations instead of the Python loop over components.
+
+    :code:`unscale` writes the result into preallocated per-thread buffer which is reused on the next call.
+    The caller must copy the result if it should be kept.
+
+    Parameters
+    ----------
+    scale : Array[String]
+        transformation type for each component: :code:`"direct", "log", "logit", "bounded"`.
+    theta_bounds : Array[Array[Float64,Float64]] or None
+        bounds for each component, required for :code:`"bounded"` scale which maps the finite interval
+        :code:`(lower, upper)` to [-Inf, Inf] by :code:`logit10`.
+    flip : Int or None
+        number of component which changes the sign in the optimization scale, it is used for :code:`"left"` direction.
+    """
+    SCALES = ("direct", "log", "logit", "bounded")
+
+    def __init__(self, scale, theta_bounds=None, flip=None):
+        scale = np.asarray(scale)
+        unknown = [i for i in scale if i not in self.SCALES]
+        if len(unknown) > 0:
+            raise ValueError(unknown, "scale type is not supported")
+
+        self.n = len(scale)
+        self.scale = scale
+        self.flip = flip
+        self._log = np.flatnonzero(scale == "log")
+        self._logit = np.flatnonzero(scale == "logit")
+        self._bounded = np.flatnonzero(scale == "bounded")
+        self._is_direct = len(self._log) == len(self._logit) == len(self._bounded) == 0
+
+        if len(self._bounded) > 0:
+            bounds = np.asarray(theta_bounds, dtype=np.float64)[self._bounded]
+            if not np.all(np.isfinite(bounds)):
+                raise ValueError("theta_bounds must be finite for :bounded scale")
+            self._lower = bounds[:, 0]
+            self._width = bounds[:, 1] - bounds[:, 0]
+        else:
+            self._lower = self._width = np.zeros(0)
+
+        self._local = threading.local()
+
+    def _buffer(self):
+        buffer = getattr(self._local, "buffer", None)
+        if buffer is None:
+            buffer = self._local.buffer = np.empty(self.n)
+        return buffer
+
+    def unscale(self, theta_gd, out=None):
+        """Transforms vector, or 2-D array with one vector per row, from the optimization scale to specific scales.
+        The result is written to :code:`out` or to the internal buffer (vectors only)."""
+        if out is None:
+            out = self._buffer()
+        out[...] = theta_gd
+        if self.flip is not None:
+            out[..., self.flip] = -out[..., self.flip]
+        if self._is_direct:
+            return out
+
+        if len(self._log) > 0:
+            out[..., self._log] = np.power(10.0, out[..., self._log])
+        if len(self._logit) > 0:
+            out[..., self._logit] = logistic10(out[..., self._logit])
+        if len(self._bounded) > 0:
+            out[..., self._bounded] = self._lower + self._width * logistic10(out[..., self._bounded])
+        return out
+
+    def scale_vector(self, theta):
+        """Transforms vector from specific scales to the optimization scale. Returns new array."""
+        out = np.array(theta, dtype=np.float64)
+        minus_inf = out == -np.inf
+        with np.errstate(divide="ignore", invalid="ignore"):
+            if len(self._log) > 0:
+                out[self._log] = np.log10(out[self._log])
+            if len(self._logit) > 0:
+                out[self._logit] = logit10(out[self._logit])
+            if len(self._bounded) > 0:
+                out[self._bounded] = logit10((out[self._bounded] - self._lower) / self._width)
+        out[minus_inf] = -np.inf  # the same as in scaling()
+        if self.flip is not None:
+            out[self.flip] = -out[self.flip]
+        return out
+
+    def derivative(self, theta_gd):
+        """Derivatives of :code:`unscale` for every component, it is used to transform gradients."""
+        y = np.array(theta_gd, dtype=np.float64)
+        if self.flip is not None:
+            y[self.flip] = -y[self.flip]
+        out = np.ones(self.n)
+        if len(self._log) > 0:
+            out[self._log] = np.power(10.0, y[self._log]) * math.log(10)
+        if len(self._logit) > 0:
+            p = logistic10(y[self._logit])
+            out[self._logit] = p * (1.0 - p) * math.log(10)
+        if len(self._bounded) > 0:
+            p = logistic10(y[self._bounded])
+            out[self._bounded] = self._width * p * (1.0 - p) * math.log(10)
+        if self.flip is not None:
+            out[self.flip] = -out[self.flip]
+        return out
+
+    def scale_value(self, x, i):
+        """Transforms single value of component :code:`i` to the optimization scale."""
+        if x is None:
+            return None
+        theta = np.zeros(self.n)
+        theta[i] = x
+        return self.scale_vector(theta)[i]
+
+    def unscale_value(self, x, i):
+        """Transforms single value of component :code:`i` from the optimization scale."""
+        if x is None:
+            return None
+        theta_gd = np.zeros(self.n)
+        theta_gd[i] = x
+        return self.unscale(theta_gd, np.empty(self.n))[i]
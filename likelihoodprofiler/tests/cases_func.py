@@ -19,3 +19,12 @@ f_1p_ex = lambda x: 5.0 + (x[0]-1e-8)**2 # [1e-8, missing, missing, missing]
 f_5p_3im = lambda x: 5.0 + (x[0]-3.0)**2 + (math.exp(x[1])-1.0)**2 + (x[2]/x[3]-4.0)**2 + 0.0*x[4]
 
 f_3p_im = lambda x: 5.0 + (x[0]-3.0)**2 + (math.exp(x[1])-1.0)**2 + 0.0*x[2]
+
+
+# returns f_3p_1im_dep and the list with number of its calls
+def counting_func_generate():
+    counter = [0]
+    def fun(x):
+        counter[0] += 1
+        return f_3p_1im_dep(x)
+    return fun, counter
@@ -0,0 +1,66 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from .. import get_endpoint, get_interval, get_intervals
+from .cases_func import f_3p_1im_dep
+
+
+def slow_f_3p_1im_dep(x):
+    time.sleep(2e-3)
+    return f_3p_1im_dep(x)
+
+
+@pytest.mark.parametrize("method", ["CICO_ONE_PASS", "LIN_EXTRAPOL", "QUADR_EXTRAPOL", "BRACKET_BRENT", "SURROGATE"])
+def test_time_budget_stop(method):
+    start = time.monotonic()
+    res = get_endpoint([3., 2., 2.1], 1, slow_f_3p_1im_dep, method, loss_crit=9, time_budget=0.02)
+    assert time.monotonic() - start < 1.
+    assert res.status == "TIME_BUDGET_STOP"
+    assert res.value is None
+    assert res.bracket[0] is None or res.bracket[0] >= 2.
+
+
+def test_expired_deadline():
+    res = get_endpoint([3., 2., 2.1], 1, f_3p_1im_dep, "LIN_EXTRAPOL", loss_crit=9, deadline=time.monotonic() - 1.)
+    assert res.status == "TIME_BUDGET_STOP"
+    assert len(res.profilePoints) == 0
+
+
+@pytest.mark.parametrize("method", ["LIN_EXTRAPOL", "QUADR_EXTRAPOL"])
+def test_bracket(method):
+    res = get_interval([3., 2., 2.1], 1, f_3p_1im_dep, method, loss_crit=9, time_budget=60.)
+    for ep in res.result:
+        assert ep.status == "BORDER_FOUND_BY_SCAN_TOL"
+        inside, outside = ep.bracket
+        if ep.direction == "right":
+            assert inside <= ep.value + 1e-2
+            assert outside is None or outside >= ep.value - 1e-2
+        else:
+            assert inside >= ep.value - 1e-2
+            assert outside is None or outside <= ep.value + 1e-2
+
+
+def test_intervals_budget():
+    start = time.monotonic()
+    res = get_intervals([3., 2., 2.1], slow_f_3p_1im_dep, "CICO_ONE_PASS", loss_crit=9,
+                        parallel="thread", max_workers=2, time_budget=0.5)
+    assert time.monotonic() - start < 2.
+    statuses = [ep.status for interval in res for ep in interval.result]
+    assert set(statuses) <= {"BORDER_FOUND_BY_SCAN_TOL", "SCAN_BOUND_REACHED", "TIME_BUDGET_STOP"}
+
+    res = get_intervals([3., 2., 2.1], f_3p_1im_dep, "CICO_ONE_PASS", loss_crit=9,
+                        parallel="thread", max_workers=2, time_budget=60.)
+    assert res[0].result[1].value == pytest.approx(5.0, abs=1e-2)
+    assert "TIME_BUDGET_STOP" not in [ep.status for interval in res for ep in interval.result]
+
+
+def test_intervals_budget_executor():
+    with ThreadPoolExecutor(2) as executor:
+        with pytest.raises(ValueError):
+            get_intervals([3., 2., 2.1], f_3p_1im_dep, "CICO_ONE_PASS", loss_crit=9,
+                          parallel=executor, time_budget=60.)
+        res = get_intervals([3., 2., 2.1], f_3p_1im_dep, "CICO_ONE_PASS", loss_crit=9,
+                            parallel=executor, max_workers=2, time_budget=60.)
+    assert res[0].result[1].value == pytest.approx(5.0, abs=1e-2)
@@ -0,0 +1,67 @@
+from pytest import approx
+
+from .. import get_interval, get_endpoint, vectorized
+from ..cache import EvaluationCache, cached_loss_func
+from .cases_func import counting_func_generate
+
+
+def test_lru_eviction():
+    cache = EvaluationCache(maxsize=2)
+    fun, counter = counting_func_generate()
+    cached = cache.wrap(fun)
+    cached([3., 2., 2.1])
+    cached([3., 2., 2.2])
+    cached([3., 2., 2.1])  # hit, [3., 2., 2.2] becomes the least recently used
+    cached([3., 2., 2.3])  # evicts [3., 2., 2.2]
+    cached([3., 2., 2.2])
+    assert counter[0] == 4
+    assert cache.cache_info() == {"hits": 1, "misses": 4, "maxsize": 2, "currsize": 2}
+
+
+def test_rounding():
+    cache = EvaluationCache(decimals=6)
+    fun, counter = counting_func_generate()
+    cached = cache.wrap(fun)
+    assert cached([3., 2., 2.1]) == approx(5.0)
+    assert cached([3. + 1e-9, 2., 2.1 - 1e-9]) == approx(5.0)
+    assert counter[0] == 1
+    assert cache.hits == 1
+
+
+def test_batch_missing_rows():
+    rows = []
+    @vectorized
+    def fun(thetas):
+        rows.extend(map(tuple, thetas))
+        return thetas[:, 0] + thetas[:, 1]
+
+    cache = EvaluationCache()
+    cached = cached_loss_func(fun, cache)
+    assert cached([1., 2.]) == approx(3.)
+    assert cached.batch([[1., 2.], [2., 2.], [3., 2.]]) == approx([3., 4., 5.])
+    assert rows == [(1., 2.), (2., 2.), (3., 2.)]
+    assert cache.cache_info() == {"hits": 1, "misses": 3, "maxsize": 1024, "currsize": 3}
+
+
+def test_endpoint_init_check_cached():
+    fun, counter = counting_func_generate()
+    cache = EvaluationCache()
+    res0 = get_endpoint([3., 2., 2.1], 0, fun, "CICO_ONE_PASS", loss_crit=9, cache=cache)
+    assert res0.value == approx(5.0, abs=1e-2)
+    assert counter[0] == cache.misses
+    assert cache.hits > 0
+
+
+def test_interval_cache():
+    fun, counter = counting_func_generate()
+    res0 = get_interval([3., 2., 2.1], 0, fun, "LIN_EXTRAPOL", loss_crit=9)
+    calls_no_cache = counter[0]
+
+    fun, counter = counting_func_generate()
+    cache = EvaluationCache()
+    res1 = get_interval([3., 2., 2.1], 0, fun, "LIN_EXTRAPOL", loss_crit=9, cache=cache)
+    assert counter[0] == cache.misses
+    assert counter[0] < calls_no_cache
+    assert res1.result[0].value == approx(res0.result[0].value)
+    assert res1.result[1].value == approx(res0.result[1].value)
+    assert res1.loss_init == approx(5.0)
@@ -0,0 +1,99 @@
+import os
+
+import pytest
+from pytest import approx
+
+from .. import get_endpoint, get_interval, Checkpoint
+from ..get_right_endpoint import get_right_endpoint
+from .cases_func import f_3p_1im_dep
+
+
+def failing_func_generate(fail_after=None):
+    counter = [0]
+    def fun(x):
+        counter[0] += 1
+        if fail_after is not None and counter[0] > fail_after:
+            raise RuntimeError("simulator is down")
+        return f_3p_1im_dep(x)
+    return fun, counter
+
+
+@pytest.mark.parametrize("method", ["CICO_ONE_PASS", "LIN_EXTRAPOL", "QUADR_EXTRAPOL", "BRACKET_BRENT", "SURROGATE"])
+def test_finished_result_is_reused(tmp_path, method):
+    path = str(tmp_path / "ep.pkl")
+    fun, counter = failing_func_generate()
+    res0 = get_endpoint([3., 2., 2.1], 0, fun, method, loss_crit=9, checkpoint=path)
+    assert os.path.exists(path)
+
+    fun, counter = failing_func_generate()
+    res1 = get_endpoint([3., 2., 2.1], 0, fun, method, loss_crit=9, checkpoint=path, resume=True)
+    assert counter[0] == 1  # init check only
+    assert res1.value == res0.value
+    assert res1.status == res0.status
+    assert res1.counter == res0.counter
+    assert len(res1.profilePoints) == len(res0.profilePoints)
+
+
+@pytest.mark.parametrize("method", ["CICO_ONE_PASS", "LIN_EXTRAPOL", "QUADR_EXTRAPOL", "BRACKET_BRENT", "SURROGATE"])
+def test_resume_after_loss_error(tmp_path, method):
+    checkpoint = Checkpoint(str(tmp_path / "ep.pkl"), interval=0)
+    fun, counter = failing_func_generate()
+    res0 = get_endpoint([3., 2., 2.1], 0, fun, method, loss_crit=9)
+    n_calls = counter[0]
+
+    fun, counter = failing_func_generate(fail_after=n_calls // 2)
+    with pytest.warns(UserWarning):
+        res_failed = get_endpoint([3., 2., 2.1], 0, fun, method, loss_crit=9, checkpoint=checkpoint)
+    assert res_failed.status == "LOSS_ERROR_STOP"
+    assert "result" not in checkpoint.load(method)
+
+    fun, counter = failing_func_generate()
+    res1 = get_endpoint([3., 2., 2.1], 0, fun, method, loss_crit=9, checkpoint=checkpoint, resume=True)
+    assert res1.value == approx(res0.value, abs=1e-2)
+    assert res1.status == res0.status
+    assert counter[0] < n_calls
+
+
+def test_method_mismatch(tmp_path):
+    path = str(tmp_path / "ep.pkl")
+    get_endpoint([3., 2., 2.1], 0, f_3p_1im_dep, "LIN_EXTRAPOL", loss_crit=9, checkpoint=path)
+    with pytest.raises(ValueError):
+        get_endpoint([3., 2., 2.1], 0, f_3p_1im_dep, "CICO_ONE_PASS", loss_crit=9, checkpoint=path, resume=True)
+
+
+@pytest.mark.parametrize("options", [
+    {"loss_crit": 8},
+    {"theta_init": [3., 2., 2.2]},
+    {"scan_bound": 8.},
+    {"scan_tol": 1e-4},
+    {"loss_tol": 1e-2},
+    ])
+def test_input_mismatch(tmp_path, options):
+    path = str(tmp_path / "ep.pkl")
+    inputs = {"theta_init": [3., 2., 2.1], "loss_crit": 9}
+    get_endpoint(theta_num=0, loss_func=f_3p_1im_dep, method="LIN_EXTRAPOL", checkpoint=path, **inputs)
+    inputs.update(options)
+    with pytest.raises(ValueError):
+        get_endpoint(theta_num=0, loss_func=f_3p_1im_dep, method="LIN_EXTRAPOL", checkpoint=path, resume=True, **inputs)
+    # the search without resume overwrites the checkpoint
+    get_endpoint(theta_num=0, loss_func=f_3p_1im_dep, method="LIN_EXTRAPOL", checkpoint=path, **inputs)
+    get_endpoint(theta_num=0, loss_func=f_3p_1im_dep, method="LIN_EXTRAPOL", checkpoint=path, resume=True, **inputs)
+
+
+def test_method_input_mismatch(tmp_path):
+    path = str(tmp_path / "ep.pkl")
+    get_right_endpoint([3., 2., 2.1], 0, lambda x: f_3p_1im_dep(x) - 9, "BRACKET_BRENT", checkpoint=path)
+    with pytest.raises(ValueError):
+        get_right_endpoint([3., 2., 2.1], 0, lambda x: f_3p_1im_dep(x) - 9, "BRACKET_BRENT", scan_bound=8., checkpoint=path, resume=True)
+
+
+def test_interval_checkpoint(tmp_path):
+    path = str(tmp_path / "int.pkl")
+    res0 = get_interval([3., 2., 2.1], 0, f_3p_1im_dep, "CICO_ONE_PASS", loss_crit=9, checkpoint=path)
+    assert os.path.exists(path + ".left")
+    assert os.path.exists(path + ".right")
+
+    fun, counter = failing_func_generate()
+    res1 = get_interval([3., 2., 2.1], 0, fun, "CICO_ONE_PASS", loss_crit=9, checkpoint=path, resume=True)
+    assert [ep.value for ep in res1.result] == [ep.value for ep in res0.result]
+    assert counter[0] == 3  # init checks and loss_init
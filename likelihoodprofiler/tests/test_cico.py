@@ -171,3 +171,14 @@ def test_f_3p_im():
     assert res0[1][0] == approx(math.log(3), abs=1e-2)
     assert res0[1][2] == "BORDER_FOUND_BY_SCAN_TOL"
     assert res0[2][2] == "SCAN_BOUND_REACHED"
+
+
+def test_theta_bounds_every_component():
+    # the bound of the first component is active, not only of the last one
+    f = lambda x: 5.0 + (x[0]-3.0)**2 + (x[0]-x[1]-1.0)**2 + 0*x[2]**2 - 9
+    res_free = get_right_endpoint_cico([3., 2., 2.1], 1, f)
+    res = get_right_endpoint_cico([3., 2., 2.1], 1, f, theta_bounds=[[-10., 3.], [-10., 10.], [-10., 10.]])
+    assert res_free[0] == approx(2. + 2. * math.sqrt(2.), abs=1e-2)
+    assert res[0] == approx(4., abs=1e-2)
+    assert res[1][0].params[0] <= 3.
+    assert res[2] == "BORDER_FOUND_BY_SCAN_TOL"
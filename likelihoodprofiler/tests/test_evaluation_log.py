@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+
+from .. import get_endpoint, get_interval, EvaluationLog
+from .cases_func import counting_func_generate
+
+
+def test_append_and_reopen(tmp_path):
+    path = str(tmp_path / "ev.log")
+    log = EvaluationLog(path)
+    log.append([1., 2., 3.], 4.)
+    log.append([-0., 2., 3.], 5.)
+    assert len(log) == 2
+    np.testing.assert_array_equal(log.losses, [4., 5.])
+
+    # incomplete record after crash
+    with open(path, "ab") as f:
+        f.write(b"\x00" * 10)
+    log = EvaluationLog(path)
+    assert len(log) == 2
+    assert log.find([0., 2., 3.]) == 5.
+    assert log.find([1., 2., 3. + 1e-9]) is None
+    assert log.find([1., 2., 3. + 1e-9], atol=1e-6) == 4.
+    log.append([1., 1., 1.], 6.)
+    assert len(EvaluationLog(path)) == 3
+
+    with pytest.raises(ValueError):
+        EvaluationLog(path, n_theta=2)
+    with pytest.raises(ValueError):
+        log.append([1., 1.], 1.)
+
+
+def test_two_writers(tmp_path):
+    path = str(tmp_path / "ev.log")
+    log1 = EvaluationLog(path)
+    log2 = EvaluationLog(path)
+    log1.append([1., 2., 3.], 4.)
+    log2.append([2., 2., 3.], 5.)
+    log1.append([3., 2., 3.], 6.)
+    # nothing is overwritten, the records of the other log are indexed
+    assert len(log1) == 3
+    assert log1.find([2., 2., 3.]) == 5.
+    assert log2.find([1., 2., 3.]) == 4.
+    assert log2.find([3., 2., 3.]) is None
+    log2.append([4., 2., 3.], 7.)
+    assert log2.find([3., 2., 3.]) == 6.
+    log1.close()
+    log2.close()
+    reopened = EvaluationLog(path)
+    np.testing.assert_array_equal(reopened.losses, [4., 5., 6., 7.])
+
+
+def test_tolerance_lookup(tmp_path):
+    log = EvaluationLog(str(tmp_path / "ev.log"))
+    for i in range(100):
+        log.append([i * 0.1, 1.], float(i))
+    assert log.find([2.0004, 1.], atol=1e-3) == 20.
+    assert log.find([2.0004, 1.1], atol=1e-3) is None
+    # new records are added to the existing grid
+    log.append([20.05, 1.], 200.)
+    assert log.find([20.0502, 1.], atol=1e-3) == 200.
+    assert log.find([2.0004, 1.], atol=0.1) == 20.
+    assert log.find([np.inf, 1.], atol=1e-3) is None
+
+
+@pytest.mark.parametrize("method", ["CICO_ONE_PASS", "LIN_EXTRAPOL", "QUADR_EXTRAPOL"])
+def test_replay_endpoint(tmp_path, method):
+    log = EvaluationLog(str(tmp_path / "ev.log"))
+    fun, counter = counting_func_generate()
+    res0 = get_endpoint([3., 2., 2.1], 1, log.record(fun), method, loss_crit=9)
+    assert len(log) == counter[0]
+
+    # deterministic run without the model
+    res1 = get_endpoint([3., 2., 2.1], 1, log.replay(), method, loss_crit=9)
+    assert res1.value == res0.value
+    assert res1.counter == res0.counter
+    assert [pp.value for pp in res1.profilePoints] == [pp.value for pp in res0.profilePoints]
+
+
+def test_replay_with_misses(tmp_path):
+    log = EvaluationLog(str(tmp_path / "ev.log"))
+    fun, counter = counting_func_generate()
+    get_interval([3., 2., 2.1], 0, log.record(fun), "CICO_ONE_PASS", loss_crit=9, scan_tol=1e-3)
+    n_calls = counter[0]
+
+    # the other options require new points which are added to the log
+    fun, counter = counting_func_generate()
+    res = get_interval([3., 2., 2.1], 0, log.replay(fun), "CICO_ONE_PASS", loss_crit=9, scan_tol=1e-4)
+    assert res.result[1].value == pytest.approx(5.0, abs=1e-2)
+    assert 0 < counter[0] < res.result[0].counter + res.result[1].counter
+    assert log.hits > 0
+    assert len(log) == n_calls + counter[0]
+
+    with pytest.raises(KeyError):
+        log.replay()([100., 100., 100.])
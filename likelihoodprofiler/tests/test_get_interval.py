@@ -3,6 +3,12 @@ from .cases_func import f_3p_1im_dep
 import math
 import unittest
 
+
+def f_3p_1im_dep_def(x):
+    # module level function is picklable for process pool
+    return f_3p_1im_dep(x)
+
+
 class getEndpointTest(unittest.TestCase):
     def test_default(self):
         res0 = [get_interval(
@@ -29,5 +35,35 @@ class getEndpointTest(unittest.TestCase):
         self.assertTrue(res0[2].result[0].status == "SCAN_BOUND_REACHED")
         self.assertTrue(res0[2].result[1].status == "SCAN_BOUND_REACHED")
 
+    def test_parallel_thread(self):
+        res0 = get_interval(
+            [3., 2., 2.1],
+            1,
+            lambda x: f_3p_1im_dep(x),
+            "LIN_EXTRAPOL",
+            loss_crit=9,
+            parallel="thread"
+        )
+        self.assertTrue(math.isclose(res0.result[0].value, 2.0-2.0*math.sqrt(2), abs_tol=1e-2))
+        self.assertTrue(math.isclose(res0.result[1].value, 2.0+2.0*math.sqrt(2), abs_tol=1e-2))
+        self.assertTrue(res0.result[0].direction == "left")
+        self.assertTrue(res0.result[1].direction == "right")
+
+    def test_parallel_process(self):
+        res_seq = get_interval([3., 2., 2.1], 0, f_3p_1im_dep_def, "CICO_ONE_PASS", loss_crit=9)
+        res0 = get_interval(
+            [3., 2., 2.1],
+            0,
+            f_3p_1im_dep_def,
+            "CICO_ONE_PASS",
+            loss_crit=9,
+            parallel="process",
+            max_workers=2
+        )
+        self.assertTrue(math.isclose(res0.result[0].value, 1.0, abs_tol=1e-2))
+        self.assertTrue(math.isclose(res0.result[1].value, 5.0, abs_tol=1e-2))
+        self.assertTrue(res0.result[0].counter == res_seq.result[0].counter)
+        self.assertTrue(res0.result[1].counter == res_seq.result[1].counter)
+
 
 #unittest.main(argv=['first-arg-is-ignored'], exit=False)
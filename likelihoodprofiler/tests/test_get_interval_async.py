@@ -0,0 +1,92 @@
+import asyncio
+import math
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from .. import get_interval, get_endpoint, get_interval_async, get_endpoint_async
+from ..get_interval_async import loop_executor
+from .cases_func import f_3p_1im_dep
+
+
+def async_func_generate(delay=1e-4):
+    state = {"active": 0, "max_active": 0, "calls": 0}
+    async def fun(x):
+        state["active"] += 1
+        state["calls"] += 1
+        state["max_active"] = max(state["max_active"], state["active"])
+        await asyncio.sleep(delay)
+        state["active"] -= 1
+        return f_3p_1im_dep(x)
+    return fun, state
+
+
+def test_endpoint_async():
+    fun, state = async_func_generate()
+    res0 = get_endpoint([3., 2., 2.1], 0, f_3p_1im_dep, "CICO_ONE_PASS", loss_crit=9)
+    res1 = asyncio.run(get_endpoint_async([3., 2., 2.1], 0, fun, "CICO_ONE_PASS", loss_crit=9))
+    assert res1.value == res0.value
+    assert res1.counter == res0.counter
+    assert state["calls"] == res0.counter + 1
+
+
+def test_interval_async():
+    res0 = get_interval([3., 2., 2.1], 1, f_3p_1im_dep, "LIN_EXTRAPOL", loss_crit=9)
+    fun, state = async_func_generate()
+    res1 = asyncio.run(get_interval_async([3., 2., 2.1], 1, fun, "LIN_EXTRAPOL", loss_crit=9))
+    assert [ep.value for ep in res1.result] == [ep.value for ep in res0.result]
+    assert res1.loss_init == res0.loss_init
+    assert math.isclose(res1.result[1].value, 2.0+2.0*math.sqrt(2.), abs_tol=1e-2)
+
+
+def test_many_intervals_concurrency_limit():
+    fun, state = async_func_generate()
+
+    async def main():
+        semaphore = asyncio.Semaphore(3)
+        return await asyncio.gather(*[get_interval_async(
+            [3., 2., 2.1], i, fun, "CICO_ONE_PASS", loss_crit=9, max_concurrency=semaphore
+            ) for i in range(3)])
+
+    res = asyncio.run(main())
+    assert math.isclose(res[0].result[1].value, 5.0, abs_tol=1e-2)
+    assert res[2].result[1].status == "SCAN_BOUND_REACHED"
+    assert 1 < state["max_active"] <= 3
+
+
+def test_one_pool_per_loop(monkeypatch):
+    pools = []
+
+    class CountingPool(ThreadPoolExecutor):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            pools.append(self)
+
+    monkeypatch.setattr(sys.modules[loop_executor.__module__], "ThreadPoolExecutor", CountingPool)
+    fun, state = async_func_generate()
+
+    async def main():
+        return await asyncio.gather(*[get_interval_async(
+            [3., 2., 2.1], i, fun, "CICO_ONE_PASS", loss_crit=9
+            ) for i in range(3)])
+
+    res = asyncio.run(main())
+    assert math.isclose(res[0].result[1].value, 5.0, abs_tol=1e-2)
+    # six searches are served by the pool of the loop
+    assert len(pools) == 1
+    loop = asyncio.new_event_loop()
+    assert loop_executor(loop) is not pools[0]
+    loop.close()
+
+
+def test_loss_uses_default_executor():
+    async def fun(x):
+        return await asyncio.get_running_loop().run_in_executor(None, f_3p_1im_dep, x)
+
+    async def main():
+        asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(1))
+        return await asyncio.gather(*[get_endpoint_async(
+            [3., 2., 2.1], 0, fun, "CICO_ONE_PASS", loss_crit=9
+            ) for i in range(4)])
+
+    res = asyncio.run(main())
+    assert all(math.isclose(ep.value, 5.0, abs_tol=1e-2) for ep in res)
@@ -0,0 +1,47 @@
+import math
+from concurrent.futures import ThreadPoolExecutor
+
+from pytest import approx
+
+from .. import get_intervals
+from .cases_func import f_3p_1im_dep
+
+
+def f_3p_1im_dep_def(x):
+    # module level function is picklable for process pool
+    return f_3p_1im_dep(x)
+
+
+def test_default_process():
+    res0 = get_intervals(
+        [3., 2., 2.1],
+        f_3p_1im_dep_def,
+        "CICO_ONE_PASS",
+        loss_crit=9,
+        max_workers=2
+    )
+    assert len(res0) == 3
+    assert [res.input.theta_num for res in res0] == [0, 1, 2]
+    assert res0[0].result[0].value == approx(1.0, abs=1e-2)
+    assert res0[0].result[1].value == approx(5.0, abs=1e-2)
+    assert res0[1].result[0].value == approx(2.0-2.0*math.sqrt(2), abs=1e-2)
+    assert res0[1].result[1].value == approx(2.0+2.0*math.sqrt(2), abs=1e-2)
+    assert res0[2].result[0].status == "SCAN_BOUND_REACHED"
+    assert res0[2].result[1].status == "SCAN_BOUND_REACHED"
+    assert res0[0].loss_init == approx(5.0)
+
+
+def test_executor_theta_nums():
+    with ThreadPoolExecutor(4) as executor:
+        res0 = get_intervals(
+            [3., 2., 2.1],
+            lambda x: f_3p_1im_dep(x),
+            "LIN_EXTRAPOL",
+            theta_nums=[1, 0],
+            loss_crit=9,
+            parallel=executor
+        )
+    assert [res.input.theta_num for res in res0] == [1, 0]
+    assert [ep.direction for ep in res0[0].result] == ["left", "right"]
+    assert res0[0].result[1].value == approx(2.0+2.0*math.sqrt(2), abs=1e-2)
+    assert res0[1].result[0].value == approx(1.0, abs=1e-2)
@@ -0,0 +1,139 @@
+import math
+import pickle
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import nlopt
+import numpy as np
+from pytest import approx
+
+from .. import profile, get_endpoint, get_right_endpoint_cico, vectorized, EvaluationTracer
+from ..gradient import finite_difference_gradient, LossGradSplit
+from .cases_func import f_2p
+
+
+def f_2p_grad(x):
+    return np.array([2.0*(x[0]-3.0), 2.0*(x[1]-4.0)])
+
+
+def f_2p_loss_grad(x):
+    return f_2p(x), f_2p_grad(x)
+
+
+def test_finite_difference_batch():
+    calls = []
+    @vectorized
+    def f_batch(thetas):
+        calls.append(len(thetas))
+        return 5.0 + (thetas[:, 0]-3.0)**2 + (thetas[:, 1]-4.0)**2
+
+    grad = finite_difference_gradient(f_batch, [1., 2.])
+    assert grad == approx(f_2p_grad([1., 2.]), abs=1e-4)
+    assert calls == [3]
+    grad = finite_difference_gradient(f_batch, [1., 2.], f0=f_2p([1., 2.]), indexes=[1])
+    assert grad == approx([-4.], abs=1e-4)
+    assert calls == [3, 1]
+
+
+def test_profile_lbfgs():
+    for grad_func, func in [(None, f_2p), (f_2p_grad, f_2p), ("loss", f_2p_loss_grad)]:
+        prof = profile([3., 1.], 0, func, local_alg=nlopt.LD_LBFGS, ftol_abs=1e-8, grad_func=grad_func)
+        pp = prof(5.)
+        assert pp.loss == approx(9., abs=1e-6)
+        assert pp.params[1] == approx(4., abs=1e-3)
+        assert pp.ret > 0
+
+
+def test_cico_lbfgs():
+    for local_alg in [nlopt.LD_LBFGS, nlopt.LD_SLSQP, nlopt.LD_MMA]:
+        res0 = get_right_endpoint_cico(
+            [3., 4.1],
+            0,
+            lambda x: f_2p(x) - 9,
+            local_alg=local_alg,
+            grad_func=lambda x: f_2p_grad(x)
+        )
+        assert res0[0] == approx(5., abs=1e-2)
+        assert res0[2] == "BORDER_FOUND_BY_SCAN_TOL"
+
+
+def test_endpoint_log_left_grad():
+    for grad_func in [None, f_2p_grad]:
+        res0 = get_endpoint(
+            [3., 4.1],
+            1,
+            f_2p,
+            "LIN_EXTRAPOL",
+            direction="left",
+            loss_crit=9,
+            scale=["log", "log"],
+            theta_bounds=[[1e-10, 1e10], [1e-10, 1e10]],
+            local_alg=nlopt.LD_LBFGS,
+            grad_func=grad_func
+        )
+        assert res0.value == approx(2., abs=1e-2)
+        assert res0.status in ["BORDER_FOUND_BY_SCAN_TOL", "BORDER_FOUND_BY_LOSS_TOL"]
+
+    res0 = get_endpoint(
+        [3., 4.1],
+        0,
+        f_2p_loss_grad,
+        "CICO_ONE_PASS",
+        loss_crit=9,
+        local_alg=nlopt.LD_LBFGS,
+        grad_func="loss"
+    )
+    assert res0.value == approx(5., abs=1e-2)
+
+
+def test_endpoint_vectorized_finite_difference():
+    # the finite differences reach the batch loss_func through get_endpoint wrappers, cache and tracer
+    calls = []
+    @vectorized
+    def f_batch(thetas):
+        calls.append(len(thetas))
+        return 5.0 + (thetas[:, 0]-3.0)**2 + (thetas[:, 0]-thetas[:, 1]-1.0)**2 + 0.*thetas[:, 2]
+
+    for method in ["LIN_EXTRAPOL", "CICO_ONE_PASS"]:
+        for options in [{}, {"cache": True, "tracer": EvaluationTracer()}]:
+            calls.clear()
+            res0 = get_endpoint(
+                [3., 2., 2.1],
+                0,
+                f_batch,
+                method,
+                loss_crit=9,
+                scale=["direct", "log", "direct"],
+                local_alg=nlopt.LD_LBFGS,
+                **options
+            )
+            assert res0.value == approx(5., abs=1e-2)
+            assert res0.status == "BORDER_FOUND_BY_SCAN_TOL"
+            # the gradient of 2 free components for profile points and 3 for CICO is one batch
+            assert max(calls) == (2 if method == "LIN_EXTRAPOL" else 3)
+            if "tracer" in options:
+                assert options["tracer"].n_calls == sum(calls)
+
+
+def test_loss_grad_split_threads():
+    # every thread gets the gradient of its own last point without recalculation
+    calls = []
+    def loss_grad(x):
+        calls.append(x)
+        return f_2p_loss_grad(x)
+    split = LossGradSplit(loss_grad)
+    barrier = threading.Barrier(2)
+
+    def worker(x):
+        split.loss(x)
+        barrier.wait()  # the other thread calls loss before grad
+        return split.grad(x)
+
+    with ThreadPoolExecutor(2) as executor:
+        grads = list(executor.map(worker, [[1., 2.], [5., 7.]]))
+    assert grads[0] == approx(f_2p_grad([1., 2.]))
+    assert grads[1] == approx(f_2p_grad([5., 7.]))
+    assert len(calls) == 2
+
+    split = pickle.loads(pickle.dumps(LossGradSplit(f_2p_loss_grad)))
+    assert split.grad([1., 2.]) == approx(f_2p_grad([1., 2.]))
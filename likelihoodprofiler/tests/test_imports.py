@@ -0,0 +1,42 @@
+import subprocess
+import sys
+
+import pytest
+
+import likelihoodprofiler
+
+
+def loaded_modules(code):
+    # fresh interpreter, the modules of the test session are not loaded
+    code = "import sys; {}; print(' '.join(sorted(sys.modules)))".format(code)
+    return set(subprocess.check_output([sys.executable, "-c", code], text=True).split())
+
+
+def test_import_is_lazy():
+    modules = loaded_modules("import likelihoodprofiler")
+    assert "likelihoodprofiler.get_endpoint" in modules
+    for name in ["matplotlib", "asyncio", "scipy", "likelihoodprofiler.cico_one_pass", "likelihoodprofiler.method_surrogate",
+                 "likelihoodprofiler.get_interval_async", "likelihoodprofiler.prediction_band"]:
+        assert name not in modules
+
+
+def test_method_loaded_on_first_use():
+    modules = loaded_modules(
+        "import likelihoodprofiler as lp; lp.get_interval([3., 2.], 0, lambda x: (x[0]-3.)**2 + (x[1]-2.)**2, 'QUADR_EXTRAPOL', loss_crit=1.)"
+        )
+    assert "likelihoodprofiler.method_quadr_extrapol" in modules
+    assert "likelihoodprofiler.cico_one_pass" not in modules
+    assert "matplotlib" not in modules
+
+
+def test_lazy_names():
+    from likelihoodprofiler import get_right_endpoint_cico, get_endpoint_async, PredictionBand
+    from likelihoodprofiler.cico_one_pass import get_right_endpoint_cico as func
+    assert get_right_endpoint_cico is func
+    assert likelihoodprofiler.get_endpoint_async is get_endpoint_async
+    assert "get_prediction_band" in dir(likelihoodprofiler)
+    # the functions named as their modules are not shadowed by the modules
+    assert callable(likelihoodprofiler.get_interval)
+    assert callable(likelihoodprofiler.get_right_endpoint_by_lin_extrapol)
+    with pytest.raises(AttributeError):
+        likelihoodprofiler.get_right_endpoint_unknown
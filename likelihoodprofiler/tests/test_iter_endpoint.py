@@ -0,0 +1,112 @@
+import inspect
+
+import pytest
+from pytest import approx
+
+from .. import get_endpoint, iter_endpoint, EndPointStep
+from .. import get_right_endpoint_by_lin_extrapol, get_right_endpoint_by_quadr_extrapol
+from ..get_right_endpoint import run_to_end
+from ..get_right_endpoint_by_lin_extrapol import iter_right_endpoint_by_lin_extrapol
+from ..method_quadr_extrapol import iter_right_endpoint_by_quadr_extrapol
+from .cases_func import f_3p_1im_dep
+
+
+class CountedLoss:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, x):
+        self.calls += 1
+        return f_3p_1im_dep(x)
+
+
+@pytest.mark.parametrize("method", ["LIN_EXTRAPOL", "QUADR_EXTRAPOL", "CICO_ONE_PASS"])
+@pytest.mark.parametrize("direction", ["right", "left"])
+def test_same_as_get_endpoint(method, direction):
+    ep = get_endpoint([3., 2., 2.1], 1, f_3p_1im_dep, method, direction=direction, loss_crit=9, scale=["direct", "log", "direct"])
+    steps = list(iter_endpoint([3., 2., 2.1], 1, f_3p_1im_dep, method, direction=direction, loss_crit=9, scale=["direct", "log", "direct"]))
+
+    assert all(isinstance(step, EndPointStep) for step in steps)
+    assert [step.status for step in steps[:-1]] == [None] * (len(steps) - 1)
+    # points in original scale in the order of the search
+    assert [step.point.value for step in steps[:-1]] == approx([pp.value for pp in ep.profilePoints])
+    assert [step.point.loss for step in steps[:-1]] == approx([pp.loss for pp in ep.profilePoints])
+
+    last = steps[-1]
+    assert last.point is None
+    assert last.status == ep.status
+    assert last.value == approx(ep.value)
+    assert last.bracket == approx(ep.bracket)
+    assert last.counter == ep.counter
+
+
+def test_points_are_yielded_during_search():
+    steps = []
+    for step in iter_endpoint([3., 2., 2.1], 0, f_3p_1im_dep, "LIN_EXTRAPOL", loss_crit=9):
+        steps.append(step)
+    assert len(steps) > 2
+    counters = [step.counter for step in steps]
+    assert counters == sorted(counters)
+    assert counters[0] < counters[-1]
+
+    # the bracket narrows while the points are found
+    assert steps[0].bracket[0] == approx(3.)
+    assert steps[0].bracket[1] is None
+    assert steps[-1].value == approx(5., abs=1e-2)
+    assert steps[-1].bracket[0] <= steps[-1].value <= steps[-1].bracket[1]
+    assert steps[-1].bracket[1] == approx(steps[-2].bracket[1])
+
+
+@pytest.mark.parametrize("method", ["LIN_EXTRAPOL", "QUADR_EXTRAPOL"])
+def test_close_stops_loss_calls(method):
+    full = CountedLoss()
+    get_endpoint([3., 2., 2.1], 0, full, method, loss_crit=9)
+
+    loss = CountedLoss()
+    steps = iter_endpoint([3., 2., 2.1], 0, loss, method, loss_crit=9)
+    first = next(steps)
+    assert first.point is not None
+    calls = loss.calls
+    steps.close()
+
+    assert loss.calls == calls
+    assert calls < full.calls
+    with pytest.raises(StopIteration):
+        next(steps)
+
+
+def test_break_stops_loss_calls():
+    full = CountedLoss()
+    get_endpoint([3., 2., 2.1], 0, full, "QUADR_EXTRAPOL", loss_crit=9)
+
+    loss = CountedLoss()
+    for step in iter_endpoint([3., 2., 2.1], 0, loss, "QUADR_EXTRAPOL", loss_crit=9):
+        if step.point.loss > 5.:
+            break
+    assert step.status is None
+    assert loss.calls < full.calls
+
+
+def test_return_value():
+    ep = run_to_end(iter_endpoint([3., 2., 2.1], 0, f_3p_1im_dep, "LIN_EXTRAPOL", loss_crit=9))
+    assert ep.value == approx(5., abs=1e-2)
+    assert ep.status == "BORDER_FOUND_BY_SCAN_TOL"
+    assert ep.direction == "right"
+
+
+def test_arguments_checked_on_first_step():
+    steps = iter_endpoint([3., 2., 2.1], 0, f_3p_1im_dep, "LIN_EXTRAPOL", loss_crit=1)
+    with pytest.raises(ValueError):
+        next(steps)
+
+
+@pytest.mark.parametrize("func, iter_func", [
+    (get_right_endpoint_by_lin_extrapol, iter_right_endpoint_by_lin_extrapol),
+    (get_right_endpoint_by_quadr_extrapol, iter_right_endpoint_by_quadr_extrapol),
+    ])
+def test_public_signature(func, iter_func):
+    # help() and IDEs show the arguments of the public functions
+    assert inspect.signature(func) == inspect.signature(iter_func)
+    assert inspect.signature(func).parameters["scan_tol"].default == 1e-3
+    res = func([3., 2., 2.1], 0, lambda x: f_3p_1im_dep(x) - 9, scan_tol=1e-4)
+    assert res[0] == approx(5., abs=1e-3)
@@ -0,0 +1,128 @@
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+import pytest
+from pytest import approx
+
+from .. import profile, get_right_endpoint_by_lin_extrapol
+from ..profile import halton, multistart_points
+from .cases_func import f_3p_1im_dep
+
+
+def f_double_well(x):
+    # local minimum near x[1] = 4, global minimum near x[1] = -4
+    return 5.0 + (x[0] - 3.0)**2 + 0.01 * (x[1]**2 - 16.0)**2 + 0.2 * x[1]
+
+
+def test_halton():
+    points = halton(4, 2)
+    assert points[:, 0] == approx([0.5, 0.25, 0.75, 0.125])
+    assert points[:, 1] == approx([1/3, 2/3, 1/9, 4/9])
+
+
+def test_multistart_points():
+    points = multistart_points([2., 0.], [-np.inf, 0.], [np.inf, 0.1], 5, spread=0.5)
+    assert points.shape == (5, 2)
+    assert points[0] == approx([2., 0.])
+    assert np.all((points[:, 0] >= 1.) & (points[:, 0] <= 3.))
+    assert np.all((points[:, 1] >= 0.) & (points[:, 1] <= 0.1))
+
+
+def test_multistart_global():
+    single = profile([3., 5.], 0, f_double_well)(3.)
+    multi = profile([3., 5.], 0, f_double_well, n_starts=8, starts_spread=2.)(3.)
+    assert single.params[1] == approx(4., abs=0.3)
+    assert multi.params[1] == approx(-4., abs=0.3)
+    assert multi.loss < single.loss - 1.
+    assert multi.counter > single.counter
+    assert multi.ret > 0
+
+
+def test_multistart_early_stop():
+    single = profile([3., 2., 2.1], 0, f_3p_1im_dep)(4.)
+    multi = profile([3., 2., 2.1], 0, f_3p_1im_dep, n_starts=20)(4.)
+    assert multi.loss == approx(6., abs=1e-3)
+    assert multi.loss <= single.loss + 1e-3
+    # two starts agree on the unimodal function, every start takes at least 3 calls
+    assert multi.counter < 20 * 3
+
+
+def test_multistart_thread():
+    # the order of the finished starts is not fixed
+    multi = profile([3., 2., 2.1], 0, f_3p_1im_dep, n_starts=8, starts_parallel="thread")(4.)
+    assert multi.loss == approx(6., abs=1e-3)
+    assert multi.ret > 0
+    with ThreadPoolExecutor(2) as executor:
+        multi = profile([3., 5.], 0, f_double_well, n_starts=8, starts_spread=2., starts_parallel=executor)(3.)
+        assert multi.ret > 0
+
+
+def test_multistart_thread_shared_maxeval():
+    multi = profile([3., 5.], 0, f_double_well, n_starts=8, starts_spread=2., starts_parallel="thread")(3., maxeval=40)
+    # every start can make at most one call after the limit is reached
+    assert 40 <= multi.counter <= 40 + 8
+    assert multi.ret == 5
+    assert np.isfinite(multi.loss)
+
+
+def test_multistart_thread_one_pool(monkeypatch):
+    pools = []
+
+    class CountingPool(ThreadPoolExecutor):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            pools.append(self)
+
+    # the module is shadowed by the function of the package
+    monkeypatch.setattr(sys.modules[profile.__module__], "ThreadPoolExecutor", CountingPool)
+    profile_func = profile([3., 2., 2.1], 0, f_3p_1im_dep, n_starts=4, starts_parallel="thread")
+    for x in [3.5, 4., 4.5]:
+        assert profile_func(x).ret > 0
+    assert len(pools) == 1
+
+
+def test_multistart_process_rejected():
+    with pytest.raises(ValueError):
+        profile([3., 2., 2.1], 0, f_3p_1im_dep, n_starts=4, starts_parallel="process")
+    with ProcessPoolExecutor(1) as executor:
+        with pytest.raises(ValueError):
+            profile([3., 2., 2.1], 0, f_3p_1im_dep, n_starts=4, starts_parallel=executor)
+
+
+def test_multistart_thread_pool_lifetime(monkeypatch):
+    pools = []
+
+    class CountingPool(ThreadPoolExecutor):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            pools.append(self)
+
+    monkeypatch.setattr(sys.modules[profile.__module__], "ThreadPoolExecutor", CountingPool)
+    profile_func = profile([3., 2., 2.1], 0, f_3p_1im_dep, n_starts=4, starts_parallel="thread")
+    profile_func(4.)
+    profile_func.close()
+    # the pool is shut down
+    with pytest.raises(RuntimeError):
+        pools[0].submit(abs, 1)
+
+    profile_func = profile([3., 2., 2.1], 0, f_3p_1im_dep, n_starts=4, starts_parallel="thread")
+    profile_func(4.)
+    del profile_func
+    # the pool is shut down
+    with pytest.raises(RuntimeError):
+        pools[1].submit(abs, 1)
+
+
+def test_multistart_loss_error():
+    def f_error(x):
+        if x[1] < 0:
+            raise ValueError("negative")
+        return f_double_well(x)
+    multi = profile([3., 5.], 0, f_error, n_starts=8, starts_spread=2.)(3.)
+    assert multi.ret == -5
+
+
+def test_lin_extrapol_multistart():
+    res = get_right_endpoint_by_lin_extrapol([3., 5.], 0, lambda x: f_double_well(x) - 9., n_starts=8, starts_spread=2.)
+    assert res[2] == "BORDER_FOUND_BY_SCAN_TOL"
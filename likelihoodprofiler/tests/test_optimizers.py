@@ -0,0 +1,148 @@
+import math
+
+import nlopt
+import numpy as np
+import pytest
+
+from .. import get_endpoint, get_interval, profile, get_right_endpoint_cico, NloptBackend, ScipyBackend, OptimizerBackend, ParallelSimplexBackend
+from ..optimizers import as_backend, check_local_alg, ForcedStop, FORCED_STOP, MAXEVAL_REACHED, FAILURE, ROUNDOFF_LIMITED
+from .cases_func import f_3p_1im_dep
+
+
+def quadratic(x, grad):
+    if grad.size > 0:
+        grad[:] = 2. * (x - 1.)
+    return float(np.sum((x - 1.)**2))
+
+
+@pytest.mark.parametrize("method", ["CICO_ONE_PASS", "LIN_EXTRAPOL", "QUADR_EXTRAPOL", "BRACKET_BRENT", "SURROGATE"])
+def test_check_local_alg(method, capsys):
+    with pytest.warns(DeprecationWarning, match=r"\[2\]"):
+        get_endpoint([3., 2., 0.], 0, f_3p_1im_dep, method, loss_crit=9)
+    with pytest.warns(DeprecationWarning, match="local_alg"):
+        check_local_alg(nlopt.LN_SBPLX, [3., 2.])
+    assert capsys.readouterr().out == ""
+
+
+def test_as_backend():
+    assert isinstance(as_backend(nlopt.LN_NELDERMEAD), NloptBackend)
+    assert as_backend(nlopt.LD_LBFGS).uses_gradient
+    backend = as_backend("scipy:L-BFGS-B")
+    assert isinstance(backend, ScipyBackend)
+    assert backend.method == "L-BFGS-B"
+    assert backend.uses_gradient
+    assert as_backend(backend) is backend
+    with pytest.raises(ValueError):
+        as_backend("L-BFGS-B")
+
+
+@pytest.mark.parametrize("backend", [NloptBackend(), NloptBackend(nlopt.LD_LBFGS), ScipyBackend(), ScipyBackend("L-BFGS-B"), ParallelSimplexBackend()])
+def test_minimize(backend):
+    x, f, ret = backend.minimize(quadratic, np.array([3., -2.]), [-np.inf, -np.inf], [np.inf, np.inf], ftol_abs=1e-8)
+    assert ret > 0
+    assert np.allclose(x, [1., 1.], atol=1e-3)
+    assert math.isclose(f, 0., abs_tol=1e-6)
+
+
+@pytest.mark.parametrize("backend", [NloptBackend(), ScipyBackend(), ParallelSimplexBackend()])
+def test_minimize_stop(backend):
+    x, f, ret = backend.minimize(quadratic, np.array([3., -2.]), [-np.inf, -np.inf], [np.inf, np.inf], maxeval=5)
+    assert ret == MAXEVAL_REACHED
+
+    def stopped(x, grad):
+        raise ForcedStop("stop")
+    x, f, ret = backend.minimize(stopped, np.array([3., -2.]), [-np.inf, -np.inf], [np.inf, np.inf])
+    assert ret == FORCED_STOP
+
+
+@pytest.mark.parametrize("backend", [NloptBackend(), ScipyBackend("COBYLA"), ScipyBackend("SLSQP"), ParallelSimplexBackend()])
+def test_maximize_constrained(backend):
+    # max x[0] inside the unit circle
+    def objective(x, grad):
+        if grad.size > 0:
+            grad[:] = [1., 0.]
+        return x[0]
+    def circle(x, grad):
+        if grad.size > 0:
+            grad[:] = 2. * x
+        return x[0]**2 + x[1]**2 - 1.
+    x, f, ret = backend.maximize_constrained(objective, [(circle, 1e-6)], np.array([0., 0.5]), ftol_abs=1e-8)
+    assert ret > 0
+    assert math.isclose(f, 1., abs_tol=1e-3)
+
+
+@pytest.mark.parametrize("backend", [NloptBackend(), NloptBackend(nlopt.LD_LBFGS), ScipyBackend("COBYLA"), ScipyBackend("SLSQP"), ParallelSimplexBackend()])
+def test_maximize_constrained_bounds(backend):
+    # max x[0] + x[1] inside the unit circle and x[0] <= 0.5
+    def objective(x, grad):
+        if grad.size > 0:
+            grad[:] = [1., 1.]
+        return x[0] + x[1]
+    def circle(x, grad):
+        if grad.size > 0:
+            grad[:] = 2. * x
+        return x[0]**2 + x[1]**2 - 1.
+    x, f, ret = backend.maximize_constrained(
+        objective, [(circle, 1e-8)], np.array([0., 0.]), ftol_abs=1e-8, lb=[-np.inf, -np.inf], ub=[0.5, np.inf]
+        )
+    assert ret > 0
+    assert x[0] <= 0.5 + 1e-6
+    assert math.isclose(f, 0.5 + math.sqrt(0.75), abs_tol=1e-3)
+
+
+@pytest.mark.parametrize("local_alg", ["scipy:Nelder-Mead", "scipy:Powell", "scipy:L-BFGS-B", "scipy:SLSQP"])
+def test_profile_scipy(local_alg):
+    prof = profile([3., 2., 2.1], 0, lambda x: f_3p_1im_dep(x) - 9., local_alg=local_alg, ftol_abs=1e-8)
+    point = prof(5.)
+    assert point.ret > 0
+    assert math.isclose(point.loss, 0., abs_tol=1e-3)
+
+
+@pytest.mark.parametrize("method", ["CICO_ONE_PASS", "LIN_EXTRAPOL", "BRACKET_BRENT"])
+@pytest.mark.parametrize("local_alg", ["scipy:Nelder-Mead", "scipy:L-BFGS-B", "scipy:COBYLA"])
+def test_interval_scipy(method, local_alg):
+    res = get_interval([3., 2., 2.1], 0, f_3p_1im_dep, method, loss_crit=9, local_alg=local_alg)
+    assert all(ep.status.startswith("BORDER_FOUND") for ep in res.result)
+    assert math.isclose(res.result[0].value, 1., abs_tol=1e-2)
+    assert math.isclose(res.result[1].value, 5., abs_tol=1e-2)
+
+
+def test_custom_backend():
+    class CountingBackend(NloptBackend):
+        n_runs = 0
+        def minimize(self, *args, **kwargs):
+            CountingBackend.n_runs += 1
+            return super().minimize(*args, **kwargs)
+    assert issubclass(CountingBackend, OptimizerBackend)
+
+    res = get_interval([3., 2., 2.1], 0, f_3p_1im_dep, "LIN_EXTRAPOL", loss_crit=9, local_alg=CountingBackend())
+    assert CountingBackend.n_runs == len(res.result[0].profilePoints) + len(res.result[1].profilePoints)
+    assert math.isclose(res.result[1].value, 5., abs_tol=1e-2)
+
+
+@pytest.mark.parametrize("local_alg", [nlopt.LD_LBFGS, "scipy:L-BFGS-B"])
+def test_non_finite_loss(local_alg):
+    # no finite value: the start point is returned and the profile point is loss error
+    def nan_func(x, grad):
+        if grad.size > 0:
+            grad[:] = np.nan
+        return float("nan")
+    x, f, ret = as_backend(local_alg).minimize(nan_func, np.array([2., 1.]), [-np.inf] * 2, [np.inf] * 2)
+    assert list(x) == [2., 1.]
+    assert f is None
+    assert ret < 0
+
+    pp = profile([3., 2.], 0, lambda x: float("nan"), local_alg=local_alg)(3.5)
+    assert pp.ret == -5
+    assert pp.loss == 1e200
+
+
+@pytest.mark.parametrize("ret", [FAILURE, ROUNDOFF_LIMITED])
+def test_cico_failure_status(ret):
+    class FailingBackend(NloptBackend):
+        def maximize_constrained(self, func, constraints, x0, **kwargs):
+            return x0, None, ret
+
+    res = get_right_endpoint_cico([3., 2., 2.1], 0, lambda x: f_3p_1im_dep(x) - 9, local_alg=FailingBackend())
+    assert res[0] is None
+    assert res[2] == "LOSS_ERROR_STOP"
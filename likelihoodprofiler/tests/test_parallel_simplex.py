@@ -0,0 +1,160 @@
+import math
+import threading
+
+import nlopt
+import numpy as np
+import pytest
+from pytest import approx
+
+from .. import get_interval, get_endpoint, get_right_endpoint_cico, profile, profile_grid, vectorized, EvaluationTracer, ParallelSimplexBackend
+from ..optimizers import as_backend, MAXEVAL_REACHED, FAILURE
+from .cases_func import f_3p_1im_dep, f_5p_3im
+
+
+def chain(x):
+    return 5.0 + (x[0] - 3.0)**2 + sum((x[i] - x[i-1] - 1.0)**2 for i in range(1, len(x)))
+
+
+def test_as_backend():
+    assert isinstance(as_backend("parallel_simplex"), ParallelSimplexBackend)
+    with pytest.raises(ValueError):
+        ParallelSimplexBackend(parallel="process")
+
+
+@pytest.mark.parametrize("speculative", [False, True])
+def test_minimize_batches(speculative):
+    sizes = []
+    def func(x, grad):
+        raise AssertionError("the batch is not used")
+    def batch(xs):
+        sizes.append(len(xs))
+        return [chain(x) for x in xs]
+    func.batch = batch
+
+    x, f, ret = ParallelSimplexBackend(speculative=speculative).minimize(func, np.arange(3., 9.) + 0.5, [-np.inf] * 6, [np.inf] * 6, ftol_abs=1e-8)
+    assert ret > 0
+    assert f == approx(5., abs=1e-5)
+    assert x == approx(np.arange(3., 9.), abs=1e-2)
+    # initial simplex, then reflections of 3 worst vertices
+    assert sizes[0] == 7
+    assert sizes[1] == (12 if speculative else 3)
+    assert len(sizes) < sum(sizes) / 2
+
+
+def test_minimize_pool_bounds():
+    calls = []
+    def func(x, grad):
+        calls.append(1)
+        return chain(x)
+    x, f, ret = ParallelSimplexBackend(parallel="thread", max_workers=2).minimize(
+        func, np.array([3.5, 4.5, 5.5]), [-np.inf, -np.inf, 6.], [np.inf, np.inf, np.inf], ftol_abs=1e-8
+        )
+    assert ret > 0
+    assert x[2] >= 6.
+    x, f, ret = ParallelSimplexBackend().minimize(func, np.array([3.5, 4.5, 5.5]), [-np.inf] * 3, [np.inf] * 3, maxeval=10)
+    assert ret == MAXEVAL_REACHED
+
+
+def test_profile_vectorized():
+    shapes = []
+    @vectorized
+    def f_batch(thetas):
+        shapes.append(thetas.shape)
+        return 5.0 + (thetas[:, 0]-3.0)**2 + (thetas[:, 0]-thetas[:, 1]-1.0)**2 + (thetas[:, 1]-thetas[:, 2])**2 + (thetas[:, 3]-2.)**2
+
+    prof = profile([3., 2., 2., 2.], 0, f_batch, local_alg="parallel_simplex", ftol_abs=1e-8)
+    point = prof(5.)
+    assert point.loss == approx(9., abs=1e-4)
+    assert point.params == approx([5., 4., 4., 2.], abs=1e-2)
+    assert max(shape[0] for shape in shapes) > 1
+    assert point.counter == sum(shape[0] for shape in shapes)
+
+    # other backends get one-row batches
+    shapes.clear()
+    point = profile([3., 2., 2., 2.], 0, f_batch, ftol_abs=1e-8)(5.)
+    assert point.loss == approx(9., abs=1e-4)
+    assert all(shape == (1, 4) for shape in shapes)
+
+
+def test_profile_grid_vectorized():
+    @vectorized
+    def f_batch(thetas):
+        return 5.0 + (thetas[:, 0]-3.0)**2 + (thetas[:, 0]-thetas[:, 1]-1.0)**2
+    x = np.linspace(1., 5., 5)
+    y = profile_grid([3., 2.], 0, f_batch, x, local_alg=ParallelSimplexBackend(), ftol_abs=1e-8)
+    assert y.loss == approx(5.0 + (x-3.0)**2, abs=1e-4)
+
+
+@pytest.mark.parametrize("method", ["CICO_ONE_PASS", "LIN_EXTRAPOL", "QUADR_EXTRAPOL"])
+def test_interval(method):
+    local_alg = ParallelSimplexBackend(parallel="thread", max_workers=2)
+    res = [get_interval([3., 2., 2.1], i, f_3p_1im_dep, method, loss_crit=9, local_alg=local_alg) for i in range(3)]
+    assert res[0].result[0].value == approx(1., abs=1e-2)
+    assert res[0].result[1].value == approx(5., abs=1e-2)
+    assert res[1].result[0].value == approx(2. - 2. * math.sqrt(2.), abs=1e-2)
+    assert res[1].result[1].value == approx(2. + 2. * math.sqrt(2.), abs=1e-2)
+    assert [ep.status for ep in res[2].result] == ["SCAN_BOUND_REACHED", "SCAN_BOUND_REACHED"]
+
+
+def test_interval_5p():
+    res = get_interval([3., 0.1, 4., 1.1, 8.], 0, f_5p_3im, "CICO_ONE_PASS", loss_crit=9, local_alg="parallel_simplex")
+    assert res.result[0].value == approx(1., abs=1e-2)
+    assert res.result[1].value == approx(5., abs=1e-2)
+
+
+@pytest.mark.parametrize("method", ["CICO_ONE_PASS", "LIN_EXTRAPOL"])
+def test_interval_vectorized(method):
+    # the batches reach loss_func through get_interval wrappers, cache and tracer
+    sizes = []
+    @vectorized
+    def f_batch(thetas):
+        sizes.append(len(thetas))
+        return 5.0 + (thetas[:, 0]-3.0)**2 + (thetas[:, 0]-thetas[:, 1]-1.0)**2 + 0.*thetas[:, 2]
+
+    for options in [{}, {"cache": True, "tracer": EvaluationTracer()}]:
+        sizes.clear()
+        res = get_interval([3., 2., 2.1], 0, f_batch, method, loss_crit=9, local_alg="parallel_simplex", **options)
+        assert [ep.value for ep in res.result] == approx([1., 5.], abs=1e-2)
+        assert max(sizes) > 1
+        if "tracer" in options:
+            assert options["tracer"].n_calls == sum(sizes)
+
+
+def test_endpoint_array_loss():
+    # batch loss returning array of shape (1,) for one-row batch
+    @vectorized
+    def f_batch(thetas):
+        return np.array([f_3p_1im_dep(theta) for theta in thetas])
+    for local_alg in [nlopt.LN_NELDERMEAD, nlopt.LD_LBFGS, "parallel_simplex"]:
+        res = get_endpoint([3., 2., 2.1], 0, f_batch, "LIN_EXTRAPOL", loss_crit=9, local_alg=local_alg)
+        assert res.value == approx(5., abs=1e-2)
+        assert res.status == "BORDER_FOUND_BY_SCAN_TOL"
+
+
+@pytest.mark.parametrize("method", ["CICO_ONE_PASS", "LIN_EXTRAPOL"])
+def test_pool_counters(method):
+    # the counters are changed from the threads of the pool
+    lock = threading.Lock()
+    calls = [0]
+    def func(x):
+        with lock:
+            calls[0] += 1
+        return chain(x)
+
+    local_alg = ParallelSimplexBackend(parallel="thread", max_workers=4)
+    res = get_endpoint([3., 4., 5., 6., 7.], 0, func, method, loss_crit=9, local_alg=local_alg)
+    assert res.value == approx(5., abs=1e-2)
+    assert res.counter == calls[0] - 1  # without the check of theta_init
+    if method == "LIN_EXTRAPOL":
+        assert sum(pp.counter for pp in res.profilePoints) == res.counter
+
+
+def test_cico_infeasible():
+    res = get_right_endpoint_cico([3., 2.], 0, lambda x: 1.0, theta_bounds=[[0., 10.], [0., 10.]], local_alg="parallel_simplex")
+    assert res[0] is None
+    assert res[2] == "LOSS_ERROR_STOP"
+
+    x, f, ret = ParallelSimplexBackend().minimize(lambda x, grad: np.nan, np.array([1., 2.]), [-np.inf] * 2, [np.inf] * 2)
+    assert list(x) == [1., 2.]
+    assert f is None
+    assert ret == FAILURE
@@ -0,0 +1,92 @@
+import math
+
+import numpy as np
+import pytest
+from pytest import approx
+
+from .. import get_prediction_band, EvaluationTracer
+
+
+def f_circle(x):
+    # module level functions are picklable for process pool
+    return 5.0 + (x[0]-3.0)**2 + (x[1]-4.0)**2
+
+
+class Line:
+    # prediction x[0] + t x[1], the bounds inside the circle of radius 2 are 3 + 4 t -+ 2 sqrt(1 + t^2)
+    def __init__(self, t):
+        self.t = t
+
+    def __call__(self, x):
+        return x[0] + self.t * x[1]
+
+
+TS = np.linspace(0., 1., 6)
+
+
+def exact_band(ts):
+    return np.column_stack([3. + 4. * ts - 2. * np.sqrt(1. + ts**2), 3. + 4. * ts + 2. * np.sqrt(1. + ts**2)])
+
+
+def test_band():
+    res = get_prediction_band([3., 4.], f_circle, [Line(t) for t in TS], loss_crit=9, scan_bounds=(-20., 20.))
+    assert res.loss_init == approx(5.)
+    assert res.band == approx(exact_band(TS), abs=1e-2)
+    assert all(status == "BORDER_FOUND_BY_SCAN_TOL" for pair in res.status for status in pair)
+    for k, pair in enumerate(res.endpoints):
+        assert [ep.direction for ep in pair] == ["left", "right"]
+        pp = pair[1].profilePoints[-1]
+        assert pp.value == approx(res.band[k, 1])
+        assert pp.loss == approx(9., abs=1e-2)
+
+
+def test_warm_start_calls():
+    scan_funcs = [Line(t) for t in np.linspace(0., 1., 11)]
+    cold = get_prediction_band([3., 4.], f_circle, scan_funcs, loss_crit=9, scan_bounds=(-20., 20.), warm_start=False)
+    warm = get_prediction_band([3., 4.], f_circle, scan_funcs, loss_crit=9, scan_bounds=(-20., 20.))
+    ts = np.linspace(0., 1., 11)
+    assert warm.band == approx(exact_band(ts), abs=2e-2)
+    assert cold.band == approx(exact_band(ts), abs=2e-2)
+    n_calls = lambda res: sum(ep.counter for pair in res.endpoints for ep in pair)
+    assert n_calls(warm) < n_calls(cold)
+
+
+def test_scan_bounds():
+    res = get_prediction_band([3., 4.], f_circle, [Line(0.), Line(1.)], loss_crit=9, scan_bounds=[(-9., 9.), (-9., 8.)])
+    assert res.band[0] == approx([1., 5.], abs=1e-2)
+    assert res.status[1] == ["BORDER_FOUND_BY_SCAN_TOL", "SCAN_BOUND_REACHED"]
+    assert math.isnan(res.band[1, 1])
+    # supreme is the extreme prediction inside critical level, as in get_endpoint
+    upper = res.endpoints[1][1]
+    assert 7. < upper.supreme <= 3. + 4. + 2. * math.sqrt(2.) + 1e-2
+    assert upper.bracket == [upper.supreme, None]
+    lower = res.endpoints[0][0]
+    assert lower.supreme == approx(1., abs=1e-2)
+    assert lower.supreme >= lower.value - 1e-6
+    with pytest.raises(ValueError):
+        get_prediction_band([3., 4.], f_circle, [Line(0.), Line(1.)], loss_crit=9, scan_bounds=[(-9., 9.)])
+    with pytest.raises(ValueError):
+        get_prediction_band([3., 4.], f_circle, [Line(0.)], loss_crit=5)
+
+
+def test_scan_grads():
+    scan_grads = [lambda x, t=t: np.array([1., t]) for t in TS]
+    res = get_prediction_band([3., 4.], f_circle, [Line(t) for t in TS], loss_crit=9, scan_bounds=(-20., 20.), scan_grads=scan_grads)
+    assert res.band == approx(exact_band(TS), abs=1e-2)
+
+
+@pytest.mark.parametrize("parallel", ["thread", "process"])
+def test_band_parallel(parallel):
+    scan_funcs = [Line(t) for t in TS]
+    seq = get_prediction_band([3., 4.], f_circle, scan_funcs, loss_crit=9, scan_bounds=(-20., 20.), n_chunks=2)
+    res = get_prediction_band([3., 4.], f_circle, scan_funcs, loss_crit=9, scan_bounds=(-20., 20.), n_chunks=2, parallel=parallel, max_workers=2)
+    assert res.band == approx(seq.band)
+    assert res.band == approx(exact_band(TS), abs=1e-2)
+
+
+def test_band_tracer():
+    tracer = EvaluationTracer()
+    res = get_prediction_band([3., 4.], f_circle, [Line(t) for t in TS[:2]], loss_crit=9, scan_bounds=(-20., 20.), tracer=tracer, cache=True)
+    summary = tracer.summary()
+    assert summary["calls_per_stage"]["loss_init"] == 1
+    assert summary["n_calls"] <= 1 + sum(ep.counter for pair in res.endpoints for ep in pair)
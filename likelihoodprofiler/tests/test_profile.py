@@ -1,7 +1,7 @@
 import numpy as np
 from pytest import approx
 
-from .. import profile
+from .. import profile, marginal_profile, vectorized
 from .cases_func import f_3p_1im_dep
 
 def test_f_3p_1im_dep():
@@ -18,3 +18,27 @@ def test_f_3p_1im_dep():
     assert y[4].ret == 3
     assert y[4].counter > 1
     assert len(y[4].params) == 3
+
+
+def test_marginal_profile_vectorized():
+    calls = []
+    @vectorized
+    def f_batch(thetas):
+        calls.append(thetas.shape)
+        return 5.0 + (thetas[:, 0]-3.0)**2 + (thetas[:, 0]-thetas[:, 1]-1.0)**2 + 0*thetas[:, 2]**2
+
+    x = np.arange(0, 10, 0.2)
+    y = marginal_profile([3., 2., 2.1], 0, f_batch, x)
+    assert calls == [(50, 3)]
+    assert len(y) == 50
+    assert y.params.shape == (50, 3)
+
+    prof = profile([3., 2., 2.1], 0, f_3p_1im_dep, skip_optim=True)
+    y_loop = [prof(x[i]) for i in range(len(x))]
+    assert y.loss == approx([pp.loss for pp in y_loop])
+    assert y[4].value == approx(0.8)
+    assert y[4].ret == 1
+
+    # scalar loss_func is called point by point
+    y_scalar = marginal_profile([3., 2., 2.1], 0, f_3p_1im_dep, x)
+    assert y_scalar.loss == approx(y.loss)
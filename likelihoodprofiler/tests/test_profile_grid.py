@@ -0,0 +1,38 @@
+import numpy as np
+from pytest import approx
+
+from .. import profile_grid
+from .cases_func import f_3p_1im_dep
+
+
+def f_2p_dep(x):
+    # module level function is picklable for process pool
+    return 5.0 + (x[0]-3.0)**2 + (x[0]-x[1]-1.0)**2
+
+
+def test_f_3p_1im_dep():
+    x = np.arange(0, 10, 0.2)
+    y = profile_grid([3., 2., 2.1], 0, f_3p_1im_dep, x)
+    assert len(y) == len(x)
+    assert y.value == approx(x)
+    assert y[4].value == approx(0.8)
+    assert y[4].loss == approx(9.84, abs=1e-2)
+    assert y.params.shape == (len(x), 3)
+    assert all(y.ret > 0)
+
+
+def test_warm_start_accuracy():
+    x = np.arange(3.2, 9, 0.2)
+    y = profile_grid([3., 2.], 0, f_2p_dep, x, ftol_abs=1e-8)
+    assert y.loss == approx(5.0 + (x-3.0)**2, abs=1e-4)
+    assert y.params[:, 1] == approx(x - 1.0, abs=1e-2)
+
+
+def test_chunks_process():
+    x = np.linspace(0., 6., 13)
+    y_seq = profile_grid([3., 2.], 0, f_2p_dep, x, n_chunks=2)
+    y = profile_grid([3., 2.], 0, f_2p_dep, x, n_chunks=2, parallel="process", max_workers=2)
+    assert y.value == approx(x)
+    assert y.loss == approx(y_seq.loss)
+    assert y.counter.tolist() == y_seq.counter.tolist()
+    assert all(y.loss >= 5.0 + (x-3.0)**2 - 1e-6)
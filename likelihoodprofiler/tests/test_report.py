@@ -0,0 +1,70 @@
+import os
+
+import pytest
+
+from .. import get_interval, get_intervals, render_report
+from ..report import profile_panel_data
+from .cases_func import f_3p_1im_dep
+
+matplotlib = pytest.importorskip("matplotlib")
+
+
+def f_3p(x):
+    # module level function is picklable for process pool
+    return f_3p_1im_dep(x)
+
+
+def no_model(x):
+    raise AssertionError("loss_func is called")
+
+
+@pytest.fixture
+def intervals():
+    res = get_intervals([3., 2., 2.1], f_3p, "LIN_EXTRAPOL", loss_crit=9, parallel="thread")
+    # the stored results only are used
+    for interval in res:
+        interval.input.loss_func = no_model
+    return res
+
+
+def test_panel_data(intervals):
+    data = profile_panel_data(intervals[0])
+    assert data["x"] == sorted(data["x"])
+    assert len(data["x"]) == sum(len(ep.profilePoints) for ep in intervals[0].result)
+    assert data["init"] == [3., intervals[0].loss_init]
+    assert data["title"] == "theta[0] LIN_EXTRAPOL"
+    assert data["statuses"][1] == "BORDER_FOUND_BY_SCAN_TOL"
+
+
+def test_render_report(intervals, tmp_path):
+    paths = render_report(intervals, str(tmp_path / "report.png"), dpi=30)
+    assert paths == [str(tmp_path / "report.png")]
+    assert os.path.getsize(paths[0]) > 0
+
+    paths = render_report(intervals, str(tmp_path / "page{page}.png"), panels_per_page=2, dpi=30, titles=["a", "b", "c"])
+    assert paths == [str(tmp_path / "page0.png"), str(tmp_path / "page1.png")]
+    with pytest.raises(ValueError):
+        render_report(intervals, str(tmp_path / "report.png"), titles=["a"])
+
+
+@pytest.mark.parametrize("parallel", [None, "thread", "process"])
+def test_render_pages(intervals, tmp_path, parallel):
+    res = intervals * 3
+    paths = render_report(res, str(tmp_path / "report.png"), ncols=2, panels_per_page=4, dpi=30, parallel=parallel, max_workers=2)
+    assert paths == [str(tmp_path / "report_{}.png".format(i)) for i in range(3)]
+    assert all(os.path.getsize(path) > 0 for path in paths)
+
+
+def test_plot_ax(intervals):
+    from matplotlib.figure import Figure
+    fig = Figure()
+    ax = fig.add_subplot(1, 1, 1)
+    assert intervals[1].plot(ax=ax, show=False) is ax
+    assert len(ax.lines) > 0
+
+
+def test_plot_log_scale():
+    from matplotlib.figure import Figure
+    res = get_interval([3., 2., 2.1], 0, f_3p, "CICO_ONE_PASS", loss_crit=9, scale=["log", "direct", "direct"])
+    ax = res.plot(ax=Figure().add_subplot(1, 1, 1), show=False)
+    assert ax.get_xscale() == "log"
@@ -0,0 +1,100 @@
+import nlopt
+import numpy as np
+import pytest
+from pytest import approx
+
+from .. import get_endpoint, get_interval, get_intervals
+from ..support_math_func import ScaleTransform, scaling, unscaling, unscaling_derivative
+from .cases_func import f_2p, f_3p_1im_dep
+
+
+def test_roundtrip():
+    scale = ["direct", "log", "logit", "bounded"]
+    bounds = [[-np.inf, np.inf], [0., np.inf], [0., 1.], [2., 6.]]
+    theta = np.array([-1.5, 30., 0.2, 5.])
+    transform = ScaleTransform(scale, bounds, flip=1)
+
+    theta_gd = transform.scale_vector(theta)
+    assert theta_gd == approx([
+        -1.5,
+        -scaling(30., "log"),
+        scaling(0.2, "logit"),
+        scaling(5., "bounded", bounds[3])
+        ])
+    assert transform.unscale(theta_gd) == approx(theta)
+    assert transform.unscale_value(theta_gd[1], 1) == approx(30.)
+    assert transform.scale_value(5., 3) == approx(theta_gd[3])
+
+    y = np.array([0.3, -0.2, 0.4, -1.])
+    assert transform.derivative(y) == approx([
+        1.,
+        -unscaling_derivative(0.2, "log"),
+        unscaling_derivative(0.4, "logit"),
+        unscaling_derivative(-1., "bounded", bounds[3])
+        ])
+
+
+def test_bounds_and_buffer():
+    transform = ScaleTransform(["log", "logit"])
+    assert transform.scale_vector([-np.inf, 0.]) == approx([-np.inf, -np.inf])
+    assert transform.scale_vector([np.inf, 1.]) == approx([np.inf, np.inf])
+    assert unscaling(0., "logit") == approx(0.5)
+    out_1 = transform.unscale([0., 0.])
+    out_2 = transform.unscale([1., 0.])
+    assert out_1 is out_2  # preallocated buffer
+
+
+def test_endpoint_logit_bounded():
+    f = lambda x: f_2p([x[0] * 10., x[1]])  # right endpoint is 0.5
+    res0 = get_endpoint(
+        [0.3, 4.],
+        0,
+        f,
+        "LIN_EXTRAPOL",
+        loss_crit=9,
+        scale=["logit", "direct"],
+        theta_bounds=[[0., 1.], [-np.inf, np.inf]]
+    )
+    assert res0.value == approx(0.5, abs=1e-2)
+    assert res0.profilePoints[-1].params[0] == approx(res0.profilePoints[-1].value)
+
+    res0 = get_endpoint(
+        [3., 4.],
+        0,
+        f_2p,
+        "CICO_ONE_PASS",
+        direction="left",
+        loss_crit=9,
+        scale=["bounded", "direct"],
+        theta_bounds=[[0., 10.], [-np.inf, np.inf]]
+    )
+    assert res0.value == approx(1., abs=1e-2)
+
+
+def test_interval_bounded_default_scan_bounds():
+    options = dict(loss_crit=9, scale=["bounded", "direct"], theta_bounds=[[0., 10.], [-100., 100.]])
+    res0 = get_interval([3., 4.], 0, f_2p, "CICO_ONE_PASS", **options)
+    # (-9, 9) in the optimization scale
+    assert res0.input.scan_bounds == approx([10. / (1. + 1e9), 10. / (1. + 1e-9)])
+    assert [ep.value for ep in res0.result] == approx([1., 5.], abs=1e-2)
+
+    res1 = get_intervals([3., 4.], f_2p, "CICO_ONE_PASS", parallel="thread", **options)
+    assert [ep.value for ep in res1[0].result] == approx([1., 5.], abs=1e-2)
+    assert res1[0].input.scan_bounds == approx(res0.input.scan_bounds)
+    assert res1[1].input.scan_bounds == approx([-9., 9.])
+
+
+@pytest.mark.parametrize("method", ["LIN_EXTRAPOL", "CICO_ONE_PASS"])
+def test_loss_func_keeps_arguments(method):
+    # memoization and history of loss_func keep the arguments
+    history = []
+    def fun(x):
+        history.append((x, list(x)))
+        return f_3p_1im_dep(x)
+    def grad(x):
+        history.append((x, list(x)))
+        return [2. * (x[0] - 3.) + 2. * (x[0] - x[1] - 1.), -2. * (x[0] - x[1] - 1.), 0.]
+    get_endpoint([3., 2., 2.1], 0, fun, method, loss_crit=9, scale=["log", "direct", "direct"],
+                 grad_func=grad, local_alg=nlopt.LD_LBFGS)
+    assert len(history) > 2
+    assert all(list(x) == copy for x, copy in history)
@@ -0,0 +1,53 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from .. import get_endpoint, ProfilePoint, ProfilePointBatch
+from .cases_func import f_3p_1im_dep
+
+
+def endpoint_batch(theta_num, direction):
+    ep = get_endpoint([3., 2., 2.1], theta_num, f_3p_1im_dep, "LIN_EXTRAPOL", direction=direction, loss_crit=9)
+    return ProfilePointBatch.from_points(ep.profilePoints)
+
+
+def test_profile_point_slots():
+    pp = ProfilePoint(1., 2., np.array([1., 2.]), 3, 10)
+    assert not hasattr(pp, "__dict__")
+    with pytest.raises(AttributeError):
+        pp.other = 1
+    pp_copy = pickle.loads(pickle.dumps(pp))
+    assert (pp_copy.value, pp_copy.loss, pp_copy.ret, pp_copy.counter) == (1., 2., 3, 10)
+
+
+@pytest.mark.parametrize("mmap_mode", ["r", None])
+def test_save_load(tmp_path, mmap_mode):
+    batches = [endpoint_batch(i, d) for i in range(2) for d in ["left", "right"]]
+    batch = ProfilePointBatch.concatenate(batches)
+    assert len(batch) == sum(len(b) for b in batches)
+    assert batch.params.shape == (len(batch), 3)
+
+    path = str(tmp_path / "points.npz")
+    batch.save(path)
+    loaded = ProfilePointBatch.load(path, mmap_mode=mmap_mode)
+    for field in ProfilePointBatch.fields:
+        np.testing.assert_array_equal(getattr(loaded, field), getattr(batch, field))
+    assert loaded[1].params.tolist() == batch[1].params.tolist()
+    if mmap_mode is not None:
+        assert isinstance(loaded.params.base, np.memmap) or isinstance(loaded.params, np.memmap)
+
+
+def test_load_empty(tmp_path):
+    path = str(tmp_path / "empty.npz")
+    ProfilePointBatch.from_points([]).save(path)
+    assert len(ProfilePointBatch.load(path)) == 0
+
+
+def test_load_compressed(tmp_path):
+    path = str(tmp_path / "compressed.npz")
+    batch = endpoint_batch(0, "right")
+    np.savez_compressed(path, **{field: getattr(batch, field) for field in ProfilePointBatch.fields})
+    with pytest.raises(ValueError):
+        ProfilePointBatch.load(path)
+    assert len(ProfilePointBatch.load(path, mmap_mode=None)) == len(batch)
@@ -0,0 +1,59 @@
+import numpy as np
+from pytest import approx, raises
+
+from .. import get_interval, get_right_endpoint_cico, EvaluationCache
+from ..tracing import EvaluationTracer
+from .cases_func import f_3p_1im_dep, f_2p
+
+
+def test_ring_buffer():
+    tracer = EvaluationTracer(capacity=3)
+    traced = tracer.wrap(f_2p)
+    with tracer.context(stage="a"):
+        for i in range(5):
+            traced([float(i), 4.])
+    records = tracer.records()
+    assert tracer.n_calls == 5
+    assert len(records) == 3
+    assert records["theta"][:, 0] == approx([2., 3., 4.])
+    assert records["loss"] == approx([f_2p([i, 4.]) for i in [2., 3., 4.]])
+    assert [tracer.label(code) for code in records["stage"]] == ["a", "a", "a"]
+
+
+def test_error_recorded():
+    tracer = EvaluationTracer()
+    def err_func(x):
+        raise ValueError
+    with raises(ValueError):
+        tracer.wrap(err_func)([1., 2.])
+    assert tracer.n_calls == 1
+    assert np.isnan(tracer.records()["loss"][0])
+
+
+def test_interval_summary():
+    counter = [0]
+    def fun(x):
+        counter[0] += 1
+        return f_3p_1im_dep(x)
+
+    tracer = EvaluationTracer()
+    cache = EvaluationCache()
+    res0 = get_interval([3., 2., 2.1], 0, fun, "LIN_EXTRAPOL", loss_crit=9, tracer=tracer, cache=cache)
+    summary = tracer.summary()
+    # cache hits are not recorded
+    assert summary["n_calls"] == counter[0] == cache.misses
+    assert set(summary["calls_per_stage"]) <= {"init_check", "profile", "loss_init"}
+    assert summary["calls_per_stage"]["profile"] > 0
+    assert ("LIN_EXTRAPOL", "left", "profile") in summary["calls_per_context"]
+    assert ("LIN_EXTRAPOL", "right", "profile") in summary["calls_per_context"]
+    assert sum(summary["calls_per_context"].values()) == summary["n_calls"]
+    assert 0. <= summary["outside_fraction"] <= 1.
+    assert summary["time_per_call"][50] <= summary["time_per_call"][99]
+    assert res0.result[1].value == approx(5., abs=1e-2)
+
+
+def test_cico_counter():
+    tracer = EvaluationTracer()
+    res0 = get_right_endpoint_cico([3., 1.1], 0, lambda x: f_2p(x) - 9, tracer=tracer)
+    assert res0[1][0].counter == tracer.n_calls
+    assert tracer.summary()["calls_per_stage"]["final_check"] == 1
@@ -0,0 +1,82 @@
+import math
+
+import numpy as np
+from pytest import approx
+
+from .. import get_wald_intervals, get_interval, get_intervals, get_endpoint, vectorized, EvaluationTracer
+from ..gradient import finite_difference_hessian
+from .cases_func import f_2p, f_3p_1im_dep, f_4p_2im
+
+
+def test_finite_difference_hessian():
+    calls = []
+    @vectorized
+    def f_batch(thetas):
+        calls.append(len(thetas))
+        return 5.0 + (thetas[:, 0]-3.0)**2 + (thetas[:, 0]-thetas[:, 1]-1.0)**2
+
+    f0, grad, hess = finite_difference_hessian(f_batch, [1., 2.])
+    assert f0 == approx(13.)
+    assert grad == approx([-8., 4.], abs=1e-5)
+    assert hess == approx(np.array([[4., -2.], [-2., 2.]]), abs=1e-4)
+    assert calls == [9]
+
+
+def test_wald_intervals():
+    res = get_wald_intervals([3., 2., 2.1], f_3p_1im_dep, loss_crit=9)
+    assert list(res.identifiable) == [True, True, False]
+    assert res.intervals[0] == approx([1., 5.], abs=1e-4)
+    assert res.intervals[1] == approx([2. - 2. * math.sqrt(2), 2. + 2. * math.sqrt(2)], abs=1e-4)
+    assert res.intervals[2] == [-np.inf, np.inf]
+    assert res.scan_hini(2) is None
+
+
+def test_wald_not_optimum():
+    # the gradient is taken into account
+    res = get_wald_intervals([2., 5.], f_2p, loss_crit=9)
+    assert res.intervals[0] == approx([1., 5.], abs=1e-4)
+    assert res.intervals[1] == approx([2., 6.], abs=1e-4)
+    assert res.scan_hini(0) == approx([1., 3.], abs=1e-4)
+
+
+def test_wald_log_scale():
+    res = get_wald_intervals([3., 4.], f_2p, loss_crit=9, scale=["log", "direct"])
+    assert list(res.identifiable) == [True, True]
+    left, right = res.intervals[0]
+    assert 0 < left < 3. < right
+    bounds = res.scan_bounds(0)
+    assert bounds[0] < left and bounds[1] > right
+
+
+def test_interval_wald():
+    tracer = EvaluationTracer()
+    res_default = [get_interval([3., 4, 1.1, 8.], i, f_4p_2im, "LIN_EXTRAPOL", loss_crit=9) for i in range(3)]
+    res = [get_interval([3., 4, 1.1, 8.], i, f_4p_2im, "LIN_EXTRAPOL", loss_crit=9, wald=True, tracer=tracer) for i in range(3)]
+    assert res[0].result[0].value == approx(1., abs=1e-2)
+    assert res[1].result[1].value == approx(6., abs=1e-2)
+    assert res[2].result[1].status == "SCAN_BOUND_REACHED"
+    # the first step is near the Wald endpoint
+    assert len(res[0].result[1].profilePoints) < len(res_default[0].result[1].profilePoints)
+    # the tighter scan bounds for identifiable components only
+    assert res[0].input.scan_bounds == approx([-3., 9.], abs=1e-3)
+    assert res[2].input.scan_bounds == approx([-9., 9.])
+    assert tracer.summary()["calls_per_stage"]["wald"] == 3 * (2 * 4**2 + 1)
+
+
+def test_intervals_wald_once():
+    calls = [0]
+    def loss(x):
+        calls[0] += 1
+        return f_3p_1im_dep(x)
+    wald = get_wald_intervals([3., 2., 2.1], loss, loss_crit=9)
+    assert calls[0] == 2 * 3**2 + 1
+    res = get_intervals([3., 2., 2.1], loss, "CICO_ONE_PASS", loss_crit=9, parallel="thread", wald=wald)
+    assert res[0].result[1].value == approx(5., abs=1e-2)
+    assert res[1].result[0].value == approx(2. - 2. * math.sqrt(2), abs=1e-2)
+    assert res[2].result[1].status == "SCAN_BOUND_REACHED"
+
+
+def test_endpoint_wald_left():
+    res = get_endpoint([3., 2., 2.1], 1, f_3p_1im_dep, "QUADR_EXTRAPOL", "left", loss_crit=9, wald=True)
+    assert res.value == approx(2. - 2. * math.sqrt(2), abs=1e-2)
+    assert res.status == "BORDER_FOUND_BY_SCAN_TOL"
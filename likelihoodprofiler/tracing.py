@@ -0,0 +1,212 @@
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+import numpy as np
+
+from .batch import batch_loss, batch_method, scalar_loss
+
+
+class EvaluationTracer:
+    """Opt-in tracer recording every :code:`loss_func` call: parameter vector, loss, wall time and
+    the context of the call (method, direction and stage). The records are stored in fixed-size
+    NumPy ring buffer, so only the last :code:`capacity` calls are kept while the counters and
+    total times include all calls.
+
+    Parameters
+    ----------
+    capacity : Int
+        maximal number of stored records.
+
+    Attributes
+    ----------
+    n_calls : Int
+        total number of recorded calls.
+    loss_time : Float64
+        total wall time spent inside :code:`loss_func`, seconds.
+    """
+    def __init__(self, capacity=10000):
+        self.capacity = capacity
+        self.n_calls = 0
+        self.loss_time = 0.
+        self._records = None
+        self._labels = [None]  # code 0 is reserved for missing value
+        self._codes = {None: 0}
+        self._calls = {}
+        self._time_first = None
+        self._time_last = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _current(self):
+        current = getattr(self._local, "current", None)
+        if current is None:
+            current = self._local.current = {"method": None, "direction": None, "stage": None}
+        return current
+
+    @contextmanager
+    def context(self, **kwargs):
+        """Sets :code:`method`, :code:`direction` and/or :code:`stage` for the calls inside :code:`with` block.
+        The values which are not set are inherited from the outer context. The context is thread-local."""
+        current = self._current()
+        previous = current.copy()
+        current.update(kwargs)
+        try:
+            yield self
+        finally:
+            current.clear()
+            current.update(previous)
+
+    def _code(self, label):
+        if label not in self._codes:
+            self._codes[label] = len(self._labels)
+            self._labels.append(label)
+        return self._codes[label]
+
+    def record(self, theta, loss, start, duration):
+        """Stores one call of :code:`loss_func` with the current context."""
+        current = self._current()
+        with self._lock:
+            if self._records is None:
+                self._records = np.zeros(self.capacity, dtype=[
+                    ("theta", np.float64, (len(theta),)),
+                    ("loss", np.float64),
+                    ("start", np.float64),
+                    ("duration", np.float64),
+                    ("method", np.int16),
+                    ("direction", np.int16),
+                    ("stage", np.int16)
+                    ])
+            i = self.n_calls % self.capacity
+            record = self._records[i]
+            record["theta"] = theta
+            record["loss"] = loss
+            record["start"] = start
+            record["duration"] = duration
+            record["method"] = self._code(current["method"])
+            record["direction"] = self._code(current["direction"])
+            record["stage"] = self._code(current["stage"])
+
+            self.n_calls += 1
+            self.loss_time += duration
+            key = (current["method"], current["direction"], current["stage"])
+            self._calls[key] = self._calls.get(key, 0) + 1
+            if self._time_first is None:
+                self._time_first = start
+            self._time_last = max(start + duration, self._time_last or start)
+
+    def wrap(self, loss_func):
+        """Returns traced version of :code:`loss_func`."""
+        return TracedLossFunc(loss_func, self)
+
+    def records(self):
+        """Returns stored records in chronological order as NumPy structured array with fields
+        :code:`theta, loss, start, duration, method, direction, stage`. The context fields are codes,
+        use :code:`label(code)` to get the value."""
+        if self._records is None:
+            return np.zeros(0)
+        if self.n_calls <= self.capacity:
+            return self._records[0:self.n_calls].copy()
+        i = self.n_calls % self.capacity
+        return np.concatenate((self._records[i:], self._records[0:i]))
+
+    def label(self, code):
+        """Returns method, direction or stage value by code from :code:`records()`."""
+        return self._labels[code]
+
+    def summary(self, percentiles=(50, 90, 99)):
+        """Summary statistics of the calls.
+
+        Returns
+        -------
+        Dict
+            * :code:`n_calls`: total number of calls.
+            * :code:`calls_per_stage`: number of calls for every stage.
+            * :code:`calls_per_context`: number of calls for every :code:`(method, direction, stage)`.
+            * :code:`time_per_call`: percentiles of single call time over stored records, seconds.
+            * :code:`loss_time`: total time inside :code:`loss_func`, seconds.
+            * :code:`wall_time`: time from the start of the first call to the end of the last call, seconds.
+            * :code:`outside_fraction`: fraction of :code:`wall_time` spent outside :code:`loss_func`.
+        """
+        with self._lock:
+            calls_per_context = dict(self._calls)
+            durations = self.records()["duration"] if self.n_calls > 0 else np.zeros(0)
+            wall_time = 0. if self._time_first is None else self._time_last - self._time_first
+
+        calls_per_stage = {}
+        for (method, direction, stage), n in calls_per_context.items():
+            calls_per_stage[stage] = calls_per_stage.get(stage, 0) + n
+
+        return {
+            "n_calls": self.n_calls,
+            "calls_per_stage": calls_per_stage,
+            "calls_per_context": calls_per_context,
+            "time_per_call": {p: (np.percentile(durations, p) if len(durations) > 0 else np.nan) for p in percentiles},
+            "loss_time": self.loss_time,
+            "wall_time": wall_time,
+            # concurrent calls may overlap, so the fraction is limited by zero
+            "outside_fraction": max(0., 1. - self.loss_time / wall_time) if wall_time > 0 else 0.
+        }
+
+
+class TracedLossFunc:
+    """Callable wrapper of :code:`loss_func` recording calls to :code:`EvaluationTracer`. If :code:`loss_func`
+    has :code:`batch` method, see :code:`ScalarLossFunc`, the wrapper has it too and every row of the batch
+    is recorded as separate call with equal share of the batch time.
+
+    Parameters
+    ----------
+    loss_func : Function
+        original loss function.
+    tracer : EvaluationTracer
+        storage of the records.
+    """
+    def __init__(self, loss_func, tracer):
+        self.loss_func = loss_func
+        self.tracer = tracer
+        if batch_method(loss_func) is not None:
+            self.batch = self._batch
+
+    def __call__(self, theta):
+        start = time.perf_counter()
+        loss = np.nan
+        try:
+            loss = self.loss_func(theta)
+            return loss
+        finally:
+            # failed calls are recorded with nan loss
+            self.tracer.record(theta, loss, start, time.perf_counter() - start)
+
+    def _batch(self, thetas):
+        thetas = np.atleast_2d(np.asarray(thetas, dtype=np.float64))
+        start = time.perf_counter()
+        losses = np.full(len(thetas), np.nan)
+        try:
+            losses = batch_loss(self.loss_func, thetas)
+            return losses
+        finally:
+            duration = (time.perf_counter() - start) / max(len(thetas), 1)
+            for theta, loss in zip(thetas, losses):
+                self.tracer.record(theta, loss, start, duration)
+
+
+def traced_loss_func(loss_func, tracer):
+    """Applies :code:`tracer` option of the public functions to :code:`loss_func`. The function
+    which is already traced by the same tracer, possibly under the cache, is returned without changes.
+    The batch loss function, see :code:`vectorized`, is turned to :code:`ScalarLossFunc` first."""
+    loss_func = scalar_loss(loss_func)
+    if tracer is None:
+        return loss_func
+    wrapped = loss_func
+    while wrapped is not None:
+        if isinstance(wrapped, TracedLossFunc) and wrapped.tracer is tracer:
+            return loss_func
+        wrapped = getattr(wrapped, "loss_func", None)
+    return tracer.wrap(loss_func)
+
+
+def tracer_context(tracer, **kwargs):
+    """:code:`tracer.context(**kwargs)` or empty context if :code:`tracer` is :code:`None`."""
+    if tracer is None:
+        return nullcontext()
+    return tracer.context(**kwargs)
@@ -0,0 +1,189 @@
+import numpy as np
+
+from .support_math_func import unscaling, ScaleTransform
+from .batch import batch_loss
+from .gradient import finite_difference_hessian
+
+
+class WaldIntervals:
+    """Quadratic approximation of :code:`loss_func` at :code:`theta_init` in the optimization scale
+    and Wald intervals derived from it, see :code:`get_wald_intervals`. The object is used as
+    :code:`wald` option of :code:`get_interval` to set the scan steps and bounds.
+
+    Parameters
+    ----------
+    theta_init : Array[Float64]
+        point of approximation.
+    loss_init : Float64
+        value of :code:`loss_func(theta_init)`.
+    loss_crit : Float64
+        critical level of loss function.
+    scale : Array[String]
+        vector of scale transformations for each component.
+    theta_bounds : Array[Array[Float64,Float64]]
+        vector of bounds for each component.
+    gradient : Array[Float64]
+        gradient in the optimization scale.
+    hessian : Array[Array[Float64]]
+        Hessian matrix in the optimization scale.
+    center : Array[Float64]
+        optimum of the quadratic model in the optimization scale.
+    half_width : Array[Float64]
+        half widths of the intervals in the optimization scale, :code:`inf` for components which change along flat directions of the Hessian, i.e. non-identifiable.
+    """
+    def __init__(
+        self,
+        theta_init,
+        loss_init,
+        loss_crit,
+        scale,
+        theta_bounds,
+        gradient,
+        hessian,
+        center,
+        half_width):
+        self.theta_init = theta_init
+        self.loss_init = loss_init
+        self.loss_crit = loss_crit
+        self.scale = scale
+        self.theta_bounds = theta_bounds
+        self.gradient = gradient
+        self.hessian = hessian
+        self.center = center
+        self.half_width = half_width
+
+    @property
+    def identifiable(self):
+        """:code:`True` for components with finite Wald interval."""
+        return np.isfinite(self.half_width)
+
+    @property
+    def intervals(self):
+        """Wald intervals :code:`[left, right]` for all components in the original scale."""
+        transform = ScaleTransform(self.scale, self.theta_bounds)
+        return [
+            [transform.unscale_value(self.center[i] - self.half_width[i], i),
+             transform.unscale_value(self.center[i] + self.half_width[i], i)]
+            for i in range(len(self.center))
+            ]
+
+    def scan_hini(self, theta_num):
+        """Initial scan steps :code:`[left, right]` for the extrapolation methods: the distances from :code:`theta_init`
+        to the Wald endpoints in the optimization scale, :code:`None` for non-identifiable component."""
+        if not self.identifiable[theta_num]:
+            return None
+        theta_gd = ScaleTransform(self.scale, self.theta_bounds).scale_value(self.theta_init[theta_num], theta_num)
+        return [
+            max(theta_gd - self.center[theta_num] + self.half_width[theta_num], 1e-3 * self.half_width[theta_num]),
+            max(self.center[theta_num] + self.half_width[theta_num] - theta_gd, 1e-3 * self.half_width[theta_num])
+            ]
+
+    def initial_step(self):
+        """Initial step of the local optimizer for all components in the optimization scale. It is the
+        tenth of Wald half width or :code:`nan` (the default of the optimizer) for non-identifiable components."""
+        return np.where(self.identifiable, 0.1 * self.half_width, np.nan)
+
+    def scan_bounds(self, theta_num, bound_factor=3.):
+        """Scan bounds :code:`[left, right]` in the original scale: Wald interval widened by :code:`bound_factor`
+        but not wider than the default bounds :code:`(-9, 9)` in the optimization scale and :code:`theta_bounds`.
+        The default bounds are returned for non-identifiable component."""
+        transform = ScaleTransform(self.scale, self.theta_bounds)
+        bounds_gd = [-9., 9.]
+        if self.identifiable[theta_num]:
+            lb_gd = transform.scale_value(self.theta_bounds[theta_num][0], theta_num)
+            ub_gd = transform.scale_value(self.theta_bounds[theta_num][1], theta_num)
+            delta = bound_factor * self.half_width[theta_num]
+            # the bounds must be strictly inside theta_bounds
+            inside = 1e-3 * delta
+            bounds_gd = [
+                max(self.center[theta_num] - delta, -9., lb_gd + inside),
+                min(self.center[theta_num] + delta, 9., ub_gd - inside)
+                ]
+        return [transform.unscale_value(x, theta_num) for x in bounds_gd]
+
+
+def get_wald_intervals(
+    theta_init,
+    loss_func,
+    loss_crit=0.0,
+    scale=[],
+    theta_bounds=[],
+    step=1e-4,
+    vectorized=None,
+    rtol=1e-6
+    ):
+    """Estimates confidence intervals for all components by the quadratic approximation of :code:`loss_func`,
+    i.e. Wald intervals. The gradient and Hessian are calculated at :code:`theta_init` in the optimization
+    scale by central finite differences, :code:`2 n^2 + 1` calls of :code:`loss_func` as one batch.
+    The gradient is taken into account, so :code:`theta_init` is not necessary to be the optimum.
+
+    The result is cheap estimation for triage of parameters and the initial scan steps and bounds for
+    :code:`get_interval`, see :code:`wald` option.
+
+    Parameters
+    ----------
+    theta_init : Array[Float64]
+        starting values of parameter vector :math:`\\Theta`. The value of :code:`loss_func` must be lower than :code:`loss_crit`.
+    loss_func : Function
+        loss function :math:`\\Lambda\\left(\\Theta\\right)`, scalar or batch, see :code:`vectorized`.
+    loss_crit : Float64
+        critical level of loss function.
+    scale : Array[String]
+        vector of scale transformations for each component, see :code:`get_interval`.
+    theta_bounds : Array[Array[Float64,Float64]]
+        vector of bounds for each component, see :code:`get_interval`.
+    step : Float64
+        relative step of finite differences in the optimization scale.
+    vectorized : Bool or None
+        :code:`True` if :code:`loss_func` follows batch protocol. The default :code:`None` checks :code:`batch` method and :code:`is_vectorized(loss_func)`, see :code:`batch_loss`.
+    rtol : Float64
+        eigenvalues of the Hessian lower than :code:`rtol` of the largest one are flat directions. Components changing along them are non-identifiable.
+
+    Returns
+    -------
+    WaldIntervals
+        quadratic model and intervals.
+
+    """
+    n_theta = len(theta_init)
+
+    if len(scale) == 0:
+        scale = np.tile("direct", n_theta)
+
+    if len(theta_bounds) == 0:
+        theta_bounds = unscaling(
+            np.tile([(-1)*np.inf, np.inf], (n_theta, 1)),
+            )
+
+    transform = ScaleTransform(scale, theta_bounds)
+    theta_init_gd = transform.scale_vector(theta_init)
+
+    def loss_func_gd(thetas_gd):
+        thetas = np.array([transform.unscale(theta_gd, np.empty(n_theta)) for theta_gd in thetas_gd])
+        return batch_loss(loss_func, thetas, vectorized)
+
+    loss_init, gradient, hessian = finite_difference_hessian(loss_func_gd, theta_init_gd, step, vectorized=True)
+
+    # pseudo-inverse without flat and negative curvature directions
+    eigvals, eigvecs = np.linalg.eigh(0.5 * (hessian + hessian.T))
+    flat = eigvals <= rtol * max(np.max(np.abs(eigvals)), np.finfo(float).tiny)
+    covariance = (eigvecs[:, ~flat] / eigvals[~flat]) @ eigvecs[:, ~flat].T
+
+    # optimum of quadratic model and profile of the model: loss_opt + (x - center)^2 / (2 covariance)
+    shift = -covariance @ gradient
+    loss_opt = loss_init + 0.5 * gradient @ shift
+    half_width = np.sqrt(2. * max(loss_crit - loss_opt, 0.) * np.diag(covariance))
+    non_identifiable = np.any(np.abs(eigvecs[:, flat]) > np.sqrt(rtol), axis=1)
+    half_width[non_identifiable] = np.inf
+
+    return WaldIntervals(
+        theta_init,
+        loss_init,
+        loss_crit,
+        scale,
+        theta_bounds,
+        gradient,
+        hessian,
+        theta_init_gd + shift,
+        half_width
+        )
@@ -6,4 +6,5 @@ setup(name="likelihoodprofiler",
       author="Evgeny Metelkin, Ivan Borisov, Victoria Tkachenko",
       author_email="metelkin@insysbio.com",
       packages=['likelihoodprofiler'],
+      python_requires=">=3.7",
       )